@@ -0,0 +1,29 @@
+from typing import Union
+
+from django.contrib.auth.models import AbstractBaseUser
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+from rest_framework_simplejwt import authentication
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.tokens import Token
+
+from core import request_cache
+
+
+class JWTAuthentication(authentication.JWTAuthentication):
+    """JWT-аутентификация, запоминающая пользователя в кеше запроса.
+
+    Права доступа и сериализаторы получают автора объекта из того же
+    кеша, и текущий пользователь не загружается повторно.
+    """
+
+    def get_user(
+        self,
+        validated_token: Token,
+    ) -> Union[AbstractBaseUser, TokenUser]:
+        return request_cache.remember(super().get_user(validated_token))
+
+
+class JWTScheme(SimpleJWTScheme):
+    """Описание JWTAuthentication в схеме OpenAPI."""
+
+    target_class = JWTAuthentication
@@ -3,6 +3,8 @@ from rest_framework import permissions
 from rest_framework.request import Request
 from rest_framework.viewsets import ModelViewSet
 
+from core import request_cache
+
 
 class IsAdmin(permissions.BasePermission):
     """Проверка прав доступа для администратора."""
@@ -79,7 +81,11 @@ class IsAdminOrModeratorOrAuthorOrReadOnly(permissions.BasePermission):
             request.method in permissions.SAFE_METHODS
             or request.method == 'POST'
             or request.method in ('PATCH', 'DELETE')
-            and (user == obj.author or user.is_moderator or user.is_admin)
+            and (
+                user == request_cache.related(obj, 'author')
+                or user.is_moderator
+                or user.is_admin
+            )
         )
 
 
@@ -1,12 +1,29 @@
-from typing import OrderedDict
+from typing import (
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    OrderedDict,
+    Set,
+    Tuple,
+    Type,
+)
 
-from rest_framework import serializers
-from rest_framework.generics import get_object_or_404
-from rest_framework.relations import SlugRelatedField
+from django.db import connection, transaction
+from django.utils.encoding import smart_str
+from rest_framework import serializers, status
+from rest_framework.relations import (
+    MANY_RELATION_KWARGS,
+    ManyRelatedField,
+    SlugRelatedField,
+)
 from rest_framework.validators import UniqueValidator
 
 from api.validators import validate_username
-from reviews.models import Category, Comment, Genre, Review, Title
+from core import request_cache
+from core.catalog import CATALOG
+from core.timing import TimedSerializerMixin
+from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
 from users.models import (
     MAX_LENGTH_EMAIL,
     MAX_LENGTH_USERNAME,
@@ -15,13 +32,133 @@ from users.models import (
 )
 
 
-class CategorySerializer(serializers.ModelSerializer):
+def verify_catalog(field: serializers.Field) -> bool:
+    # TitleBulkWriter сверяет слаги всего пакета с базой заранее
+    return not field.context.get('catalog_verified')
+
+
+class CatalogRelationMixin:
+    """Категории и жанры произведения берутся из кеша каталога."""
+
+    def get_attribute(self, instance: Title) -> object:
+        return CATALOG.related(instance, self.source)
+
+
+class CatalogListSerializer(CatalogRelationMixin, serializers.ListSerializer):
+    pass
+
+
+class CatalogManyRelatedField(CatalogRelationMixin, ManyRelatedField):
+    def to_internal_value(self, data: List[str]) -> List[object]:
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+        child = self.child_relation
+        try:
+            objects = CATALOG.get_many_by_slug(
+                child.queryset.model,
+                data,
+                verify=verify_catalog(self),
+            )
+        except TypeError:
+            child.fail('invalid')
+        for slug in data:
+            if slug not in objects:
+                child.fail(
+                    'does_not_exist',
+                    slug_name=child.slug_field,
+                    value=smart_str(slug),
+                )
+        return [objects[slug] for slug in data]
+
+
+class CatalogSlugRelatedField(CatalogRelationMixin, SlugRelatedField):
+    """Поле слага категории или жанра, не обращающееся к базе."""
+
+    @classmethod
+    def many_init(
+        cls: Type['CatalogSlugRelatedField'],
+        *args: tuple,
+        **kwargs: dict,
+    ) -> CatalogManyRelatedField:
+        list_kwargs = {'child_relation': cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return CatalogManyRelatedField(**list_kwargs)
+
+    def to_internal_value(self, data: str) -> object:
+        try:
+            obj = CATALOG.get_by_slug(
+                self.queryset.model,
+                data,
+                verify=verify_catalog(self),
+            )
+        except TypeError:
+            self.fail('invalid')
+        if obj is None:
+            self.fail(
+                'does_not_exist',
+                slug_name=self.slug_field,
+                value=smart_str(data),
+            )
+        return obj
+
+
+def update_title_genres(
+    genres: Mapping[int, Iterable[Genre]],
+    created: bool = False,
+) -> None:
+    """Приводит связи GenreTitle произведений к заданным жанрам.
+
+    Удаляются только убранные связи и добавляются только новые, пакетно
+    для всех переданных произведений. Для только что созданных
+    произведений текущие связи не запрашиваются.
+    """
+
+    wanted = {
+        (title_id, genre.pk)
+        for title_id, title_genres in genres.items()
+        for genre in title_genres
+    }
+    removed = []
+    if not created:
+        titles = list(genres)
+        # у PostgreSQL ограничения на число параметров нет: max_query_params
+        # равен None
+        max_params = connection.features.max_query_params
+        size = max_params or len(titles) or 1
+        for start in range(0, len(titles), size):
+            end = start + size
+            for pk, title_id, genre_id in GenreTitle.objects.filter(
+                title_id__in=titles[start:end],
+            ).values_list('pk', 'title_id', 'genre_id'):
+                if (title_id, genre_id) in wanted:
+                    wanted.discard((title_id, genre_id))
+                else:
+                    removed.append(pk)
+        size = max_params or len(removed) or 1
+        for start in range(0, len(removed), size):
+            end = start + size
+            GenreTitle.objects.filter(pk__in=removed[start:end]).delete()
+    GenreTitle.objects.bulk_create(
+        GenreTitle(title_id=title_id, genre_id=genre_id)
+        for title_id, genre_id in sorted(wanted)
+    )
+
+
+class CategorySerializer(
+    CatalogRelationMixin,
+    TimedSerializerMixin,
+    serializers.ModelSerializer,
+):
     class Meta:
         model = Category
         fields = ('name', 'slug')
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     author = SlugRelatedField(slug_field='username', read_only=True)
 
     class Meta:
@@ -29,19 +166,20 @@ class CommentSerializer(serializers.ModelSerializer):
         fields = ('id', 'text', 'author', 'pub_date')
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Genre
         fields = ('name', 'slug')
+        list_serializer_class = CatalogListSerializer
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     author = SlugRelatedField(slug_field='username', read_only=True)
 
     def validate(self, value: OrderedDict) -> OrderedDict:
-        title = get_object_or_404(
+        title = request_cache.get_object_or_404(
             Title,
-            pk=self.context.get('view').kwargs.get('title_id'),
+            self.context.get('view').kwargs.get('title_id'),
         )
         if (
             self.context.get('request').method == 'POST'
@@ -59,7 +197,7 @@ class ReviewSerializer(serializers.ModelSerializer):
         fields = ('id', 'text', 'author', 'score', 'pub_date')
 
 
-class TitleReadSerializer(serializers.ModelSerializer):
+class TitleReadSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     genre = GenreSerializer(many=True)
     category = CategorySerializer()
     rating = serializers.IntegerField()
@@ -77,14 +215,14 @@ class TitleReadSerializer(serializers.ModelSerializer):
         )
 
 
-class TitleWriteSerializer(serializers.ModelSerializer):
+class TitleWriteSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     description = serializers.CharField(allow_blank=True)
-    genre = serializers.SlugRelatedField(
+    genre = CatalogSlugRelatedField(
         many=True,
         slug_field='slug',
         queryset=Genre.objects.all(),
     )
-    category = serializers.SlugRelatedField(
+    category = CatalogSlugRelatedField(
         slug_field='slug',
         queryset=Category.objects.all(),
     )
@@ -93,8 +231,137 @@ class TitleWriteSerializer(serializers.ModelSerializer):
         model = Title
         fields = ('id', 'name', 'year', 'description', 'category', 'genre')
 
+    def create(self, validated_data: Dict) -> Title:
+        genres = validated_data.pop('genre', [])
+        title = super().create(validated_data)
+        update_title_genres({title.pk: genres}, created=True)
+        return title
+
+    def update(self, instance: Title, validated_data: Dict) -> Title:
+        genres = validated_data.pop('genre', None)
+        title = super().update(instance, validated_data)
+        if genres is not None:
+            update_title_genres({title.pk: genres})
+        return title
+
+
+class TitleBulkWriter:
+    """Пакетное создание и изменение произведений.
+
+    Элементы с id изменяются, без id — создаются. Существующие
+    произведения читаются одним запросом, слаги разрешаются по кешу
+    каталога, а запись идёт пакетами в одной транзакции. Невалидные
+    элементы пропускаются; для каждого элемента возвращается статус,
+    id и ошибки.
+    """
+
+    def __init__(self, context: Dict) -> None:
+        context = {**context, 'catalog_verified': True}
+        self.creator = TitleWriteSerializer(context=context)
+        self.updater = TitleWriteSerializer(context=context, partial=True)
+        self.existing: Dict[int, Title] = {}
+        self.created: List[Title] = []
+        self.updated: Dict[int, Title] = {}
+        self.update_fields: Set[str] = set()
+        self.genres: List[Tuple[Title, List[Genre]]] = []
+
+    def write(self, items: List) -> List[Dict]:
+        self.prefetch([item for item in items if isinstance(item, dict)])
+        results = [self.add(item) for item in items]
+        self.save()
+        for result in results:
+            instance = result.pop('instance', None)
+            if instance is not None:
+                result['id'] = instance.pk
+        return results
+
+    def prefetch(self, items: List[Dict]) -> None:
+        genres = {
+            slug
+            for item in items
+            if isinstance(item.get('genre'), list)
+            for slug in item['genre']
+            if isinstance(slug, str)
+        }
+        categories = {
+            item['category']
+            for item in items
+            if isinstance(item.get('category'), str)
+        }
+        # промахи по слагам перечитывают кеш один раз на весь пакет
+        CATALOG.get_many_by_slug(Genre, genres, verify=True)
+        CATALOG.get_many_by_slug(Category, categories, verify=True)
+        self.existing = Title.objects.in_bulk(
+            {item['id'] for item in items if is_pk(item.get('id'))},
+        )
 
-class SignUpSerializer(serializers.ModelSerializer):
+    def add(self, item: object) -> Dict:
+        if not isinstance(item, dict):
+            return {
+                'status': status.HTTP_400_BAD_REQUEST,
+                'errors': {'non_field_errors': ['Ожидался объект.']},
+            }
+        pk = item.get('id')
+        instance = self.existing.get(pk) if is_pk(pk) else None
+        if pk is not None and instance is None:
+            return {
+                'id': pk,
+                'status': status.HTTP_404_NOT_FOUND,
+                'errors': {'id': ['Произведение не найдено.']},
+            }
+        serializer = self.creator if instance is None else self.updater
+        try:
+            data = serializer.run_validation(item)
+        except serializers.ValidationError as error:
+            return {
+                'id': pk,
+                'status': status.HTTP_400_BAD_REQUEST,
+                'errors': error.detail,
+            }
+        genres = data.pop('genre', None)
+        if instance is None:
+            instance = Title(**data)
+            self.created.append(instance)
+            result = {'status': status.HTTP_201_CREATED}
+        else:
+            for name, value in data.items():
+                setattr(instance, name, value)
+            self.updated[instance.pk] = instance
+            self.update_fields.update(data)
+            result = {'status': status.HTTP_200_OK}
+        if genres is not None:
+            self.genres.append((instance, genres))
+        result['instance'] = instance
+        return result
+
+    def save(self) -> None:
+        with transaction.atomic():
+            if connection.features.can_return_rows_from_bulk_insert:
+                Title.objects.bulk_create(self.created)
+            else:
+                # без RETURNING bulk_create не сообщает id новых строк
+                for instance in self.created:
+                    instance.save(force_insert=True)
+            if self.update_fields:
+                Title.objects.bulk_update(
+                    list(self.updated.values()),
+                    sorted(self.update_fields),
+                )
+            for created in (True, False):
+                mapping = {
+                    instance.pk: genres
+                    for instance, genres in self.genres
+                    if (instance.pk in self.updated) is not created
+                }
+                if mapping:
+                    update_title_genres(mapping, created=created)
+
+
+def is_pk(value: object) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+class SignUpSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     username = serializers.CharField(
         max_length=MAX_LENGTH_USERNAME,
         required=True,
@@ -122,7 +389,7 @@ class SignUpSerializer(serializers.ModelSerializer):
         )
 
 
-class TokenSerializer(serializers.ModelSerializer):
+class TokenSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     username = serializers.CharField()
 
     class Meta:
@@ -133,7 +400,7 @@ class TokenSerializer(serializers.ModelSerializer):
         )
 
 
-class UsersSerializer(serializers.ModelSerializer):
+class UsersSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     username = serializers.CharField(
         max_length=MAX_LENGTH_USERNAME,
         required=True,
@@ -163,7 +430,7 @@ class UsersSerializer(serializers.ModelSerializer):
         )
 
 
-class UsernameSerializer(serializers.ModelSerializer):
+class UsernameSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     username = serializers.CharField(
         max_length=MAX_LENGTH_USERNAME,
         required=False,
@@ -185,7 +452,7 @@ class UsernameSerializer(serializers.ModelSerializer):
         )
 
 
-class UserMeSerializer(serializers.ModelSerializer):
+class UserMeSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     username = serializers.CharField(
         max_length=MAX_LENGTH_USERNAME,
         required=False,
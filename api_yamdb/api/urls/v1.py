@@ -1,8 +1,9 @@
 from django.urls import include, path
-from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
+from drf_spectacular.views import SpectacularSwaggerView
 from rest_framework.routers import SimpleRouter
 
 from api.views import (
+    BatchView,
     CategoryViewSet,
     CommentViewSet,
     GenreViewSet,
@@ -14,6 +15,7 @@ from api.views import (
     UsernameViewSet,
     UsersViewSet,
 )
+from core.views import schema
 
 router = SimpleRouter()
 router.register('categories', CategoryViewSet, basename='category')
@@ -33,6 +35,7 @@ urlpatterns = [
         'titles/<int:title_id>/reviews/<int:review_id>/',
         include(comments_router.urls),
     ),
+    path('batch/', BatchView.as_view(), name='batch'),
     path(
         'auth/',
         include(
@@ -63,7 +66,7 @@ urlpatterns = [
         UsersViewSet.as_view({'get': 'list', 'post': 'create'}),
         name='users',
     ),
-    path('doc/schema/', SpectacularAPIView.as_view(), name='schema'),
+    path('doc/schema/', schema, name='schema'),
     path(
         'doc/',
         SpectacularSwaggerView.as_view(url_name='api:schema'),
@@ -1,6 +1,12 @@
-from typing import Type
-
-from django.db.models import Avg, QuerySet
+from io import BytesIO
+from typing import Dict, List, Type
+from urllib.parse import unquote, urlsplit
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.db.models import Avg, OuterRef, Prefetch, QuerySet, Subquery
+from django.http import HttpRequest
+from django.urls import Resolver404, ResolverMatch, resolve
 from django.utils.functional import cached_property
 from django_filters.rest_framework import (
     CharFilter,
@@ -15,6 +21,8 @@ from rest_framework import (
     status,
     viewsets,
 )
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.generics import get_object_or_404
 from rest_framework.request import Request
 from rest_framework.response import Response
@@ -35,6 +43,7 @@ from api.serializers import (
     GenreSerializer,
     ReviewSerializer,
     SignUpSerializer,
+    TitleBulkWriter,
     TitleReadSerializer,
     TitleWriteSerializer,
     TokenSerializer,
@@ -42,11 +51,24 @@ from api.serializers import (
     UsernameSerializer,
     UsersSerializer,
 )
-from reviews.models import Category, Genre, Review, Title
+from core import request_cache
+from core.retry import RetryMixin
+from core.routers import ReplicaMixin
+from core.timing import ServerTimingMixin
+from reviews.models import (
+    Category,
+    Comment,
+    Genre,
+    GenreTitle,
+    Review,
+    Title,
+)
 from users.models import CustomUser
 
 
 class ListCreateDestroyViewSet(
+    ServerTimingMixin,
+    ReplicaMixin,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
     mixins.DestroyModelMixin,
@@ -64,20 +86,25 @@ class CategoryViewSet(ListCreateDestroyViewSet):
     permission_classes = (AdminOrReadOnly,)
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(
+    ServerTimingMixin,
+    ReplicaMixin,
+    RetryMixin,
+    viewsets.ModelViewSet,
+):
     serializer_class = CommentSerializer
     permission_classes = (IsAdminOrModeratorOrAuthorOrReadOnly,)
 
     @cached_property
     def _review(self) -> QuerySet:
-        return get_object_or_404(
+        return request_cache.get_object_or_404(
             Review,
-            pk=self.kwargs.get('review_id'),
-            title=self.kwargs.get('title_id'),
+            self.kwargs.get('review_id'),
+            title_id=self.kwargs.get('title_id'),
         )
 
     def get_queryset(self) -> QuerySet:
-        return self._review.comments.all()
+        return self._review.comments.select_related('author')
 
     def perform_create(
         self,
@@ -95,16 +122,24 @@ class GenreViewSet(ListCreateDestroyViewSet):
     permission_classes = (AdminOrReadOnly,)
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(
+    ServerTimingMixin,
+    ReplicaMixin,
+    RetryMixin,
+    viewsets.ModelViewSet,
+):
     serializer_class = ReviewSerializer
     permission_classes = (IsAdminOrModeratorOrAuthorOrReadOnly,)
 
     @cached_property
     def _title(self) -> QuerySet:
-        return get_object_or_404(Title, pk=self.kwargs.get('title_id'))
+        return request_cache.get_object_or_404(
+            Title,
+            self.kwargs.get('title_id'),
+        )
 
     def get_queryset(self) -> QuerySet:
-        return self._title.reviews.all()
+        return self._title.reviews.select_related('author')
 
     def perform_create(
         self,
@@ -122,7 +157,11 @@ class TitleFilter(FilterSet):
         fields = ('name', 'year', 'category', 'genre')
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(
+    ServerTimingMixin,
+    ReplicaMixin,
+    viewsets.ModelViewSet,
+):
     http_method_names = [
         'get',
         'post',
@@ -139,13 +178,134 @@ class TitleViewSet(viewsets.ModelViewSet):
     filterset_class = TitleFilter
     permission_classes = (AdminOrReadOnly,)
 
+    def get_queryset(self) -> QuerySet:
+        queryset = super().get_queryset()
+        if self.action in ['list', 'retrieve']:
+            # категории и жанры сериализатор берёт из кеша каталога
+            queryset = queryset.prefetch_related(
+                Prefetch(
+                    'genres',
+                    queryset=GenreTitle.objects.only('title', 'genre'),
+                ),
+            )
+        return queryset
+
     def get_serializer_class(self) -> serializers.ModelSerializer:
         if self.action in ['list', 'retrieve']:
             return TitleReadSerializer
         return TitleWriteSerializer
 
+    def get_includes(self) -> Dict[str, int]:
+        """Связи из ?include= с лимитами; вложенная связь включает
+        родительскую."""
+
+        includes = {}
+        names = self.request.query_params.get('include', '').split(',')
+        for name in filter(None, names):
+            if name not in settings.INCLUDE_LIMITS:
+                raise ValidationError(
+                    {'include': [f'Неизвестная связь: {name}.']},
+                )
+            parts = name.split('.')
+            for depth in range(1, len(parts) + 1):
+                path = '.'.join(parts[:depth])
+                includes[path] = self.get_include_limit(path)
+        return includes
+
+    def get_include_limit(self, path: str) -> int:
+        param = f'limit[{path}]'
+        value = self.request.query_params.get(param)
+        if value is None:
+            return settings.INCLUDE_LIMITS[path]
+        try:
+            limit = int(value)
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= settings.INCLUDE_MAX_LIMIT:
+            raise ValidationError(
+                {
+                    param: [
+                        'Ожидалось целое число от 1 до '
+                        f'{settings.INCLUDE_MAX_LIMIT}.',
+                    ],
+                },
+            )
+        return limit
+
+    def get_included_reviews(self, includes: Dict[str, int]) -> List[Dict]:
+        """Последние отзывы произведения и первые комментарии к ним.
+
+        Порядок и содержимое совпадают с первыми страницами списков
+        отзывов и комментариев. Отзывы и все их комментарии читаются
+        двумя запросами при любом числе отзывов.
+        """
+
+        reviews = Review.objects.filter(
+            title_id=self.kwargs['pk'],
+        ).select_related('author')
+        if 'reviews.comments' in includes:
+            first_comments = Comment.objects.filter(
+                review=OuterRef('review'),
+            ).values('pk')[: includes['reviews.comments']]
+            reviews = reviews.prefetch_related(
+                Prefetch(
+                    'comments',
+                    queryset=Comment.objects.filter(
+                        pk__in=Subquery(first_comments),
+                    ).select_related('author'),
+                    to_attr='included_comments',
+                ),
+            )
+        reviews = list(reviews[: includes['reviews']])
+        context = self.get_serializer_context()
+        data = ReviewSerializer(reviews, many=True, context=context).data
+        if 'reviews.comments' in includes:
+            for review, item in zip(reviews, data):
+                item['comments'] = CommentSerializer(
+                    review.included_comments,
+                    many=True,
+                    context=context,
+                ).data
+        return data
+
+    def retrieve(
+        self,
+        request: Request,
+        *args: tuple,
+        **kwargs: dict,
+    ) -> Response:
+        includes = self.get_includes()
+        response = super().retrieve(request, *args, **kwargs)
+        if 'reviews' in includes:
+            response.data['reviews'] = self.get_included_reviews(includes)
+        return response
+
+    @action(detail=False, methods=['post'], permission_classes=(IsAdmin,))
+    def bulk(self, request: Request) -> Response:
+        """Пакетное создание и изменение произведений."""
+
+        if not isinstance(request.data, list):
+            return Response(
+                {'detail': 'Ожидался список произведений.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(request.data) > settings.TITLE_BULK_LIMIT:
+            return Response(
+                {
+                    'detail': (
+                        'В одном запросе не больше '
+                        f'{settings.TITLE_BULK_LIMIT} произведений.'
+                    ),
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        results = TitleBulkWriter(self.get_serializer_context()).write(
+            request.data,
+        )
+        return Response(results, status=status.HTTP_200_OK)
+
 
-class SignUpView(APIView):
+class SignUpView(ServerTimingMixin, APIView):
     """Отправка письма с кодом подтверждения на email."""
 
     permission_classes = (permissions.AllowAny,)
@@ -168,7 +328,7 @@ class SignUpView(APIView):
         return Response(serializer.validated_data, status=status.HTTP_200_OK)
 
 
-class TokenView(APIView):
+class TokenView(ServerTimingMixin, APIView):
     """Получение JWT-токена в обмен на username и confirmation code."""
 
     permission_classes = (permissions.AllowAny,)
@@ -192,7 +352,11 @@ class TokenView(APIView):
         return Response({'token': str(token)}, status=status.HTTP_200_OK)
 
 
-class UsersViewSet(viewsets.ModelViewSet):
+class UsersViewSet(
+    ServerTimingMixin,
+    ReplicaMixin,
+    viewsets.ModelViewSet,
+):
     permission_classes = (IsAdmin,)
     queryset = CustomUser.objects.all()
     serializer_class = UsersSerializer
@@ -201,6 +365,8 @@ class UsersViewSet(viewsets.ModelViewSet):
 
 
 class UsernameViewSet(
+    ServerTimingMixin,
+    ReplicaMixin,
     mixins.RetrieveModelMixin,
     mixins.UpdateModelMixin,
     mixins.DestroyModelMixin,
@@ -213,6 +379,8 @@ class UsernameViewSet(
 
 
 class UserMeViewSet(
+    ServerTimingMixin,
+    ReplicaMixin,
     mixins.RetrieveModelMixin,
     mixins.UpdateModelMixin,
     GenericViewSet,
@@ -231,3 +399,117 @@ class UserMeViewSet(
         if self.action == 'retrieve':
             return UsernameSerializer
         return UserMeSerializer
+
+
+class BatchView(ServerTimingMixin, APIView):
+    """Несколько GET-запросов к API в одном HTTP-запросе.
+
+    Подзапросы выполняются по очереди с аутентификацией и кешем объектов
+    внешнего запроса, минуя middleware. Поддерживаются только
+    представления DRF: тело ответа берётся из Response.data.
+    """
+
+    permission_classes = (permissions.AllowAny,)
+
+    def post(self, request: Request) -> Response:
+        requests = None
+        if isinstance(request.data, dict):
+            requests = request.data.get('requests')
+        if not isinstance(requests, list):
+            return Response(
+                {'requests': ['Ожидался список запросов.']},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(requests) > settings.BATCH_MAX_REQUESTS:
+            return Response(
+                {
+                    'requests': [
+                        'В пакете не больше '
+                        f'{settings.BATCH_MAX_REQUESTS} запросов.',
+                    ],
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(
+            [self.run(request, sub_request) for sub_request in requests],
+        )
+
+    def run(self, request: Request, sub_request: object) -> Dict:
+        if not isinstance(sub_request, dict) or not isinstance(
+            sub_request.get('url'),
+            str,
+        ):
+            return {
+                'status': status.HTTP_400_BAD_REQUEST,
+                'body': {'url': ['Обязательное поле.']},
+            }
+        url = sub_request['url']
+        if str(sub_request.get('method', 'GET')).upper() != 'GET':
+            return {
+                'url': url,
+                'status': status.HTTP_405_METHOD_NOT_ALLOWED,
+                'body': {'detail': 'Поддерживаются только GET-запросы.'},
+            }
+        parts = urlsplit(url)
+        path = unquote(parts.path)
+        try:
+            match = resolve(path)
+        except Resolver404:
+            match = None
+        view_class = getattr(match.func, 'cls', None) if match else None
+        if (
+            match is None
+            or not path.startswith('/api/')
+            or view_class is BatchView
+        ):
+            return {
+                'url': url,
+                'status': status.HTTP_404_NOT_FOUND,
+                'body': {'detail': 'Страница не найдена.'},
+            }
+        if not isinstance(view_class, type) or not issubclass(
+            view_class,
+            APIView,
+        ):
+            return {
+                'url': url,
+                'status': status.HTTP_400_BAD_REQUEST,
+                'body': {'detail': 'Поддерживаются только запросы к API.'},
+            }
+        response = match.func(
+            self.sub_request(request, path, parts.query, match),
+            *match.args,
+            **match.kwargs,
+        )
+        return {
+            'url': url,
+            'status': response.status_code,
+            'body': getattr(response, 'data', None),
+        }
+
+    def sub_request(
+        self,
+        request: Request,
+        path: str,
+        query: str,
+        match: ResolverMatch,
+    ) -> HttpRequest:
+        environ = {
+            key: value
+            for key, value in request.META.items()
+            if key not in ('CONTENT_LENGTH', 'CONTENT_TYPE')
+        }
+        environ.update(
+            # WSGI передаёт путь байтами UTF-8, декодированными как latin-1
+            PATH_INFO=path.encode().decode('iso-8859-1'),
+            QUERY_STRING=query,
+            REQUEST_METHOD='GET',
+        )
+        environ['wsgi.input'] = BytesIO()
+        sub_request = WSGIRequest(environ)
+        sub_request.resolver_match = match
+        if request.user.is_authenticated:
+            # DRF подставляет уже выполненную аутентификацию
+            sub_request._force_auth_user = request.user
+            sub_request._force_auth_token = request.auth
+        return sub_request
@@ -1,5 +1,6 @@
 import os
 from datetime import timedelta
+from importlib.util import find_spec
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -35,14 +36,30 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    'core.metrics.MetricsMiddleware',
+    'core.timing.ServerTimingMiddleware',
+    'core.compression.CompressionMiddleware',
+    'core.profiling.ProfilingMiddleware',
+    'core.request_cache.RequestCacheMiddleware',
     'django.middleware.common.CommonMiddleware',
+    'core.middleware.SiteMiddleware',
+    # браузерный API отдаёт HTML и тоже нуждается в защите от кликджекинга
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+# Middleware сайта и админки; запросы к LEAN_MIDDLEWARE_PATHS их обходят.
+SITE_MIDDLEWARE = [
+    'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
-    'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+LEAN_MIDDLEWARE_PATHS = ('/api/',)
+
+# Middleware админки проверяет core.E001 в SITE_MIDDLEWARE.
+SILENCED_SYSTEM_CHECKS = ['admin.E408', 'admin.E409', 'admin.E410']
+
 ROOT_URLCONF = 'api_yamdb.urls'
 
 TEMPLATES_DIR = BASE_DIR / 'templates'
@@ -72,6 +89,75 @@ DATABASES = {
     },
 }
 
+# Файлы реплик SQLite через запятую; реплики обновляются внешней
+# репликацией, в тестах они зеркалируют основную базу.
+DATABASE_REPLICAS = []
+for index, name in enumerate(
+    filter(None, os.getenv('DATABASE_REPLICA_NAMES', '').split(',')),
+):
+    alias = f'replica{index}'
+    DATABASES[alias] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': name,
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+
+# Сколько секунд после записи пользователь читает с основной базы.
+READ_YOUR_WRITES_WINDOW = 5
+
+# Общий для рабочих процессов кеш: версия кеша каталога и отметки записи
+# пользователей. Файловый кеш общий для процессов одного сервера;
+# процессно-локальные LocMemCache и DummyCache отклоняют проверки
+# core.E002 и, при заданных репликах, core.E003.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.filebased.FileBasedCache',
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', str(BASE_DIR / 'cache')),
+    },
+}
+
+CATALOG_VERSION_CHECK_INTERVAL = 1
+
+# Наибольшее число подзапросов в запросе к /api/v1/batch/.
+BATCH_MAX_REQUESTS = 20
+
+# Наибольшее число произведений в запросе к /api/v1/titles/bulk/.
+TITLE_BULK_LIMIT = 5000
+
+# Связи, встраиваемые в ответ /api/v1/titles/<id>/?include=, и число
+# объектов каждой из них по умолчанию; лимит меняется параметром
+# limit[<связь>]= не больше INCLUDE_MAX_LIMIT.
+INCLUDE_LIMITS = {
+    'reviews': 10,
+    'reviews.comments': 3,
+}
+
+INCLUDE_MAX_LIMIT = 100
+
+# Повторы записи в ReviewViewSet и CommentViewSet при блокировке базы.
+DB_RETRY_ATTEMPTS = 5
+
+DB_RETRY_BASE_DELAY = 0.02
+
+DB_RETRY_MAX_DELAY = 0.5
+
+# Выполняются на каждом новом соединении с SQLite: WAL позволяет читать
+# во время записи, а busy_timeout ждёт блокировку вместо ошибки.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+    'busy_timeout': 5000,
+    'temp_store': 'memory',
+}
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -93,11 +179,34 @@ REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 100,
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.JWTAuthentication',
     ),
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    'DEFAULT_RENDERER_CLASSES': (
+        'core.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'core.parsers.JSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
 }
 
+# MessagePack для внутренних клиентов, если установлен msgpack.
+if find_spec('msgpack') is not None:
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'] += (
+        'core.renderers.MessagePackRenderer',
+    )
+    REST_FRAMEWORK['DEFAULT_PARSER_CLASSES'] += (
+        'core.parsers.MessagePackParser',
+    )
+    REST_FRAMEWORK['TEST_REQUEST_RENDERER_CLASSES'] = (
+        'rest_framework.renderers.MultiPartRenderer',
+        'rest_framework.renderers.JSONRenderer',
+        'core.renderers.MessagePackRenderer',
+    )
+
 SPECTACULAR_SETTINGS = {
     'TITLE': 'YaMDb API',
     'DESCRIPTION': 'Проект YaMDb собирает отзывы пользователей на различные произведения.',
@@ -108,6 +217,18 @@ SPECTACULAR_SETTINGS = {
     'REDOC_DIST': 'SIDECAR',
 }
 
+# Готовая схема OpenAPI от команды build_schema; без неё схема строится
+# при первом запросе к /api/v1/doc/schema/.
+SCHEMA_DIR = BASE_DIR / 'schema'
+
+SCHEMA_MAX_AGE = 0
+
+# Ответы короче этого размера в байтах не сжимаются.
+COMPRESSION_MIN_SIZE = 1024
+
+# Число сжатых тел ответов в LRU-кеше процесса.
+COMPRESSION_CACHE_SIZE = 256
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=3),
     'AUTH_HEADER_TYPES': ('Bearer',),
@@ -139,3 +260,53 @@ EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 DOMAIN_NAME = 'yamdb.com'
 
 ADMIN_EMAIL = f'admin@{DOMAIN_NAME}'
+
+SERVER_TIMING_LOG = os.getenv('SERVER_TIMING_LOG', '') == '1'
+
+# Каталог для обмена метриками между рабочими процессами; без него
+# страница /metrics/ показывает метрики только обслужившего её процесса.
+METRICS_DIR = os.getenv('METRICS_DIR')
+
+METRICS_FLUSH_INTERVAL = 5
+
+# Страница /metrics/ доступна с этих адресов, а с остальных — только с
+# заголовком Authorization: Bearer <METRICS_TOKEN>. По умолчанию список
+# пуст: за обратным прокси на том же сервере все запросы приходят
+# с 127.0.0.1.
+METRICS_ALLOWED_IPS = tuple(
+    filter(None, os.getenv('METRICS_ALLOWED_IPS', '').split(',')),
+)
+
+METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+
+# Порог журнала медленных SQL-запросов в мс; значение 0 отключает журнал.
+SLOW_QUERY_THRESHOLD_MS = (
+    float(os.getenv('SLOW_QUERY_THRESHOLD_MS', '100')) or None
+)
+
+SLOW_QUERY_LOG = BASE_DIR / 'logs' / 'slow_queries.log'
+
+SLOW_QUERY_LOG_MAX_BYTES = 10 * 1024 * 1024
+
+SLOW_QUERY_LOG_BACKUPS = 5
+
+# Профили запросов администраторов с заголовком X-Profile: 1 и доли
+# PROFILING_SAMPLE_RATE случайных запросов.
+PROFILING_DIR = BASE_DIR / 'logs' / 'profiles'
+
+PROFILING_SAMPLE_RATE = float(os.getenv('PROFILING_SAMPLE_RATE', '0'))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'core.timing': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
@@ -1,5 +1,24 @@
 from django.apps import AppConfig
+from django.core import checks
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
 
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self) -> None:
+        from core.catalog import CATALOG_MODELS, check_shared_cache, invalidate
+        from core.middleware import check_site_middleware
+        from core.routers import check_replica_cache
+        from core.slow_queries import install
+        from core.sqlite import configure
+
+        checks.register(checks.Tags.admin)(check_site_middleware)
+        checks.register(checks.Tags.caches)(check_shared_cache)
+        checks.register(checks.Tags.caches)(check_replica_cache)
+        connection_created.connect(configure)
+        connection_created.connect(install)
+        for model in CATALOG_MODELS:
+            post_save.connect(invalidate, sender=model)
+            post_delete.connect(invalidate, sender=model)
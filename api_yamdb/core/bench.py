@@ -0,0 +1,101 @@
+import json
+import math
+import time
+from typing import Callable, Dict, List, Sequence
+
+
+class QueryTimer:
+    """Обёртка execute_wrapper, считающая число и время SQL-запросов."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(
+        self,
+        execute: Callable,
+        sql: str,
+        params: Sequence,
+        many: bool,
+        context: Dict,
+    ) -> object:
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+
+
+def percentile(values: Sequence[float], rank: float) -> float:
+    """Перцентиль с линейной интерполяцией между соседними значениями."""
+
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * rank / 100
+    lower = math.floor(position)
+    upper = math.ceil(position)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (
+        position - lower
+    )
+
+
+def summarize(durations: Sequence[float]) -> Dict[str, float]:
+    """Сводка по длительностям в секундах, результат в миллисекундах."""
+
+    total = sum(durations)
+    return {
+        'requests': len(durations),
+        'p50_ms': round(percentile(durations, 50) * 1000, 3),
+        'p95_ms': round(percentile(durations, 95) * 1000, 3),
+        'p99_ms': round(percentile(durations, 99) * 1000, 3),
+        'mean_ms': (
+            round(total / len(durations) * 1000, 3) if durations else 0.0
+        ),
+        'throughput_rps': round(len(durations) / total, 1) if total else 0.0,
+    }
+
+
+def measure(func: Callable[[int], object], repeat: int) -> List[float]:
+    durations = []
+    for index in range(repeat):
+        started = time.perf_counter()
+        func(index)
+        durations.append(time.perf_counter() - started)
+    return durations
+
+
+def compare(
+    results: Dict[str, Dict],
+    baseline: Dict[str, Dict],
+    threshold: float,
+    metrics: Sequence[str] = ('p95_ms',),
+) -> List[str]:
+    """Список регрессий относительно сохранённого прогона."""
+
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        for metric in metrics:
+            before, after = previous.get(metric), current.get(metric)
+            if not before or after is None:
+                continue
+            if after > before * (1 + threshold):
+                regressions.append(
+                    f'{name}: {metric} {before} -> {after} '
+                    f'(+{(after / before - 1) * 100:.0f}%)',
+                )
+    return regressions
+
+
+def save(file_name: str, report: Dict) -> None:
+    with open(file_name, 'w', encoding='utf-8') as file:
+        json.dump(report, file, ensure_ascii=False, indent=2)
+
+
+def load(file_name: str) -> Dict:
+    with open(file_name, encoding='utf-8') as file:
+        return json.load(file)
@@ -0,0 +1,228 @@
+import threading
+import time
+import uuid
+from operator import attrgetter
+from typing import (
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Type,
+)
+
+from django.apps import AppConfig
+from django.conf import settings
+from django.core import checks
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connection, transaction
+from django.db.models import ForeignKey, ManyToManyField, Model
+
+from core.metrics import CACHE_REQUESTS
+from reviews.models import Category, Genre
+
+VERSION_KEY = 'catalog:version'
+CATALOG_MODELS = (Category, Genre)
+# кеши, которые не видят другие рабочие процессы
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.dummy.DummyCache',
+    'django.core.cache.backends.locmem.LocMemCache',
+)
+
+
+class Snapshot(NamedTuple):
+    version: Optional[str]
+    by_pk: Dict[Type[Model], Dict[int, Model]]
+    by_slug: Dict[Type[Model], Dict[str, Model]]
+
+
+class Catalog:
+    """Кеш всех категорий и жанров в памяти процесса.
+
+    Снимок таблиц помечен версией из общего кеша Django. Запись в
+    категории или жанры сразу сбрасывает снимок процесса и после коммита
+    меняет общую версию. Остальные процессы сверяют версию не чаще раза
+    в CATALOG_VERSION_CHECK_INTERVAL секунд и перечитывают снимок.
+    """
+
+    def __init__(self) -> None:
+        self._snapshot: Optional[Snapshot] = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def snapshot(self, refresh: bool = False) -> Snapshot:
+        snapshot = self._snapshot
+        now = time.monotonic()
+        if (
+            not refresh
+            and snapshot is not None
+            and now - self._checked < settings.CATALOG_VERSION_CHECK_INTERVAL
+        ):
+            CACHE_REQUESTS.inc(cache='catalog', result='hit')
+            return snapshot
+        version = cache.get(VERSION_KEY)
+        if (
+            not refresh
+            and snapshot is not None
+            and snapshot.version == version
+        ):
+            self._checked = now
+            CACHE_REQUESTS.inc(cache='catalog', result='hit')
+            return snapshot
+        CACHE_REQUESTS.inc(cache='catalog', result='miss')
+        with self._lock:
+            if version is None:
+                version = uuid.uuid4().hex
+                if not cache.add(VERSION_KEY, version, None):
+                    version = cache.get(VERSION_KEY)
+            snapshot = self.load(version)
+            # незакоммиченные данные транзакции не должны попасть в кеш
+            if not connection.in_atomic_block:
+                self._snapshot = snapshot
+                self._checked = now
+        return snapshot
+
+    def load(self, version: Optional[str]) -> Snapshot:
+        # снимок с отстающей реплики сохранился бы под новой версией
+        by_pk, by_slug = {}, {}
+        for model in CATALOG_MODELS:
+            objects = list(model.objects.using(DEFAULT_DB_ALIAS))
+            by_pk[model] = {obj.pk: obj for obj in objects}
+            by_slug[model] = {obj.slug: obj for obj in objects}
+        return Snapshot(version, by_pk, by_slug)
+
+    def exists(self, model: Type[Model], objects: Iterable[Model]) -> bool:
+        """Проверяет одним запросом к основной базе, что объекты снимка
+        не удалены."""
+
+        pks = {obj.pk for obj in objects}
+        if not pks:
+            return True
+        found = model._default_manager.using(DEFAULT_DB_ALIAS).filter(
+            pk__in=pks,
+        )
+        return found.count() == len(pks)
+
+    def lookup(
+        self,
+        index: str,
+        model: Type[Model],
+        key: object,
+        verify: bool = False,
+    ) -> Optional[Model]:
+        """Поиск в снимке; промах перечитывает снимок из базы.
+
+        Так объект, созданный другим процессом, находится сразу, не
+        дожидаясь сверки версии. С verify найденный объект сверяется с
+        базой, и удалённый другим процессом объект не проходит проверку
+        при записи.
+        """
+
+        obj = getattr(self.snapshot(), index)[model].get(key)
+        if obj is None or verify and not self.exists(model, [obj]):
+            obj = getattr(self.snapshot(refresh=True), index)[model].get(key)
+        return obj
+
+    def get(self, model: Type[Model], pk: Optional[int]) -> Optional[Model]:
+        if pk is None:
+            return None
+        return self.lookup('by_pk', model, pk)
+
+    def get_by_slug(
+        self,
+        model: Type[Model],
+        slug: str,
+        verify: bool = False,
+    ) -> Optional[Model]:
+        return self.lookup('by_slug', model, slug, verify)
+
+    def get_many_by_slug(
+        self,
+        model: Type[Model],
+        slugs: Iterable[str],
+        verify: bool = False,
+    ) -> Dict[str, Model]:
+        """Объекты по списку слагов; при промахах, а с verify и при
+        удалённых объектах, снимок перечитывается один раз на весь
+        список."""
+
+        slugs = set(slugs)
+        objects = self.snapshot().by_slug[model]
+        if (
+            not slugs <= objects.keys()
+            or verify
+            and not self.exists(
+                model,
+                [objects[slug] for slug in slugs],
+            )
+        ):
+            objects = self.snapshot(refresh=True).by_slug[model]
+        return {slug: objects[slug] for slug in slugs if slug in objects}
+
+    def related(self, instance: Model, name: str) -> object:
+        """Связанный объект или список объектов каталога без запроса к ним.
+
+        Для связи многие-ко-многим читаются только строки промежуточной
+        таблицы, которые представление может загрузить заранее через
+        prefetch_related.
+        """
+
+        field = instance._meta.get_field(name)
+        model = field.related_model
+        if model is None or model not in CATALOG_MODELS:
+            return getattr(instance, name)
+        if isinstance(field, ForeignKey):
+            return self.get(model, getattr(instance, field.attname))
+        assert isinstance(field, ManyToManyField), name
+        through = field.remote_field.through
+        assert through is not None, name
+        source = through._meta.get_field(field.m2m_field_name())
+        target = through._meta.get_field(field.m2m_reverse_field_name())
+        assert isinstance(source, ForeignKey), source
+        assert isinstance(target, ForeignKey), target
+        accessor = source.remote_field.get_accessor_name()
+        assert accessor is not None, source
+        return sorted(
+            (
+                self.get(model, getattr(link, target.attname))
+                for link in getattr(instance, accessor).all()
+            ),
+            key=attrgetter(*(model._meta.ordering or ['pk'])),
+        )
+
+    def invalidate(self) -> None:
+        self._snapshot = None
+        transaction.on_commit(
+            lambda: cache.set(VERSION_KEY, uuid.uuid4().hex, None),
+        )
+
+
+CATALOG = Catalog()
+
+
+def invalidate(sender: Type[Model], **kwargs: dict) -> None:
+    """Обработчик post_save и post_delete категорий и жанров."""
+
+    CATALOG.invalidate()
+
+
+def check_shared_cache(
+    app_configs: Optional[Sequence[AppConfig]] = None,
+    **kwargs: object,
+) -> List[checks.CheckMessage]:
+    """Версия каталога должна быть видна всем рабочим процессам."""
+
+    if settings.CACHES['default']['BACKEND'] not in PROCESS_LOCAL_CACHES:
+        return []
+    return [
+        checks.Error(
+            'The default cache must be shared by all worker processes: it '
+            'stores the catalog version.',
+            hint=(
+                'Use FileBasedCache, a database, Redis or Memcached cache '
+                'backend.'
+            ),
+            id='core.E002',
+        ),
+    ]
@@ -0,0 +1,162 @@
+import gzip
+import hashlib
+import io
+import threading
+from typing import Callable, Dict, Optional, OrderedDict, Tuple
+
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import patch_vary_headers
+
+from core import timing
+from core.metrics import CACHE_REQUESTS
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+def compress_gzip(body: bytes) -> bytes:
+    # без времени в заголовке одинаковые тела сжимаются одинаково;
+    # gzip.compress принимает mtime только с Python 3.8
+    buffer = io.BytesIO()
+    with gzip.GzipFile(
+        fileobj=buffer,
+        mode='wb',
+        compresslevel=6,
+        mtime=0,
+    ) as file:
+        file.write(body)
+    return buffer.getvalue()
+
+
+def compress_brotli(body: bytes) -> bytes:
+    return brotli.compress(body, quality=5)
+
+
+def compress_zstd(body: bytes) -> bytes:
+    return zstandard.ZstdCompressor(level=3).compress(body)
+
+
+# доступные кодировки в порядке предпочтения сервера
+ENCODINGS: Dict[str, Callable[[bytes], bytes]] = {}
+if brotli is not None:
+    ENCODINGS['br'] = compress_brotli
+if zstandard is not None:
+    ENCODINGS['zstd'] = compress_zstd
+ENCODINGS['gzip'] = compress_gzip
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """Кодировки из Accept-Encoding с их весами q."""
+
+    weights = {}
+    for item in header.split(','):
+        coding, *params = item.strip().split(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        weight = 1.0
+        for param in params:
+            name, _, value = param.strip().partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[coding] = weight
+    return weights
+
+
+def choose_encoding(header: str) -> Optional[str]:
+    """Кодировка с наибольшим весом у клиента; при равенстве весов
+    выбирается предпочтительная для сервера."""
+
+    weights = parse_accept_encoding(header)
+    default = weights.get('*', 0.0)
+    best, best_weight = None, 0.0
+    for encoding in ENCODINGS:
+        weight = weights.get(encoding, default)
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+class CompressedCache:
+    """LRU сжатых тел ответов по хешу тела и кодировке.
+
+    Одинаковые ответы, например горячие страницы списков, сжимаются
+    один раз на процесс.
+    """
+
+    def __init__(self) -> None:
+        self._entries: OrderedDict[Tuple[bytes, str], bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, body: bytes, encoding: str) -> bytes:
+        key = (hashlib.blake2b(body, digest_size=20).digest(), encoding)
+        with self._lock:
+            compressed = self._entries.get(key)
+            if compressed is not None:
+                self._entries.move_to_end(key)
+        if compressed is not None:
+            CACHE_REQUESTS.inc(cache='compression', result='hit')
+            return compressed
+        CACHE_REQUESTS.inc(cache='compression', result='miss')
+        compressed = ENCODINGS[encoding](body)
+        with self._lock:
+            self._entries[key] = compressed
+            while len(self._entries) > settings.COMPRESSION_CACHE_SIZE:
+                self._entries.popitem(last=False)
+        return compressed
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+CACHE = CompressedCache()
+
+
+class CompressionMiddleware:
+    """Сжатие ответов gzip, а при установленных brotli и zstandard
+    также br и zstd.
+
+    Как и GZipMiddleware Django, не трогает потоковые и уже сжатые
+    ответы, ответы короче COMPRESSION_MIN_SIZE и ответы, которые сжатие
+    не уменьшает; сильный ETag становится слабым.
+    """
+
+    def __init__(self, get_response: Callable) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        response = self.get_response(request)
+        if (
+            response.streaming
+            or response.has_header('Content-Encoding')
+            or len(response.content) < settings.COMPRESSION_MIN_SIZE
+        ):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        header = request.META.get('HTTP_ACCEPT_ENCODING', '')
+        encoding = choose_encoding(header)
+        if encoding is None:
+            return response
+        with timing.measure('compress'):
+            compressed = CACHE.get(response.content, encoding)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = encoding
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = f'W/{etag}'
+        return response
@@ -0,0 +1,326 @@
+import logging
+import platform
+import time
+from io import StringIO
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+import django
+from django.core.management import call_command
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+    CommandParser,
+)
+from django.db import connection
+from django.db.models import Count
+from django.test.utils import (
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core import bench
+from reviews.models import Category, Genre, Review, Title, User
+
+BULK_SIZE = 100
+
+
+class Endpoint(NamedTuple):
+    name: str
+    method: str
+    url: Callable[[int], str]
+    client: str = 'anon'
+    data: Optional[Callable[[int], object]] = None
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks API endpoints on generated data'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            '--size',
+            type=int,
+            default=1,
+            help=(
+                'Data size multiplier: 100 users, 1000 titles, '
+                '10000 reviews and comments per unit.'
+            ),
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=50,
+            help='Number of timed requests per endpoint.',
+        )
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument(
+            '--endpoint',
+            action='append',
+            help='Run only endpoints with these names.',
+        )
+        parser.add_argument('--output', help='Save results to a json file.')
+        parser.add_argument(
+            '--compare',
+            help='Compare results with a previously saved json file.',
+        )
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=0.2,
+            help='Relative growth of p95 latency or queries to flag.',
+        )
+
+    def handle(
+        self,
+        *args: tuple,
+        size: int,
+        requests: int,
+        warmup: int,
+        endpoint: Optional[List[str]],
+        output: Optional[str],
+        compare: Optional[str],
+        threshold: float,
+        **options: object,
+    ) -> None:
+        if requests < 1:
+            raise CommandError('--requests must be at least 1.')
+        # ответы 4xx ожидаемы и не должны засорять вывод
+        logging.getLogger('django.request').setLevel(logging.ERROR)
+        setup_test_environment()
+        databases = setup_databases(verbosity=0, interactive=False)
+        try:
+            self.populate(size)
+            results = self.run(requests, warmup, endpoint)
+        finally:
+            teardown_databases(databases, verbosity=0)
+            teardown_test_environment()
+        report = {
+            'meta': {
+                'size': size,
+                'requests': requests,
+                'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+            },
+            'results': results,
+        }
+        if output:
+            bench.save(output, report)
+        if compare:
+            regressions = bench.compare(
+                results,
+                bench.load(compare)['results'],
+                threshold,
+                metrics=('p95_ms', 'queries'),
+            )
+            for line in regressions:
+                self.stderr.write(f'regression: {line}')
+            if regressions:
+                raise CommandError(f'{len(regressions)} regressions found.')
+
+    def populate(self, size: int) -> None:
+        call_command(
+            'gen_db',
+            users=100 * size,
+            titles=1000 * size,
+            reviews=10000 * size,
+            comments=10000 * size,
+            stdout=StringIO(),
+        )
+        self.admin = User.objects.create_user(
+            username='bench-admin',
+            email='bench-admin@yamdb.fake',
+            role=User.ADMIN,
+        )
+        self.user = User.objects.create_user(
+            username='bench-user',
+            email='bench-user@yamdb.fake',
+        )
+        titles = Title.objects.annotate(total=Count('reviews'))
+        self.title = titles.order_by('-total')[0]
+        self.review = (
+            Review.objects.filter(title=self.title)
+            .annotate(total=Count('comments'))
+            .order_by('-total')[0]
+        )
+        self.titles = list(Title.objects.values_list('pk', flat=True))
+        self.category = Category.objects.order_by('pk')[0]
+        self.genre = Genre.objects.order_by('pk')[0]
+        self.clients = {'anon': APIClient()}
+        for name, user in (('user', self.user), ('admin', self.admin)):
+            client = APIClient()
+            client.credentials(
+                HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}',
+            )
+            self.clients[name] = client
+
+    def get_endpoints(self) -> List[Endpoint]:
+        title, review = self.title.pk, self.review.pk
+        reviews = f'/api/v1/titles/{title}/reviews/'
+        comments = f'{reviews}{review}/comments/'
+        return [
+            Endpoint(
+                'categories-list',
+                'get',
+                lambda i: '/api/v1/categories/',
+            ),
+            Endpoint('genres-list', 'get', lambda i: '/api/v1/genres/'),
+            Endpoint('titles-list', 'get', lambda i: '/api/v1/titles/'),
+            Endpoint(
+                'titles-list-filtered',
+                'get',
+                lambda i: f'/api/v1/titles/?genre={self.genre.slug}',
+            ),
+            Endpoint(
+                'title-detail',
+                'get',
+                lambda i: f'/api/v1/titles/{title}/',
+            ),
+            Endpoint('reviews-list', 'get', lambda i: reviews),
+            Endpoint('review-detail', 'get', lambda i: f'{reviews}{review}/'),
+            Endpoint('comments-list', 'get', lambda i: comments),
+            Endpoint('users-list', 'get', lambda i: '/api/v1/users/', 'admin'),
+            Endpoint('users-me', 'get', lambda i: '/api/v1/users/me/', 'user'),
+            Endpoint(
+                'auth-signup',
+                'post',
+                lambda i: '/api/v1/auth/signup/',
+                data=lambda i: {
+                    'username': f'bench-signup-{i}',
+                    'email': f'bench-signup-{i}@yamdb.fake',
+                },
+            ),
+            Endpoint(
+                'auth-token',
+                'post',
+                lambda i: '/api/v1/auth/token/',
+                data=lambda i: {
+                    'username': 'bench-user',
+                    'confirmation_code': 'wrong',
+                },
+            ),
+            Endpoint(
+                'title-create',
+                'post',
+                lambda i: '/api/v1/titles/',
+                'admin',
+                lambda i: {
+                    'name': f'bench title {i}',
+                    'year': 2000,
+                    'description': '',
+                    'category': self.category.slug,
+                    'genre': [self.genre.slug],
+                },
+            ),
+            Endpoint(
+                'title-update',
+                'patch',
+                lambda i: f'/api/v1/titles/{title}/',
+                'admin',
+                lambda i: {'year': 1900 + i % 100},
+            ),
+            Endpoint(
+                'titles-bulk',
+                'post',
+                lambda i: '/api/v1/titles/bulk/',
+                'admin',
+                lambda i: [
+                    {
+                        'name': f'bench bulk title {i}-{index}',
+                        'year': 2000,
+                        'description': '',
+                        'category': self.category.slug,
+                        'genre': [self.genre.slug],
+                    }
+                    for index in range(BULK_SIZE)
+                ],
+            ),
+            Endpoint(
+                'review-create',
+                'post',
+                lambda i: (
+                    f'/api/v1/titles/{self.titles[i % len(self.titles)]}'
+                    '/reviews/'
+                ),
+                'user',
+                lambda i: {'text': 'bench review', 'score': 1 + i % 10},
+            ),
+            Endpoint(
+                'comment-create',
+                'post',
+                lambda i: comments,
+                'user',
+                lambda i: {'text': f'bench comment {i}'},
+            ),
+        ]
+
+    def run(
+        self,
+        requests: int,
+        warmup: int,
+        names: Optional[List[str]],
+    ) -> Dict[str, Dict]:
+        results = {}
+        for endpoint in self.get_endpoints():
+            if names and endpoint.name not in names:
+                continue
+            results[endpoint.name] = self.run_endpoint(
+                endpoint,
+                requests,
+                warmup,
+            )
+            result = results[endpoint.name]
+            self.stdout.write(
+                f'{endpoint.name:<22} p50 {result["p50_ms"]:>8.2f}ms '
+                f'p95 {result["p95_ms"]:>8.2f}ms '
+                f'p99 {result["p99_ms"]:>8.2f}ms '
+                f'{result["throughput_rps"]:>8.1f} rps '
+                f'{result["queries"]:>4} queries '
+                f'{result["sql_ms"]:>7.2f}ms sql',
+            )
+        return results
+
+    def run_endpoint(
+        self,
+        endpoint: Endpoint,
+        requests: int,
+        warmup: int,
+    ) -> Dict:
+        client = self.clients[endpoint.client]
+        send = getattr(client, endpoint.method)
+        statuses: Dict[int, int] = {}
+        queries: List[int] = []
+        sql_time: List[float] = []
+
+        def request(index: int) -> None:
+            extra = {}
+            if endpoint.data:
+                extra = {'data': endpoint.data(index), 'format': 'json'}
+            timer = bench.QueryTimer()
+            with connection.execute_wrapper(timer):
+                response = send(endpoint.url(index), **extra)
+            statuses[response.status_code] = (
+                statuses.get(response.status_code, 0) + 1
+            )
+            queries.append(timer.count)
+            sql_time.append(timer.duration)
+
+        bench.measure(request, warmup)
+        statuses.clear()
+        queries.clear()
+        sql_time.clear()
+        durations = bench.measure(
+            lambda index: request(warmup + index),
+            requests,
+        )
+        result: Dict[str, object] = dict(bench.summarize(durations))
+        result['queries'] = round(sum(queries) / len(queries), 1)
+        result['sql_ms'] = round(sum(sql_time) / len(sql_time) * 1000, 3)
+        result['statuses'] = {
+            str(status): count for status, count in sorted(statuses.items())
+        }
+        return result
@@ -0,0 +1,180 @@
+import json
+import random
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Callable, Dict, Optional
+
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+    CommandParser,
+)
+from rest_framework import renderers
+
+from core import bench
+from core.renderers import (
+    JSONRenderer,
+    MessagePackRenderer,
+    msgpack,
+    orjson,
+)
+
+WORDS = (
+    'фильм',
+    'книга',
+    'сюжет',
+    'автор',
+    'герой',
+    'review',
+    'great',
+    'plot',
+    'music',
+    '—',
+    '«цитата»',
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmarks encoding and client-side decoding of API-like payloads '
+        'with the DRF JSON renderer, core.renderers.JSONRenderer and '
+        'MessagePackRenderer'
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            '--items',
+            type=int,
+            default=100,
+            help='Objects per payload, as on one API page.',
+        )
+        parser.add_argument('--repeat', type=int, default=200)
+        parser.add_argument('--output', help='Save results to a json file.')
+
+    def handle(
+        self,
+        *args: tuple,
+        items: int,
+        repeat: int,
+        output: Optional[str],
+        **options: object,
+    ) -> None:
+        self.rng = random.Random(0)
+        payloads = {
+            'titles': self.page(self.title, items),
+            'reviews': self.page(self.review, items),
+            'typed': [self.typed(pk) for pk in range(items)],
+        }
+        # кодировщик: (рендерер, декодер на стороне клиента)
+        encoders = {
+            'drf': (renderers.JSONRenderer(), json.loads),
+            'core': (JSONRenderer(), json.loads),
+        }
+        if msgpack is not None:
+            encoders['msgpack'] = (MessagePackRenderer(), msgpack.unpackb)
+        self.stdout.write(
+            f'orjson {orjson.__version__ if orjson else "not installed"}, '
+            f'msgpack {"installed" if msgpack else "not installed"}',
+        )
+        results = {}
+        for name, payload in payloads.items():
+            expected = encoders['drf'][0].render(payload)
+            if encoders['core'][0].render(payload) != expected:
+                raise CommandError(f'{name}: renderers output differs')
+            for encoder_name, (renderer, decode) in encoders.items():
+                body = renderer.render(payload)
+                if decode(body) != json.loads(expected):
+                    raise CommandError(f'{name}: {encoder_name} data differs')
+                result = self.run(renderer, decode, payload, body, repeat)
+                results[f'{name}:{encoder_name}'] = result
+                self.stdout.write(
+                    f'{name:<8} {encoder_name:<7} {len(body):>8} bytes '
+                    f'encode p50 {result["p50_ms"]:>7.3f}ms '
+                    f'{result["mb_per_s"]:>7.1f} MB/s '
+                    f'decode p50 {result["decode_p50_ms"]:>7.3f}ms',
+                )
+        if output:
+            bench.save(output, {'results': results})
+
+    def run(
+        self,
+        renderer: renderers.BaseRenderer,
+        decode: Callable[[bytes], object],
+        payload: object,
+        body: bytes,
+        repeat: int,
+    ) -> Dict:
+        durations = bench.measure(
+            lambda index: renderer.render(payload),
+            repeat,
+        )
+        result = bench.summarize(durations)
+        result['bytes'] = len(body)
+        result['mb_per_s'] = round(
+            len(body) * len(durations) / sum(durations) / 2**20,
+            1,
+        )
+        decode_durations = bench.measure(
+            lambda index: decode(body),
+            repeat,
+        )
+        result['decode_p50_ms'] = bench.summarize(decode_durations)['p50_ms']
+        return result
+
+    def text(self, words: int) -> str:
+        return ' '.join(self.rng.choice(WORDS) for _ in range(words))
+
+    def date(self) -> str:
+        moment = datetime(2023, 1, 1, tzinfo=timezone.utc) + timedelta(
+            seconds=self.rng.randrange(10**8),
+            microseconds=self.rng.randrange(10**6),
+        )
+        return moment.isoformat().replace('+00:00', 'Z')
+
+    def page(self, item: Callable[[int], Dict], size: int) -> Dict:
+        """Страница списка в формате PageNumberPagination; объекты, как и
+        у сериализаторов DRF, в OrderedDict."""
+
+        return OrderedDict(
+            count=size * 10,
+            next='http://testserver/api/v1/titles/?page=2',
+            previous=None,
+            results=[OrderedDict(item(pk)) for pk in range(size)],
+        )
+
+    def title(self, pk: int) -> Dict:
+        return {
+            'id': pk,
+            'name': self.text(3),
+            'year': self.rng.randint(1900, 2023),
+            'description': self.text(30),
+            'rating': self.rng.choice((None, self.rng.randint(1, 10))),
+            'category': OrderedDict(name='Фильмы', slug='movie'),
+            'genre': [
+                OrderedDict(name=self.text(1), slug=f'genre-{number}')
+                for number in range(self.rng.randint(1, 3))
+            ],
+        }
+
+    def review(self, pk: int) -> Dict:
+        return {
+            'id': pk,
+            'text': self.text(60),
+            'author': f'user{self.rng.randrange(1000)}',
+            'score': self.rng.randint(1, 10),
+            'pub_date': self.date(),
+        }
+
+    def typed(self, pk: int) -> Dict:
+        """Объект с типами, которые приводит JSONEncoder DRF."""
+
+        return {
+            'id': uuid.UUID(int=self.rng.getrandbits(128)),
+            'created': datetime(2023, 1, 1, tzinfo=timezone.utc)
+            + timedelta(microseconds=self.rng.randrange(10**12)),
+            'price': Decimal(self.rng.randrange(10**6)) / 100,
+            'ratio': self.rng.random(),
+            'tags': [self.text(1) for _ in range(3)],
+        }
@@ -0,0 +1,105 @@
+from typing import Dict, List, Optional
+
+from django.core.handlers.base import BaseHandler
+from django.core.management.base import BaseCommand, CommandParser
+from django.test import RequestFactory, override_settings
+from django.test.utils import (
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+
+from core import bench
+
+MODES = {
+    # все запросы проходят SITE_MIDDLEWARE, как до SiteMiddleware
+    'full': (),
+    'lean': ('/api/',),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmarks API requests through the full and the lean middleware '
+        'stack'
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            '--url',
+            action='append',
+            help='URLs to request, /api/v1/categories/ by default.',
+        )
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--warmup', type=int, default=100)
+        parser.add_argument(
+            '--rounds',
+            type=int,
+            default=5,
+            help='Alternating rounds per mode to even out noise.',
+        )
+        parser.add_argument('--output', help='Save results to a json file.')
+
+    def handle(
+        self,
+        *args: tuple,
+        url: Optional[List[str]],
+        requests: int,
+        warmup: int,
+        rounds: int,
+        output: Optional[str],
+        **options: object,
+    ) -> None:
+        setup_test_environment()
+        databases = setup_databases(verbosity=0, interactive=False)
+        try:
+            results = {
+                path: self.run_url(path, requests, warmup, rounds)
+                for path in url or ['/api/v1/categories/']
+            }
+        finally:
+            teardown_databases(databases, verbosity=0)
+            teardown_test_environment()
+        if output:
+            bench.save(output, {'results': results})
+
+    def run_url(
+        self,
+        url: str,
+        requests: int,
+        warmup: int,
+        rounds: int,
+    ) -> Dict:
+        durations: Dict[str, List[float]] = {mode: [] for mode in MODES}
+        per_round = max(requests // rounds, 1)
+        for _ in range(rounds):
+            for mode, paths in MODES.items():
+                with override_settings(LEAN_MIDDLEWARE_PATHS=paths):
+                    # обработчик без тестового клиента: замеряется только
+                    # цепочка middleware и представление
+                    handler = BaseHandler()
+                    handler.load_middleware()
+                    factory = RequestFactory()
+                    for _ in range(warmup):
+                        handler.get_response(factory.get(url))
+                    durations[mode] += bench.measure(
+                        lambda index: handler.get_response(factory.get(url)),
+                        per_round,
+                    )
+        summaries = {mode: bench.summarize(durations[mode]) for mode in MODES}
+        # медиана устойчивее к паузам сборщика мусора, чем среднее
+        saved = summaries['full']['p50_ms'] - summaries['lean']['p50_ms']
+        results: Dict[str, object] = {
+            **summaries,
+            'saved_us': round(saved * 1000, 1),
+        }
+        for mode in MODES:
+            self.stdout.write(
+                f'{url} {mode:<5} p50 {summaries[mode]["p50_ms"]:>7.3f}ms '
+                f'mean {summaries[mode]["mean_ms"]:>7.3f}ms',
+            )
+        self.stdout.write(
+            f'{url} saved {results["saved_us"]}us per request',
+        )
+        return results
@@ -0,0 +1,202 @@
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+
+from core import bench
+from core.sqlite import Pragmas, pragma_statements
+
+SCHEMA = (
+    'CREATE TABLE title (id INTEGER PRIMARY KEY, rating REAL)',
+    'CREATE TABLE review ('
+    'id INTEGER PRIMARY KEY, title_id INTEGER NOT NULL, '
+    'score INTEGER NOT NULL, text TEXT NOT NULL)',
+    'CREATE INDEX review_title ON review (title_id)',
+)
+
+
+class Worker(threading.Thread):
+    """Поток, выполняющий операции чтения или записи до остановки."""
+
+    def __init__(
+        self,
+        database: str,
+        pragmas: Pragmas,
+        write: bool,
+        titles: int,
+        stop: threading.Event,
+    ) -> None:
+        super().__init__()
+        self.database = database
+        self.pragmas = pragmas
+        self.write = write
+        self.titles = titles
+        self.stop = stop
+        self.durations: List[float] = []
+        self.errors = 0
+
+    def run(self) -> None:
+        # как и Django, работаем в режиме autocommit с явными транзакциями
+        connection = sqlite3.connect(self.database, isolation_level=None)
+        for statement in pragma_statements(self.pragmas):
+            connection.execute(statement)
+        rng = random.Random(self.ident)
+        operation = self.insert if self.write else self.select
+        while not self.stop.is_set():
+            started = time.perf_counter()
+            try:
+                operation(connection, rng.randrange(self.titles))
+            except sqlite3.OperationalError:
+                if connection.in_transaction:
+                    connection.execute('ROLLBACK')
+                self.errors += 1
+                continue
+            self.durations.append(time.perf_counter() - started)
+        connection.close()
+
+    def insert(self, connection: sqlite3.Connection, title: int) -> None:
+        connection.execute('BEGIN')
+        connection.execute(
+            'INSERT INTO review (title_id, score, text) VALUES (?, ?, ?)',
+            (title, 1 + title % 10, 'bench review ' * 10),
+        )
+        connection.execute(
+            'UPDATE title SET rating = (SELECT AVG(score) FROM review '
+            'WHERE title_id = ?) WHERE id = ?',
+            (title, title),
+        )
+        connection.execute('COMMIT')
+
+    def select(self, connection: sqlite3.Connection, title: int) -> None:
+        connection.execute(
+            'SELECT t.id, t.rating, COUNT(r.id) FROM title t '
+            'LEFT JOIN review r ON r.title_id = t.id '
+            'WHERE t.id BETWEEN ? AND ? GROUP BY t.id',
+            (title, title + 10),
+        ).fetchall()
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmarks concurrent SQLite reads and writes with the default '
+        'and the SQLITE_PRAGMAS connection settings'
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument(
+            '--duration',
+            type=float,
+            default=5.0,
+            help='Seconds to run each configuration.',
+        )
+        parser.add_argument('--titles', type=int, default=1000)
+        parser.add_argument('--reviews', type=int, default=20000)
+        parser.add_argument('--output', help='Save results to a json file.')
+
+    def handle(
+        self,
+        *args: tuple,
+        readers: int,
+        writers: int,
+        duration: float,
+        titles: int,
+        reviews: int,
+        output: Optional[str],
+        **options: object,
+    ) -> None:
+        configurations: Dict[str, Pragmas] = {
+            # стандартные настройки sqlite3: журнал отката, таймаут 5 с
+            'default': {'busy_timeout': 5000},
+            'tuned': settings.SQLITE_PRAGMAS,
+        }
+        results = {}
+        for name, pragmas in configurations.items():
+            with tempfile.TemporaryDirectory() as directory:
+                database = os.path.join(directory, 'bench.sqlite3')
+                self.populate(database, titles, reviews)
+                results[name] = self.run(
+                    database,
+                    pragmas,
+                    titles,
+                    readers,
+                    writers,
+                    duration,
+                )
+            result = results[name]
+            self.stdout.write(
+                f'{name:<8} reads {result["reads_per_s"]:>9.1f}/s '
+                f'(p95 {result["read_p95_ms"]:>7.2f}ms) '
+                f'writes {result["writes_per_s"]:>8.1f}/s '
+                f'(p95 {result["write_p95_ms"]:>7.2f}ms) '
+                f'{result["errors"]} lock errors',
+            )
+        if output:
+            bench.save(output, {'results': results})
+
+    def populate(self, database: str, titles: int, reviews: int) -> None:
+        rng = random.Random(0)
+        connection = sqlite3.connect(database)
+        with connection:
+            for statement in SCHEMA:
+                connection.execute(statement)
+            connection.executemany(
+                'INSERT INTO title (id) VALUES (?)',
+                ((pk,) for pk in range(titles)),
+            )
+            connection.executemany(
+                'INSERT INTO review (title_id, score, text) VALUES (?, ?, ?)',
+                (
+                    (rng.randrange(titles), rng.randint(1, 10), 'review')
+                    for _ in range(reviews)
+                ),
+            )
+        connection.close()
+
+    def run(
+        self,
+        database: str,
+        pragmas: Pragmas,
+        titles: int,
+        readers: int,
+        writers: int,
+        seconds: float,
+    ) -> Dict:
+        stop = threading.Event()
+        workers = [
+            Worker(database, pragmas, write, titles, stop)
+            for write, count in ((False, readers), (True, writers))
+            for _ in range(count)
+        ]
+        for worker in workers:
+            worker.start()
+        time.sleep(seconds)
+        stop.set()
+        for worker in workers:
+            worker.join()
+        reads = [
+            duration
+            for worker in workers
+            if not worker.write
+            for duration in worker.durations
+        ]
+        writes = [
+            duration
+            for worker in workers
+            if worker.write
+            for duration in worker.durations
+        ]
+        return {
+            'reads_per_s': round(len(reads) / seconds, 1),
+            'writes_per_s': round(len(writes) / seconds, 1),
+            'read_p95_ms': round(bench.percentile(reads, 95) * 1000, 3),
+            'write_p95_ms': round(bench.percentile(writes, 95) * 1000, 3),
+            'errors': sum(worker.errors for worker in workers),
+        }
@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+
+from core import schema
+
+
+class Command(BaseCommand):
+    help = (
+        'Generates the OpenAPI schema in yaml and json, plain and gzipped, '
+        'for /api/v1/doc/schema/'
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            '--dir',
+            default=str(settings.SCHEMA_DIR),
+            help='Directory to write the schema files to.',
+        )
+
+    def handle(self, *args: tuple, **options: dict) -> None:
+        for path in schema.write(str(options['dir']), schema.generate()):
+            self.stdout.write(path)
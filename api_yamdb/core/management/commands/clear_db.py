@@ -1,5 +1,14 @@
-from django.core.management.base import BaseCommand
+import time
+from typing import List
 
+from django.contrib.admin.models import LogEntry
+from django.core.management.base import BaseCommand, CommandParser
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import QuerySet
+
+from core.catalog import CATALOG
+from core.management.commands.load_db import chunked
 from reviews.models import (
     Category,
     Comment,
@@ -14,11 +23,107 @@ from reviews.models import (
 class Command(BaseCommand):
     help = 'Clear database'
 
-    def handle(self, *args: tuple, **options: dict) -> None:
-        Comment.objects.all().delete()
-        Review.objects.all().delete()
-        GenreTitle.objects.all().delete()
-        Title.objects.all().delete()
-        Genre.objects.all().delete()
-        Category.objects.all().delete()
-        User.objects.filter(is_superuser=False)
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            '--fast',
+            action='store_true',
+            help=(
+                'Empty tables with one flush statement and delete filtered '
+                'rows by primary key, without collecting cascades in Python.'
+            ),
+        )
+        parser.add_argument(
+            '--reset-sequences',
+            action='store_true',
+            help='With --fast, reset id sequences of emptied tables.',
+        )
+
+    def get_querysets(self) -> List[QuerySet]:
+        """Очищаемые данные в порядке от зависимых таблиц к основным."""
+
+        users = {f'{User._meta.model_name}__is_superuser': False}
+        return [
+            Comment.objects.all(),
+            Review.objects.all(),
+            GenreTitle.objects.all(),
+            Title.objects.all(),
+            Genre.objects.all(),
+            Category.objects.all(),
+            LogEntry.objects.filter(user__is_superuser=False),
+            User.groups.through.objects.filter(**users),
+            User.user_permissions.through.objects.filter(**users),
+            User.objects.filter(is_superuser=False),
+        ]
+
+    def handle(
+        self,
+        *args: tuple,
+        fast: bool,
+        reset_sequences: bool,
+        **options: object,
+    ) -> None:
+        started = time.perf_counter()
+        with transaction.atomic():
+            if fast:
+                self.flush(reset_sequences)
+            else:
+                for queryset in self.get_querysets():
+                    table_started = time.perf_counter()
+                    count, _ = queryset.delete()
+                    self.report(queryset, count, table_started)
+            CATALOG.invalidate()
+        self.stdout.write(
+            f'database cleared in {time.perf_counter() - started:.2f}s',
+        )
+
+    def report(self, queryset: QuerySet, count: int, started: float) -> None:
+        self.stdout.write(
+            f'{queryset.model._meta.db_table}: deleted {count} rows '
+            f'in {time.perf_counter() - started:.2f}s',
+        )
+
+    def flush(self, reset_sequences: bool) -> None:
+        """Удаляет строки без каскадов и сигналов.
+
+        Таблицы без фильтра очищаются одним вызовом sql_flush, как в
+        команде flush: PostgreSQL усекает связанные внешними ключами
+        таблицы только в одном TRUNCATE. Из остальных таблиц строки
+        удаляются по заранее прочитанным первичным ключам, так как MySQL
+        не выполняет DELETE с подзапросом к той же таблице.
+        """
+
+        flushed, filtered = [], []
+        for queryset in self.get_querysets():
+            if queryset.query.has_filters():
+                filtered.append(queryset)
+            else:
+                flushed.append(queryset)
+        started = time.perf_counter()
+        counts = [queryset.count() for queryset in flushed]
+        statements = connection.ops.sql_flush(
+            no_style(),
+            [queryset.model._meta.db_table for queryset in flushed],
+            reset_sequences=reset_sequences,
+        )
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+        for queryset, count in zip(flushed, counts):
+            self.report(queryset, count, started)
+        for queryset in filtered:
+            started = time.perf_counter()
+            self.report(queryset, self.delete(queryset), started)
+
+    def delete(self, queryset: QuerySet) -> int:
+        meta = queryset.model._meta
+        table = connection.ops.quote_name(meta.db_table)
+        column = connection.ops.quote_name(meta.pk.column)
+        pks = list(queryset.values_list('pk', flat=True))
+        with connection.cursor() as cursor:
+            for chunk in chunked(pks, connection.features.max_query_params):
+                placeholders = ', '.join(['%s'] * len(chunk))
+                cursor.execute(
+                    f'DELETE FROM {table} WHERE {column} IN ({placeholders})',
+                    chunk,
+                )
+        return len(pks)
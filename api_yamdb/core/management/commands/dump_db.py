@@ -0,0 +1,95 @@
+import csv
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Tuple
+
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import connections
+
+from core.management.commands.load_db import LOADERS, CsvLoader, open_csv
+
+CHUNK_SIZE = 2000
+
+
+class Command(BaseCommand):
+    help = 'Dumps data to csv files in the load_db format'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            'data_dir',
+            help='Directory to write csv files to.',
+        )
+        parser.add_argument(
+            '--gzip',
+            action='store_true',
+            help='Compress csv files with gzip.',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=CHUNK_SIZE,
+            help='Number of rows fetched from the database at a time.',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=len(LOADERS),
+            help='Number of tables written at the same time.',
+        )
+
+    def handle(
+        self,
+        *args: tuple,
+        data_dir: str,
+        gzip: bool,
+        chunk_size: int,
+        workers: int,
+        **options: object,
+    ) -> None:
+        os.makedirs(data_dir, exist_ok=True)
+        loaders = [loader_class(data_dir=data_dir) for loader_class in LOADERS]
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(self.dump, loader, gzip, chunk_size)
+                for loader in loaders
+            ]
+            for future in as_completed(futures):
+                file_name, count, elapsed = future.result()
+                rate = count / elapsed if elapsed else 0
+                self.stdout.write(
+                    f'{file_name}: dumped {count} rows in {elapsed:.2f}s '
+                    f'({rate:.0f} rows/s)',
+                )
+
+    def dump(
+        self,
+        loader: CsvLoader,
+        compress: bool,
+        chunk_size: int,
+    ) -> Tuple[str, int, float]:
+        """Потоковая выгрузка таблицы в csv в формате загрузчика."""
+
+        started = time.perf_counter()
+        file_name = os.path.join(loader.data_dir, loader.file_name)
+        if compress:
+            file_name += '.gz'
+        # не get_queryset: загрузчик пользователей исключает из него
+        # суперпользователей, а их отзывы и комментарии выгружаются
+        rows = (
+            loader.get_model()
+            ._default_manager.order_by('pk')
+            .values_list(*loader.columns.values())
+            .iterator(chunk_size=chunk_size)
+        )
+        count = 0
+        try:
+            with open_csv(file_name, 'w') as file:
+                writer = csv.writer(file)
+                writer.writerow(loader.columns)
+                for row in rows:
+                    writer.writerow([loader.format(value) for value in row])
+                    count += 1
+        finally:
+            connections.close_all()
+        return file_name, count, time.perf_counter() - started
@@ -0,0 +1,274 @@
+import math
+import random
+import time
+from typing import Callable, Iterator, Type
+
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+    CommandParser,
+)
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max, Model
+
+from core.catalog import CATALOG
+from core.management.commands.load_db import BATCH_SIZE, chunked
+from reviews.models import (
+    MAX_SCORE,
+    MIN_SCORE,
+    Category,
+    Comment,
+    Genre,
+    GenreTitle,
+    Review,
+    Title,
+    User,
+)
+
+WORDS = (
+    'фильм книга песня сюжет герой финал актёр роль автор жанр сцена '
+    'история музыка голос время мир жизнь любовь война дорога город ночь '
+    'море небо огонь тайна мечта друг враг путь свет тень'
+).split()
+ROLES = (User.USER, User.MODERATOR, User.ADMIN)
+ROLE_WEIGHTS = (95, 4, 1)
+SCORE_WEIGHTS = (1, 1, 2, 3, 5, 8, 12, 16, 14, 10)
+FIRST_YEAR = 1900
+LAST_YEAR = 2023
+MAX_GENRES_PER_TITLE = 3
+
+Factory = Callable[..., Iterator[Model]]
+
+
+def zipf_rank(rng: random.Random, size: int, skew: float) -> int:
+    """Случайный номер от 0 до size - 1 с распределением Ципфа.
+
+    Используется обратная функция непрерывного степенного распределения,
+    поэтому выборка не требует памяти под таблицу весов.
+    """
+
+    if skew == 1:
+        value = math.exp(rng.random() * math.log(size + 1))
+    else:
+        power = 1 - skew
+        value = (rng.random() * ((size + 1) ** power - 1) + 1) ** (1 / power)
+    return min(int(value) - 1, size - 1)
+
+
+def zipf_share(rank: int, size: int, skew: float) -> float:
+    """Доля элементов с номером меньше rank при распределении Ципфа."""
+
+    if skew == 1:
+        return math.log(rank + 1) / math.log(size + 1)
+    power = 1 - skew
+    return ((rank + 1) ** power - 1) / ((size + 1) ** power - 1)
+
+
+class Command(BaseCommand):
+    help = 'Generates synthetic data for load testing'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        for name, default in (
+            ('users', 1000),
+            ('categories', 10),
+            ('genres', 30),
+            ('titles', 10000),
+            ('reviews', 100000),
+            ('comments', 200000),
+        ):
+            parser.add_argument(
+                f'--{name}',
+                type=int,
+                default=default,
+                help=f'Number of {name} to generate.',
+            )
+        parser.add_argument(
+            '--skew',
+            type=float,
+            default=1.1,
+            help='Zipf exponent of title, genre and user popularity.',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(
+        self,
+        *args: tuple,
+        users: int,
+        categories: int,
+        genres: int,
+        titles: int,
+        reviews: int,
+        comments: int,
+        skew: float,
+        seed: int,
+        batch_size: int,
+        **options: object,
+    ) -> None:
+        if min(users, categories, genres) < 1:
+            raise CommandError('Users, categories and genres are required.')
+        self.rng = random.Random(seed)
+        self.skew = skew
+        self.batch_size = batch_size
+        user_ids = self.insert(User, self.users, users)
+        category_ids = self.insert(Category, self.categories, categories)
+        genre_ids = self.insert(Genre, self.genres, genres)
+        title_ids = self.insert(Title, self.titles, titles, category_ids)
+        self.insert(GenreTitle, self.genre_titles, 0, title_ids, genre_ids)
+        review_ids = self.insert(
+            Review,
+            self.reviews,
+            reviews,
+            title_ids,
+            user_ids,
+        )
+        self.insert(Comment, self.comments, comments, review_ids, user_ids)
+        CATALOG.invalidate()
+
+    def insert(
+        self,
+        model: Type[Model],
+        factory: Factory,
+        count: int,
+        *relations: range,
+    ) -> range:
+        """Пакетная вставка сгенерированных строк, возвращает их id."""
+
+        first = (model.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+        started = time.perf_counter()
+        inserted = 0
+        for batch in chunked(
+            factory(first, count, *relations),
+            self.batch_size,
+        ):
+            with transaction.atomic():
+                model.objects.bulk_create(batch)
+            inserted += len(batch)
+        statements = connection.ops.sequence_reset_sql(no_style(), [model])
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+        elapsed = time.perf_counter() - started
+        rate = inserted / elapsed if elapsed else 0
+        self.stdout.write(
+            f'{model._meta.db_table}: generated {inserted} rows '
+            f'in {elapsed:.2f}s ({rate:.0f} rows/s)',
+        )
+        return range(first, first + inserted)
+
+    def text(self, min_words: int, max_words: int) -> str:
+        size = self.rng.randint(min_words, max_words)
+        words = self.rng.choices(WORDS, k=size)
+        return ' '.join(words).capitalize()
+
+    def users(self, first: int, count: int) -> Iterator[Model]:
+        roles = self.rng.choices(ROLES, ROLE_WEIGHTS, k=count)
+        for pk, role in zip(range(first, first + count), roles):
+            yield User(
+                id=pk,
+                username=f'user{pk}',
+                email=f'user{pk}@yamdb.fake',
+                role=role,
+            )
+
+    def categories(self, first: int, count: int) -> Iterator[Model]:
+        for pk in range(first, first + count):
+            yield Category(id=pk, name=self.text(1, 2), slug=f'category-{pk}')
+
+    def genres(self, first: int, count: int) -> Iterator[Model]:
+        for pk in range(first, first + count):
+            yield Genre(id=pk, name=self.text(1, 2), slug=f'genre-{pk}')
+
+    def titles(
+        self,
+        first: int,
+        count: int,
+        categories: range,
+    ) -> Iterator[Model]:
+        for pk in range(first, first + count):
+            yield Title(
+                id=pk,
+                name=self.text(1, 4),
+                year=self.rng.randint(FIRST_YEAR, LAST_YEAR),
+                description=self.text(0, 30),
+                category_id=categories[
+                    zipf_rank(self.rng, len(categories), self.skew)
+                ],
+            )
+
+    def genre_titles(
+        self,
+        first: int,
+        count: int,
+        titles: range,
+        genres: range,
+    ) -> Iterator[Model]:
+        pk = first
+        limit = min(MAX_GENRES_PER_TITLE, len(genres))
+        for title_id in titles:
+            ranks = {
+                zipf_rank(self.rng, len(genres), self.skew)
+                for _ in range(self.rng.randint(1, limit))
+            }
+            for rank in sorted(ranks):
+                yield GenreTitle(
+                    id=pk,
+                    title_id=title_id,
+                    genre_id=genres[rank],
+                )
+                pk += 1
+
+    def reviews(
+        self,
+        first: int,
+        count: int,
+        titles: range,
+        users: range,
+    ) -> Iterator[Model]:
+        """Отзывы распределены по произведениям по закону Ципфа.
+
+        У одного произведения не больше одного отзыва от автора, поэтому
+        число отзывов на произведение ограничено числом пользователей.
+        """
+
+        pk = first
+        total = 0
+        for rank, title_id in enumerate(titles):
+            share = zipf_share(rank + 1, len(titles), self.skew)
+            reviews_count = min(round(count * share) - total, len(users))
+            total += reviews_count
+            authors = self.rng.sample(users, reviews_count)
+            scores = self.rng.choices(
+                range(MIN_SCORE, MAX_SCORE + 1),
+                SCORE_WEIGHTS,
+                k=reviews_count,
+            )
+            for author_id, score in zip(authors, scores):
+                yield Review(
+                    id=pk,
+                    title_id=title_id,
+                    author_id=author_id,
+                    score=score,
+                    text=self.text(3, 60),
+                )
+                pk += 1
+
+    def comments(
+        self,
+        first: int,
+        count: int,
+        reviews: range,
+        users: range,
+    ) -> Iterator[Model]:
+        if not reviews:
+            return
+        for pk in range(first, first + count):
+            yield Comment(
+                id=pk,
+                review_id=reviews[
+                    zipf_rank(self.rng, len(reviews), self.skew)
+                ],
+                author_id=users[zipf_rank(self.rng, len(users), self.skew)],
+                text=self.text(1, 30),
+            )
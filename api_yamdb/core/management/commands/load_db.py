@@ -1,9 +1,44 @@
 import csv
-from typing import Dict
+import gzip
+import hashlib
+import os
+import sys
+import time
+from collections import Counter, deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from typing import (
+    IO,
+    Any,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+    Union,
+)
 
-from django.contrib.auth.base_user import AbstractBaseUser
-from django.core.management.base import BaseCommand
+import django
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+    CommandParser,
+    OutputWrapper,
+)
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Field, Model, QuerySet
 
+from core.catalog import CATALOG
 from reviews.models import (
     Category,
     Comment,
@@ -14,128 +49,489 @@ from reviews.models import (
     User,
 )
 
+DATA_DIR = settings.BASE_DIR / 'static' / 'data'
+BATCH_SIZE = 1000
+PROGRESS_INTERVAL = 5
+
 
 class Command(BaseCommand):
     help = 'Loads data from csv files'
 
-    def handle(self, *args: tuple, **options: dict) -> None:
-        UsersLoader().read()
-        CategoryLoader().read()
-        GenreLoader().read()
-        TitleLoader().read()
-        GenreTitleLoader().read()
-        ReviewLoader().read()
-        CommentLoader().read()
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='Number of rows inserted per transaction.',
+        )
+        parser.add_argument(
+            '--data-dir',
+            default=DATA_DIR,
+            help='Directory with csv files, plain or gzipped.',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help=(
+                'Number of processes parsing csv rows. Tables without '
+                'mutual dependencies are loaded at the same time.'
+            ),
+        )
+        parser.add_argument(
+            '--upsert',
+            action='store_true',
+            help=(
+                'Insert new rows and update changed ones instead of '
+                'failing on existing primary keys.'
+            ),
+        )
+        parser.add_argument(
+            '--delete-missing',
+            action='store_true',
+            help='With --upsert, delete rows that are absent from csv files.',
+        )
+
+    def handle(
+        self,
+        *args: tuple,
+        batch_size: int,
+        data_dir: Union[str, Path],
+        workers: int,
+        upsert: bool,
+        delete_missing: bool,
+        **options: object,
+    ) -> None:
+        if delete_missing and not upsert:
+            raise CommandError('--delete-missing requires --upsert.')
+        loaders = [
+            loader_class(
+                batch_size=batch_size,
+                stdout=self.stdout,
+                upsert=upsert,
+                data_dir=data_dir,
+            )
+            for loader_class in LOADERS
+        ]
+        scheduler = LoaderScheduler(loaders, workers=workers)
+        scheduler.run()
+        if delete_missing:
+            for loader in reversed(scheduler.order()):
+                loader.delete_missing()
+        # bulk-операции не отправляют сигналы, сбрасывающие кеш каталога
+        CATALOG.invalidate()
+
+
+def chunked(items: Iterable, size: Optional[int]) -> Iterator[list]:
+    iterator = iter(items)
+    chunk = list(islice(iterator, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(iterator, size))
+
+
+def open_csv(file_name: str, mode: str = 'r') -> IO[str]:
+    if file_name.endswith('.gz'):
+        return gzip.open(file_name, mode + 't', encoding='utf-8', newline='')
+    return open(file_name, mode, encoding='utf-8', newline='')
+
+
+def row_hash(values: Iterable) -> str:
+    return hashlib.sha1(repr(tuple(values)).encode()).hexdigest()
 
 
 class CsvLoader:
+    """Потоковая загрузка csv-файла пачками через bulk_create.
+
+    В режиме upsert строки сравниваются с уже загруженными по ключу
+    и хешу содержимого: новые вставляются, изменённые обновляются.
+    """
+
+    data_dir: Union[str, Path] = DATA_DIR
+    model: Optional[Type[Model]] = None
+    columns: Dict[str, str] = {}
+
+    def __init__(
+        self,
+        batch_size: int = BATCH_SIZE,
+        stdout: Optional[OutputWrapper] = None,
+        upsert: bool = False,
+        data_dir: Optional[Union[str, Path]] = None,
+    ) -> None:
+        if data_dir is not None:
+            self.data_dir = data_dir
+        self.batch_size = batch_size
+        self.stdout = stdout or OutputWrapper(sys.stdout)
+        self.upsert = upsert
+        self.seen: Set[Any] = set()
+        self.stats: Counter = Counter()
+
     def get_file_name(self) -> str:
         assert isinstance(self.file_name, str), (
             "'%s' should either include a `file_name` attribute, "
             "or override the `get_file_name()` method."
             % self.__class__.__name__
         )
-        return self.file_name
+        file_name = Path(self.data_dir) / self.file_name
+        compressed = file_name.with_name(file_name.name + '.gz')
+        if not file_name.exists() and compressed.exists():
+            return str(compressed)
+        return str(file_name)
 
-    def read(self) -> None:
-        file_name = self.get_file_name()
-        print(f'load data from {file_name}')
-        with open(file_name) as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                instance = self.parse(row)
-                instance.save()
+    def get_model(self) -> Type[Model]:
+        assert self.model is not None, (
+            "'%s' should include a `model` attribute."
+            % self.__class__.__name__
+        )
+        return self.model
 
+    def get_queryset(self) -> QuerySet:
+        return self.get_model()._default_manager.all()
 
-class UsersLoader(CsvLoader):
-    file_name = 'static/data/users.csv'
-
-    def parse(self, data: Dict[str, str]) -> AbstractBaseUser:
-        instance = User(
-            id=data.get('id'),
-            username=data.get('username'),
-            email=data.get('email'),
-            role=data.get('role'),
-            bio=data.get('bio'),
-            first_name=data.get('first_name'),
-            last_name=data.get('last_name'),
+    def get_field(self, attname: str) -> Field:
+        field = self.get_model()._meta.get_field(attname)
+        assert isinstance(field, Field), (
+            "'%s' should map columns to concrete model fields."
+            % self.__class__.__name__
         )
-        return instance
+        return field
 
+    def get_compare_fields(self) -> List[str]:
+        """Поля, по которым считается хеш содержимого строки.
 
-class CategoryLoader(CsvLoader):
-    file_name = 'static/data/category.csv'
+        Первичный ключ и поля с auto_now/auto_now_add не сравниваются:
+        при вставке их значения всё равно выставляет Django.
+        """
+        fields = []
+        for attname in self.columns.values():
+            field = self.get_field(attname)
+            if field.primary_key or getattr(field, 'auto_now_add', False):
+                continue
+            fields.append(field.attname)
+        return fields
+
+    def clean(self, attname: str, value: Optional[str]) -> object:
+        field = self.get_field(attname)
+        if value in (None, '') and field.null:
+            return None
+        return field.to_python(value)
 
-    def parse(self, data: Dict[str, str]) -> Category:
-        instance = Category(
-            id=data.get('id'),
-            name=data.get('name'),
-            slug=data.get('slug'),
+    def parse(self, data: Dict[str, str]) -> Model:
+        return self.get_model()(
+            **{
+                attname: self.clean(attname, data.get(column))
+                for column, attname in self.columns.items()
+            },
         )
-        return instance
 
+    def format(self, value: object) -> object:
+        """Обратное к clean преобразование значения для записи в csv."""
 
-class GenreLoader(CsvLoader):
-    file_name = 'static/data/genre.csv'
+        if value is None:
+            return ''
+        if isinstance(value, datetime):
+            return value.isoformat().replace('+00:00', 'Z')
+        return value
 
-    def parse(self, data: Dict[str, str]) -> Genre:
-        instance = Genre(
-            id=data.get('id'),
-            name=data.get('name'),
-            slug=data.get('slug'),
-        )
-        return instance
+    def rows(self) -> Iterator[Dict[str, str]]:
+        with open_csv(self.get_file_name()) as file:
+            yield from csv.DictReader(file)
 
+    def raw_batches(self) -> Iterator[List[Dict[str, str]]]:
+        return chunked(self.rows(), self.batch_size)
 
-class TitleLoader(CsvLoader):
-    file_name = 'static/data/titles.csv'
-
-    def parse(self, data: Dict[str, str]) -> Title:
-        instance = Title(
-            id=data.get('id'),
-            name=data.get('name'),
-            year=data.get('year'),
-            category_id=data.get('category'),
+    def batches(self) -> Iterator[List[Model]]:
+        return chunked(map(self.parse, self.rows()), self.batch_size)
+
+    def dependencies(self) -> List[Type[Model]]:
+        meta = self.get_model()._meta
+        fields = [meta.get_field(attname) for attname in self.columns.values()]
+        return [
+            field.related_model
+            for field in fields
+            if field.is_relation and field.related_model is not None
+        ]
+
+    def existing_hashes(self, pks: List[Any]) -> Dict[Any, str]:
+        fields = self.get_compare_fields()
+        hashes = {}
+        max_params = connection.features.max_query_params
+        for chunk in chunked(pks, max_params):
+            rows = (
+                self.get_model()
+                ._default_manager.filter(
+                    pk__in=chunk,
+                )
+                .values_list('pk', *fields)
+            )
+            for pk, *values in rows:
+                hashes[pk] = row_hash(values)
+        return hashes
+
+    def write(self, batch: List[Model]) -> None:
+        manager = self.get_model()._default_manager
+        if not self.upsert:
+            with transaction.atomic():
+                manager.bulk_create(batch)
+            self.stats['inserted'] += len(batch)
+            return
+        fields = self.get_compare_fields()
+        existing = self.existing_hashes([instance.pk for instance in batch])
+        created, changed = [], []
+        for instance in batch:
+            self.seen.add(instance.pk)
+            digest = existing.get(instance.pk)
+            if digest is None:
+                created.append(instance)
+            elif digest != row_hash(
+                getattr(instance, field) for field in fields
+            ):
+                changed.append(instance)
+        with transaction.atomic():
+            manager.bulk_create(created)
+            if changed:
+                manager.bulk_update(changed, fields)
+        self.stats['inserted'] += len(created)
+        self.stats['updated'] += len(changed)
+        self.stats['unchanged'] += len(batch) - len(created) - len(changed)
+
+    def delete_missing(self) -> int:
+        missing = [
+            pk
+            for pk in self.get_queryset().values_list('pk', flat=True)
+            if pk not in self.seen
+        ]
+        max_params = connection.features.max_query_params
+        with transaction.atomic():
+            for chunk in chunked(missing, max_params):
+                self.get_queryset().filter(pk__in=chunk).delete()
+        self.stdout.write(
+            f'  deleted {len(missing)} rows missing from '
+            f'{self.get_file_name()}',
+        )
+        return len(missing)
+
+    def reset_sequences(self) -> None:
+        statements = connection.ops.sequence_reset_sql(
+            no_style(),
+            [self.get_model()],
         )
-        return instance
+        if statements:
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
 
+    def start(self) -> None:
+        self.stdout.write(f'load data from {self.get_file_name()}')
+        self.started = self.reported = time.perf_counter()
+        self.count = 0
 
-class GenreTitleLoader(CsvLoader):
-    file_name = 'static/data/genre_title.csv'
+    def consume(self, batch: List[Model]) -> None:
+        self.write(batch)
+        self.count += len(batch)
+        now = time.perf_counter()
+        if now - self.reported >= PROGRESS_INTERVAL:
+            self.report(self.count, now - self.started)
+            self.reported = now
 
-    def parse(self, data: Dict[str, str]) -> GenreTitle:
-        instance = GenreTitle(
-            id=data.get('id'),
-            title_id=data.get('title_id'),
-            genre_id=data.get('genre_id'),
+    def finish(self) -> int:
+        self.reset_sequences()
+        self.report(self.count, time.perf_counter() - self.started, True)
+        return self.count
+
+    def read(self) -> int:
+        self.start()
+        for batch in self.batches():
+            self.consume(batch)
+        return self.finish()
+
+    def report(self, count: int, elapsed: float, done: bool = False) -> None:
+        rate = count / elapsed if elapsed else 0
+        self.stdout.write(
+            f'  {self.file_name}: {"loaded" if done else "..."} {count} rows '
+            f'in {elapsed:.2f}s ({rate:.0f} rows/s)',
         )
-        return instance
+        if done and self.upsert:
+            self.stdout.write(
+                f'  {self.file_name}: '
+                + ', '.join(
+                    f'{key} {self.stats[key]}'
+                    for key in ('inserted', 'updated', 'unchanged')
+                ),
+            )
+
+
+class UsersLoader(CsvLoader):
+    file_name = 'users.csv'
+    model = User
+    columns = {
+        'id': 'id',
+        'username': 'username',
+        'email': 'email',
+        'role': 'role',
+        'bio': 'bio',
+        'first_name': 'first_name',
+        'last_name': 'last_name',
+    }
+
+    def get_queryset(self) -> QuerySet:
+        # delete_missing не удаляет суперпользователей, которых нет в csv
+        return super().get_queryset().filter(is_superuser=False)
+
+
+class CategoryLoader(CsvLoader):
+    file_name = 'category.csv'
+    model = Category
+    columns = {'id': 'id', 'name': 'name', 'slug': 'slug'}
+
+
+class GenreLoader(CsvLoader):
+    file_name = 'genre.csv'
+    model = Genre
+    columns = {'id': 'id', 'name': 'name', 'slug': 'slug'}
+
+
+class TitleLoader(CsvLoader):
+    file_name = 'titles.csv'
+    model = Title
+    columns = {
+        'id': 'id',
+        'name': 'name',
+        'year': 'year',
+        'category': 'category_id',
+    }
+
+
+class GenreTitleLoader(CsvLoader):
+    file_name = 'genre_title.csv'
+    model = GenreTitle
+    columns = {'id': 'id', 'title_id': 'title_id', 'genre_id': 'genre_id'}
 
 
 class ReviewLoader(CsvLoader):
-    file_name = 'static/data/review.csv'
-
-    def parse(self, data: Dict[str, str]) -> Review:
-        instance = Review(
-            id=data.get('id'),
-            title_id=data.get('title_id'),
-            text=data.get('text'),
-            author_id=data.get('author'),
-            score=data.get('score'),
-            pub_date=data.get('pub_date'),
-        )
-        return instance
+    file_name = 'review.csv'
+    model = Review
+    columns = {
+        'id': 'id',
+        'title_id': 'title_id',
+        'text': 'text',
+        'author': 'author_id',
+        'score': 'score',
+        'pub_date': 'pub_date',
+    }
 
 
 class CommentLoader(CsvLoader):
-    file_name = 'static/data/comments.csv'
-
-    def parse(self, data: Dict[str, str]) -> Comment:
-        instance = Comment(
-            id=data.get('id'),
-            review_id=data.get('review_id'),
-            text=data.get('text'),
-            author_id=data.get('author'),
-            pub_date=data.get('pub_date'),
-        )
-        return instance
+    file_name = 'comments.csv'
+    model = Comment
+    columns = {
+        'id': 'id',
+        'review_id': 'review_id',
+        'text': 'text',
+        'author': 'author_id',
+        'pub_date': 'pub_date',
+    }
+
+
+LOADERS = (
+    UsersLoader,
+    CategoryLoader,
+    GenreLoader,
+    TitleLoader,
+    GenreTitleLoader,
+    ReviewLoader,
+    CommentLoader,
+)
+
+
+def init_worker() -> None:
+    if not apps.ready:
+        django.setup()
+
+
+def parse_rows(
+    loader_class: Type[CsvLoader],
+    rows: List[Dict[str, str]],
+) -> List[Model]:
+    loader = loader_class()
+    return [loader.parse(row) for row in rows]
+
+
+class LoaderScheduler:
+    """Загрузка таблиц в порядке графа зависимостей по внешним ключам.
+
+    Таблицы одного уровня графа загружаются одновременно: разбор и
+    валидация строк идут в пуле процессов, а запись в базу выполняет
+    единственный писатель — текущий процесс.
+    """
+
+    def __init__(self, loaders: Sequence[CsvLoader], workers: int = 1) -> None:
+        self.loaders = loaders
+        self.workers = workers
+
+    def levels(self) -> List[List[CsvLoader]]:
+        by_model = {loader.get_model(): loader for loader in self.loaders}
+        pending = {
+            loader: {
+                by_model[model]
+                for model in loader.dependencies()
+                if model in by_model and by_model[model] is not loader
+            }
+            for loader in self.loaders
+        }
+        levels = []
+        while pending:
+            level = [loader for loader, deps in pending.items() if not deps]
+            if not level:
+                raise CommandError(
+                    'Circular dependency between loaders: '
+                    + ', '.join(type(loader).__name__ for loader in pending),
+                )
+            for loader in level:
+                del pending[loader]
+            for deps in pending.values():
+                deps.difference_update(level)
+            levels.append(level)
+        return levels
+
+    def order(self) -> List[CsvLoader]:
+        return [loader for level in self.levels() for loader in level]
+
+    def run(self) -> None:
+        if self.workers <= 1:
+            for loader in self.order():
+                loader.read()
+            return
+        with ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=init_worker,
+        ) as pool:
+            for level in self.levels():
+                self.run_level(pool, level)
+
+    def run_level(self, pool: Executor, level: List[CsvLoader]) -> None:
+        sources = deque((loader, loader.raw_batches()) for loader in level)
+        pending: Deque[Tuple[CsvLoader, Future]] = deque()
+        in_flight: Counter = Counter()
+        for loader in level:
+            loader.start()
+        while sources or pending:
+            while sources and len(pending) < self.workers * 2:
+                loader, chunks = sources.popleft()
+                rows = next(chunks, None)
+                if rows is None:
+                    if not in_flight[loader]:
+                        loader.finish()
+                    continue
+                future = pool.submit(parse_rows, type(loader), rows)
+                pending.append((loader, future))
+                in_flight[loader] += 1
+                sources.append((loader, chunks))
+            if not pending:
+                continue
+            loader, future = pending.popleft()
+            loader.consume(future.result())
+            in_flight[loader] -= 1
+            exhausted = all(source is not loader for source, _ in sources)
+            if exhausted and not in_flight[loader]:
+                loader.finish()
@@ -0,0 +1,114 @@
+import io
+import pstats
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+    CommandParser,
+)
+
+from core.profiling import load_profiles
+
+
+class Command(BaseCommand):
+    help = 'Lists and summarizes captured request profiles'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            '--dir',
+            dest='directory',
+            default=str(settings.PROFILING_DIR),
+            help='Directory with profiles.',
+        )
+        parser.add_argument(
+            '--url-name',
+            help='List profiles of one URL name instead of totals.',
+        )
+        parser.add_argument(
+            '--show',
+            help=(
+                'Print the call graph summary and slowest queries of '
+                'a profile id, or of all profiles of a URL name.'
+            ),
+        )
+        parser.add_argument(
+            '--sort',
+            default='cumulative',
+            help='pstats sort key for --show.',
+        )
+        parser.add_argument('--limit', type=int, default=20)
+
+    def handle(
+        self,
+        *args: tuple,
+        directory: str,
+        url_name: Optional[str],
+        show: Optional[str],
+        sort: str,
+        limit: int,
+        **options: object,
+    ) -> None:
+        if show:
+            self.show(directory, show, sort, limit)
+            return
+        profiles = load_profiles(directory, url_name)
+        if not profiles:
+            raise CommandError('No profiles captured.')
+        if url_name:
+            for profile in profiles:
+                self.stdout.write(
+                    f'{profile["id"]:<60} {profile["method"]:<6} '
+                    f'{profile["status"]} {profile["duration_ms"]:>9.1f}ms '
+                    f'{len(profile["queries"]):>4} queries '
+                    f'{profile["sql_ms"]:>8.1f}ms sql  {profile["path"]}',
+                )
+            return
+        groups: Dict[str, List[Dict]] = {}
+        for profile in profiles:
+            groups.setdefault(profile['url_name'], []).append(profile)
+        for name, group in sorted(groups.items()):
+            durations = [profile['duration_ms'] for profile in group]
+            queries = [len(profile['queries']) for profile in group]
+            sql = [profile['sql_ms'] for profile in group]
+            self.stdout.write(
+                f'{name:<30} {len(group):>4} profiles '
+                f'mean {sum(durations) / len(group):>9.1f}ms '
+                f'max {max(durations):>9.1f}ms '
+                f'{sum(queries) / len(group):>6.1f} queries '
+                f'{sum(sql) / len(group):>8.1f}ms sql',
+            )
+
+    def show(
+        self,
+        directory: str,
+        profile_id: str,
+        sort: str,
+        limit: int,
+    ) -> None:
+        name, _, stem = profile_id.partition('/')
+        profiles = [
+            profile
+            for profile in load_profiles(directory, name)
+            if not stem or profile['id'] == profile_id
+        ]
+        if not profiles:
+            raise CommandError(f'Profile {profile_id} not found.')
+        out = io.StringIO()
+        stats = pstats.Stats(
+            *(profile['stats'] for profile in profiles),
+            stream=out,
+        )
+        stats.sort_stats(sort).print_stats(limit)
+        self.stdout.write(
+            f'{len(profiles)} profiles of {name}\n{out.getvalue()}',
+        )
+        queries = sorted(
+            (query for profile in profiles for query in profile['queries']),
+            key=lambda query: query['duration_ms'],
+            reverse=True,
+        )
+        self.stdout.write('slowest queries:')
+        for query in queries[:limit]:
+            self.stdout.write(f'{query["duration_ms"]:>9.3f}ms {query["sql"]}')
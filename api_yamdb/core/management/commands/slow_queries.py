@@ -0,0 +1,73 @@
+from typing import List, Optional
+
+from django.conf import settings
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+    CommandParser,
+)
+
+from core.slow_queries import log_files, read_entries, summarize
+
+
+class Command(BaseCommand):
+    help = 'Summarizes the slow query log, worst statements first'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            'files',
+            nargs='*',
+            help='Log files to read, the configured log by default.',
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=10,
+            help='Number of statements to show.',
+        )
+        parser.add_argument('--view', help='Show only queries of this view.')
+        parser.add_argument(
+            '--explain',
+            action='store_true',
+            help='Print captured query plans.',
+        )
+
+    def handle(
+        self,
+        *args: tuple,
+        files: List[str],
+        limit: int,
+        view: Optional[str],
+        explain: bool,
+        **options: object,
+    ) -> None:
+        files = files or log_files(str(settings.SLOW_QUERY_LOG))
+        if not files:
+            raise CommandError('Slow query log is empty.')
+        entries = read_entries(files)
+        if view:
+            entries = [entry for entry in entries if entry.get('view') == view]
+        statements = summarize(entries)
+        self.stdout.write(
+            f'{len(entries)} slow queries, '
+            f'{len(statements)} distinct statements',
+        )
+        for statement in statements[:limit]:
+            views = ', '.join(
+                f'{name} ({count})'
+                for name, count in sorted(
+                    statement['views'].items(),
+                    key=lambda item: -item[1],
+                )
+            )
+            self.stdout.write(
+                f'\n{statement["total_ms"]:.1f}ms total, '
+                f'{statement["count"]} calls, '
+                f'{statement["total_ms"] / statement["count"]:.1f}ms mean, '
+                f'{statement["max_ms"]:.1f}ms max\n'
+                f'  views: {views}\n'
+                f'  {statement["sql"]}',
+            )
+            if explain and statement['explain']:
+                for line in statement['explain']:
+                    self.stdout.write(f'    {line}')
@@ -0,0 +1,442 @@
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import (
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from django.conf import settings
+from django.core.files import locks
+from django.http import HttpRequest, HttpResponse
+
+Key = Tuple[str, Tuple[str, ...]]
+Value = Union[float, List[float]]
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+DURATION_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+PROCESS_FILE = re.compile(r'metrics-(\d+)\.json')
+# Итоги завершившихся процессов.
+DEAD_FILE = 'metrics-dead.json'
+LOCK_FILE = 'metrics.lock'
+
+
+def merge(target: Dict[Key, Value], source: Dict[Key, Value]) -> None:
+    for key, value in source.items():
+        if isinstance(value, list):
+            counts = target.setdefault(key, [0.0] * len(value))
+            assert isinstance(counts, list)
+            for index, item in enumerate(value):
+                counts[index] += item
+        else:
+            current = target.get(key, 0.0)
+            assert not isinstance(current, list)
+            target[key] = current + value
+
+
+def read(path: str) -> Dict[Key, Value]:
+    with open(path) as file:
+        samples = json.load(file)
+    return {(name, tuple(labels)): value for name, labels, value in samples}
+
+
+def write(path: str, values: Dict[Key, Value]) -> None:
+    """Заменяет файл целиком: каждый поток пишет в свой временный файл,
+    так что одновременные записи не мешают друг другу."""
+
+    samples = [
+        [name, list(labels), value] for (name, labels), value in values.items()
+    ]
+    descriptor, temp_name = tempfile.mkstemp(
+        dir=os.path.dirname(path),
+        suffix='.tmp',
+    )
+    try:
+        with os.fdopen(descriptor, 'w') as file:
+            json.dump(samples, file)
+        os.replace(temp_name, path)
+    except BaseException:
+        os.unlink(temp_name)
+        raise
+
+
+def pid_exists(pid: int) -> bool:
+    if os.name != 'posix':
+        # на Windows os.kill завершает процесс
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+@contextmanager
+def locked(directory: str, flags: int) -> Iterator[None]:
+    """Блокировка METRICS_DIR между процессами."""
+
+    with open(os.path.join(directory, LOCK_FILE), 'a') as file:
+        locks.lock(file, flags)
+        try:
+            yield
+        finally:
+            locks.unlock(file)
+
+
+def escape(value: str) -> str:
+    return value.replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+class Registry:
+    """Хранилище метрик процесса.
+
+    Каждый поток пишет в собственный словарь, поэтому запись метрики не
+    берёт блокировок. Словари потоков сводятся при сборе метрик, а при
+    заданном METRICS_DIR — сбрасываются в файл процесса, чтобы страница
+    метрик суммировала значения всех рабочих процессов.
+    """
+
+    def __init__(self) -> None:
+        self.families: Dict[str, 'Metric'] = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._prune_lock = threading.Lock()
+        self._pruned_pid: Optional[int] = None
+        self._shards: List[Tuple[threading.Thread, Dict[Key, Value]]] = []
+        self._retired: Dict[Key, Value] = {}
+        self._flushed = time.monotonic()
+
+    def register(self, metric: 'Metric') -> None:
+        self.families[metric.name] = metric
+
+    def shard(self) -> Dict[Key, Value]:
+        try:
+            return self._local.values
+        except AttributeError:
+            values: Dict[Key, Value] = {}
+            self._local.values = values
+            with self._lock:
+                self._shards.append((threading.current_thread(), values))
+            return values
+
+    def collect(self) -> Dict[Key, Value]:
+        """Сумма значений всех потоков процесса."""
+
+        with self._lock:
+            alive = []
+            for thread, values in self._shards:
+                if thread.is_alive():
+                    alive.append((thread, values))
+                else:
+                    merge(self._retired, values.copy())
+            self._shards = alive
+            total: Dict[Key, Value] = {}
+            merge(total, self._retired)
+            for _, values in alive:
+                merge(total, values.copy())
+        return total
+
+    def flush(self) -> None:
+        """Сохраняет метрики процесса в его файл в METRICS_DIR.
+
+        Первый сброс в процессе переносит в DEAD_FILE файлы завершившихся
+        процессов.
+        """
+
+        directory = settings.METRICS_DIR
+        if not directory:
+            return
+        self._flushed = time.monotonic()
+        os.makedirs(directory, exist_ok=True)
+        with self._prune_lock:
+            if self._pruned_pid != os.getpid():
+                self.prune(directory)
+                self._pruned_pid = os.getpid()
+        write(
+            os.path.join(directory, f'metrics-{os.getpid()}.json'),
+            self.collect(),
+        )
+
+    def prune(self, directory: str) -> None:
+        """Переносит итоги завершившихся процессов в DEAD_FILE.
+
+        Итоги остаются в сумме, поэтому счётчики не уменьшаются при
+        перезапуске рабочих процессов. Файл с PID текущего процесса до
+        его первого сброса оставлен прежним процессом с тем же PID.
+        """
+
+        dead_file = os.path.join(directory, DEAD_FILE)
+        with locked(directory, locks.LOCK_EX):
+            retired = []
+            for entry in os.scandir(directory):
+                match = PROCESS_FILE.fullmatch(entry.name)
+                if match is None:
+                    continue
+                pid = int(match[1])
+                if pid == os.getpid() or not pid_exists(pid):
+                    retired.append(entry.path)
+            if not retired:
+                return
+            total: Dict[Key, Value] = {}
+            for path in [dead_file, *retired]:
+                try:
+                    merge(total, read(path))
+                except (OSError, ValueError):
+                    continue
+            write(dead_file, total)
+            for path in retired:
+                os.unlink(path)
+
+    def maybe_flush(self) -> None:
+        """Сброс по METRICS_FLUSH_INTERVAL после запроса.
+
+        Если сброс уже идёт в другом потоке, запрос его не ждёт, а ошибки
+        сброса только пишутся в журнал.
+        """
+
+        interval = settings.METRICS_FLUSH_INTERVAL
+        if time.monotonic() - self._flushed < interval:
+            return
+        if not self._flush_lock.acquire(blocking=False):
+            return
+        try:
+            self.flush()
+        except Exception:
+            logger.exception('Failed to flush metrics')
+        finally:
+            self._flush_lock.release()
+
+    def aggregate(self) -> Dict[Key, Value]:
+        """Сумма метрик всех процессов, включая текущий."""
+
+        directory = settings.METRICS_DIR
+        if not directory:
+            return self.collect()
+        self.flush()
+        total: Dict[Key, Value] = {}
+        # файлы не переносятся в DEAD_FILE посреди чтения
+        with locked(directory, locks.LOCK_SH):
+            for entry in os.scandir(directory):
+                if not entry.name.endswith('.json'):
+                    continue
+                try:
+                    merge(total, read(entry.path))
+                except (OSError, ValueError):
+                    continue
+        return total
+
+    def render(self) -> str:
+        values = self.aggregate()
+        by_family: Dict[str, List[Tuple[Tuple[str, ...], Value]]] = {}
+        for (name, labels), value in sorted(values.items()):
+            by_family.setdefault(name, []).append((labels, value))
+        lines = []
+        for name, metric in sorted(self.families.items()):
+            lines.append(f'# HELP {name} {metric.documentation}')
+            lines.append(f'# TYPE {name} {metric.type}')
+            for labels, value in by_family.get(name, []):
+                lines.extend(metric.samples(labels, value))
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+
+class Metric:
+    type = 'untyped'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        registry: Registry = REGISTRY,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.registry = registry
+        registry.register(self)
+
+    def key(self, labels: Dict[str, str]) -> Key:
+        return self.name, tuple(str(labels[name]) for name in self.labelnames)
+
+    def format_labels(
+        self,
+        labels: Tuple[str, ...],
+        extra: Sequence[Tuple[str, str]] = (),
+    ) -> str:
+        pairs = list(zip(self.labelnames, labels)) + list(extra)
+        if not pairs:
+            return ''
+        return (
+            '{'
+            + ','.join(f'{name}="{escape(value)}"' for name, value in pairs)
+            + '}'
+        )
+
+    def samples(self, labels: Tuple[str, ...], value: Value) -> List[str]:
+        return [f'{self.name}{self.format_labels(labels)} {value}']
+
+
+class Counter(Metric):
+    type = 'counter'
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        values = self.registry.shard()
+        key = self.key(labels)
+        current = values.get(key, 0.0)
+        assert not isinstance(current, list)
+        values[key] = current + amount
+
+
+class Histogram(Metric):
+    type = 'histogram'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DURATION_BUCKETS,
+        registry: Registry = REGISTRY,
+    ) -> None:
+        self.buckets = tuple(buckets)
+        super().__init__(name, documentation, labelnames, registry)
+
+    def observe(self, amount: float, **labels: str) -> None:
+        values = self.registry.shard()
+        key = self.key(labels)
+        counts = values.get(key)
+        if counts is None:
+            counts = values[key] = [0.0] * (len(self.buckets) + 3)
+        assert isinstance(counts, list)
+        counts[bisect_left(self.buckets, amount)] += 1
+        counts[-2] += amount
+        counts[-1] += 1
+
+    def samples(self, labels: Tuple[str, ...], value: Value) -> List[str]:
+        assert isinstance(value, list)
+        lines = []
+        cumulative = 0.0
+        bounds = [str(bound) for bound in self.buckets] + ['+Inf']
+        for bound, count in zip(bounds, value):
+            cumulative += count
+            lines.append(
+                f'{self.name}_bucket'
+                f'{self.format_labels(labels, [("le", bound)])} {cumulative}',
+            )
+        labels_text = self.format_labels(labels)
+        lines.append(f'{self.name}_sum{labels_text} {value[-2]}')
+        lines.append(f'{self.name}_count{labels_text} {value[-1]}')
+        return lines
+
+
+REQUESTS = Counter(
+    'http_requests_total',
+    'HTTP requests by view, method and status code.',
+    ('view', 'method', 'status'),
+)
+REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds',
+    'HTTP request latency by view.',
+    ('view',),
+)
+DB_QUERIES = Counter(
+    'db_queries_total',
+    'SQL queries executed while handling requests, by view.',
+    ('view',),
+)
+DB_DURATION = Counter(
+    'db_query_duration_seconds_total',
+    'Time spent in SQL queries while handling requests, by view.',
+    ('view',),
+)
+DB_RETRIES = Counter(
+    'db_retries_total',
+    'Write transactions retried after lock or serialization errors.',
+    ('view',),
+)
+DB_RETRY_WAIT = Counter(
+    'db_retry_wait_seconds_total',
+    'Time spent waiting before write transaction retries.',
+    ('view',),
+)
+DB_RETRY_FAILURES = Counter(
+    'db_retry_failures_total',
+    'Write transactions that failed after all retries.',
+    ('view',),
+)
+CACHE_REQUESTS = Counter(
+    'cache_requests_total',
+    'Cache lookups by cache name and result (hit or miss).',
+    ('cache', 'result'),
+)
+
+
+def view_name(request: HttpRequest) -> str:
+    timings = getattr(request, 'timings', None)
+    if timings is not None and timings.view:
+        return timings.view
+    match = getattr(request, 'resolver_match', None)
+    if match is not None:
+        return match.view_name
+    return 'unmatched'
+
+
+class MetricsMiddleware:
+    """Считает запросы, их длительность и SQL-запросы по представлениям.
+
+    Число и время SQL-запросов берутся из замеров ServerTimingMiddleware,
+    поэтому она должна стоять в MIDDLEWARE после этой middleware.
+    """
+
+    def __init__(self, get_response: Callable) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        started = time.perf_counter()
+        response = self.get_response(request)
+        duration = time.perf_counter() - started
+        view = view_name(request)
+        REQUESTS.inc(
+            view=view,
+            method=request.method or '',
+            status=str(response.status_code),
+        )
+        REQUEST_DURATION.observe(duration, view=view)
+        timings = getattr(request, 'timings', None)
+        if timings is not None and 'db' in timings.counts:
+            DB_QUERIES.inc(timings.counts['db'], view=view)
+            DB_DURATION.inc(timings.durations['db'], view=view)
+        REGISTRY.maybe_flush()
+        return response
@@ -0,0 +1,116 @@
+from typing import Callable, List, Optional, Sequence
+
+from django.apps import AppConfig
+from django.conf import settings
+from django.core import checks
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.handlers.exception import convert_exception_to_response
+from django.http import HttpRequest, HttpResponse
+from django.template.response import TemplateResponse
+from django.utils.module_loading import import_string
+
+# без них не работает админка, см. проверки admin.E408-E410
+ADMIN_MIDDLEWARE = (
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+)
+
+
+def is_lean(request: HttpRequest) -> bool:
+    return request.path_info.startswith(settings.LEAN_MIDDLEWARE_PATHS)
+
+
+class SiteMiddleware:
+    """Цепочка SITE_MIDDLEWARE для всех путей, кроме LEAN_MIDDLEWARE_PATHS.
+
+    API аутентифицируется только по JWT, поэтому запросы к нему обходят
+    сессии, CSRF и сообщения, а админка и остальной сайт получают их в
+    порядке SITE_MIDDLEWARE. Хуки process_view, process_exception и
+    process_template_response вложенных middleware вызываются так же,
+    как их вызвал бы обработчик Django.
+    """
+
+    def __init__(self, get_response: Callable) -> None:
+        self.get_response = get_response
+        self.view_hooks: List[Callable] = []
+        self.exception_hooks: List[Callable] = []
+        self.template_hooks: List[Callable] = []
+        handler = get_response
+        for path in reversed(settings.SITE_MIDDLEWARE):
+            try:
+                middleware = import_string(path)(handler)
+            except MiddlewareNotUsed:
+                continue
+            if hasattr(middleware, 'process_view'):
+                self.view_hooks.insert(0, middleware.process_view)
+            if hasattr(middleware, 'process_exception'):
+                self.exception_hooks.append(middleware.process_exception)
+            if hasattr(middleware, 'process_template_response'):
+                self.template_hooks.append(
+                    middleware.process_template_response,
+                )
+            handler = convert_exception_to_response(middleware)
+        self.site_handler = handler
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if is_lean(request):
+            return self.get_response(request)
+        return self.site_handler(request)
+
+    def process_view(
+        self,
+        request: HttpRequest,
+        view_func: Callable,
+        view_args: tuple,
+        view_kwargs: dict,
+    ) -> Optional[HttpResponse]:
+        if is_lean(request):
+            return None
+        for hook in self.view_hooks:
+            response = hook(request, view_func, view_args, view_kwargs)
+            if response is not None:
+                return response
+        return None
+
+    def process_exception(
+        self,
+        request: HttpRequest,
+        exception: Exception,
+    ) -> Optional[HttpResponse]:
+        if is_lean(request):
+            return None
+        for hook in self.exception_hooks:
+            response = hook(request, exception)
+            if response is not None:
+                return response
+        return None
+
+    def process_template_response(
+        self,
+        request: HttpRequest,
+        response: TemplateResponse,
+    ) -> TemplateResponse:
+        if is_lean(request):
+            return response
+        for hook in self.template_hooks:
+            response = hook(request, response)
+        return response
+
+
+def check_site_middleware(
+    app_configs: Optional[Sequence[AppConfig]] = None,
+    **kwargs: object,
+) -> List[checks.CheckMessage]:
+    """Замена admin.E408-E410, которые ищут middleware только в
+    MIDDLEWARE."""
+
+    return [
+        checks.Error(
+            f"'{path}' must be in SITE_MIDDLEWARE in order to use the "
+            'admin application.',
+            id='core.E001',
+        )
+        for path in ADMIN_MIDDLEWARE
+        if path not in settings.SITE_MIDDLEWARE
+    ]
@@ -0,0 +1,64 @@
+import codecs
+import io
+import re
+from typing import IO, Dict, Optional
+
+from django.conf import settings
+from rest_framework import parsers
+from rest_framework.exceptions import ParseError
+
+from core import renderers
+from core.renderers import msgpack, orjson
+
+# orjson читает целые длиннее 64 бит как float, а json как int
+LONG_NUMBER = re.compile(rb'\d{19}')
+
+
+class JSONParser(parsers.JSONParser):
+    """JSONParser, разбирающий тело через orjson, если тот установлен.
+
+    Тела в другой кодировке, чем UTF-8, с длинными числами и с ошибками
+    разбирает стандартный json, так что результат и текст ошибки
+    совпадают с JSONParser DRF.
+    """
+
+    renderer_class = renderers.JSONRenderer
+
+    def parse(
+        self,
+        stream: IO[bytes],
+        media_type: Optional[str] = None,
+        parser_context: Optional[Dict] = None,
+    ) -> object:
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or not self.strict:
+            return super().parse(stream, media_type, parser_context)
+        if codecs.lookup(encoding).name != 'utf-8':
+            return super().parse(stream, media_type, parser_context)
+        body = stream.read()
+        if not LONG_NUMBER.search(body):
+            try:
+                return orjson.loads(body)
+            except orjson.JSONDecodeError:
+                pass
+        return super().parse(io.BytesIO(body), media_type, parser_context)
+
+
+class MessagePackParser(parsers.BaseParser):
+    """Разбирает тела запросов с Content-Type: application/msgpack."""
+
+    media_type = 'application/msgpack'
+    renderer_class = renderers.MessagePackRenderer
+
+    def parse(
+        self,
+        stream: IO[bytes],
+        media_type: Optional[str] = None,
+        parser_context: Optional[Dict] = None,
+    ) -> object:
+        try:
+            # strict_map_key по умолчанию допускает только ключи str и bytes
+            return msgpack.unpackb(stream.read(), raw=False)
+        except ValueError as exc:
+            raise ParseError(f'MessagePack parse error - {exc}')
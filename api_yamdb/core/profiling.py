@@ -0,0 +1,173 @@
+import cProfile
+import json
+import os
+import random
+import time
+from contextlib import ExitStack
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Sequence
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpRequest, HttpResponse
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+
+
+class QueryLog:
+    """Обёртка execute_wrapper, запоминающая SQL-запросы и их время."""
+
+    def __init__(self) -> None:
+        self.queries: List[Dict] = []
+
+    def __call__(
+        self,
+        execute: Callable,
+        sql: str,
+        params: Sequence,
+        many: bool,
+        context: Dict,
+    ) -> object:
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append(
+                {
+                    'database': context['connection'].alias,
+                    'sql': sql,
+                    'duration_ms': round(
+                        (time.perf_counter() - started) * 1000,
+                        3,
+                    ),
+                },
+            )
+
+
+def url_name(request: HttpRequest) -> str:
+    match = getattr(request, 'resolver_match', None)
+    if match is None or not match.view_name:
+        return 'unmatched'
+    return match.view_name.replace(':', '.')
+
+
+def is_admin(request: HttpRequest) -> bool:
+    """Аутентифицирует запрос классами DEFAULT_AUTHENTICATION_CLASSES
+    до представления и проверяет, что это администратор."""
+
+    drf_request = Request(request)
+    for authentication_class in api_settings.DEFAULT_AUTHENTICATION_CLASSES:
+        try:
+            result = authentication_class().authenticate(drf_request)
+        except APIException:
+            return False
+        if result is not None:
+            user = result[0]
+            return user.is_authenticated and getattr(user, 'is_admin', False)
+    return False
+
+
+class ProfilingMiddleware:
+    """Профилирование запросов по требованию.
+
+    Запрос профилируется, если администратор передал заголовок
+    X-Profile: 1, или случайно с вероятностью PROFILING_SAMPLE_RATE.
+    Дамп cProfile и время SQL-запросов сохраняются в PROFILING_DIR
+    в подкаталог с именем URL, а имя профиля возвращается в заголовке
+    X-Profile-Id.
+    """
+
+    def __init__(self, get_response: Callable) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        requested = False
+        if request.META.get(PROFILE_HEADER) == '1':
+            # до профилировщика, иначе его включал бы любой клиент
+            requested = is_admin(request)
+        sampled = random.random() < settings.PROFILING_SAMPLE_RATE
+        if not (requested or sampled):
+            return self.get_response(request)
+        profiler = cProfile.Profile()
+        queries = QueryLog()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(queries))
+            profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+        duration = time.perf_counter() - started
+        response['X-Profile-Id'] = self.save(
+            request,
+            response,
+            profiler,
+            queries.queries,
+            duration,
+        )
+        return response
+
+    def save(
+        self,
+        request: HttpRequest,
+        response: HttpResponse,
+        profiler: cProfile.Profile,
+        queries: List[Dict],
+        duration: float,
+    ) -> str:
+        name = url_name(request)
+        directory = os.path.join(settings.PROFILING_DIR, name)
+        os.makedirs(directory, exist_ok=True)
+        now = datetime.now(timezone.utc)
+        stem = f'{now:%Y%m%dT%H%M%S%f}-{os.getpid()}'
+        profiler.dump_stats(os.path.join(directory, f'{stem}.prof'))
+        timings = getattr(request, 'timings', None)
+        meta = {
+            'url_name': name,
+            'view': timings.view if timings is not None else None,
+            'method': request.method,
+            'path': request.get_full_path(),
+            'status': response.status_code,
+            'time': now.isoformat(),
+            'duration_ms': round(duration * 1000, 3),
+            'sql_ms': round(sum(query['duration_ms'] for query in queries), 3),
+            'queries': queries,
+        }
+        with open(
+            os.path.join(directory, f'{stem}.json'),
+            'w',
+            encoding='utf-8',
+        ) as file:
+            json.dump(meta, file, ensure_ascii=False, indent=2)
+        return f'{name}/{stem}'
+
+
+def load_profiles(
+    directory: str,
+    name: Optional[str] = None,
+) -> List[Dict]:
+    """Метаданные сохранённых профилей, от старых к новым."""
+
+    profiles = []
+    if not os.path.isdir(directory):
+        return profiles
+    for url in sorted(os.listdir(directory)):
+        if name and url != name:
+            continue
+        url_dir = os.path.join(directory, url)
+        for file_name in sorted(os.listdir(url_dir)):
+            stem, extension = os.path.splitext(file_name)
+            if extension != '.json':
+                continue
+            path = os.path.join(url_dir, file_name)
+            with open(path, encoding='utf-8') as file:
+                meta = json.load(file)
+            meta['id'] = f'{url}/{stem}'
+            meta['stats'] = os.path.join(url_dir, f'{stem}.prof')
+            profiles.append(meta)
+    return profiles
@@ -0,0 +1,133 @@
+import json
+from typing import Dict, Optional
+
+from django.utils.functional import cached_property
+from rest_framework import renderers
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# вне этого диапазона float записывается с экспонентой, и формат
+# orjson (1e16) расходится с json (1e+16)
+FLOAT_MIN = 1e-4
+FLOAT_MAX = 1e16
+SCALARS = frozenset((str, int, bool, type(None)))
+
+
+def portable(data: object) -> bool:
+    """Закодирует ли orjson числа с плавающей точкой так же, как json.
+
+    Целые длиннее 64 бит и нестроковые ключи orjson не кодирует вовсе,
+    и их, как и прочие ошибки, обрабатывает откат на json. Значения
+    других типов проходят через JSONEncoder.default и проверяются там.
+    """
+
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, dict):
+            value = value.values()
+        elif isinstance(value, float):
+            # NaN не проходит ни одно сравнение
+            if not (value == 0 or FLOAT_MIN <= abs(value) < FLOAT_MAX):
+                return False
+            continue
+        elif not isinstance(value, (list, tuple)):
+            continue
+        # строки и целые, самые частые значения, в стек не попадают
+        for item in value:
+            if type(item) not in SCALARS:
+                stack.append(item)
+    return True
+
+
+class Unportable(TypeError):
+    """Значение, которое orjson закодировал бы иначе, чем json."""
+
+
+class JSONRenderer(renderers.JSONRenderer):
+    """JSONRenderer, кодирующий через orjson, если тот установлен.
+
+    Вывод совпадает с JSONRenderer DRF байт в байт: даты, Decimal и
+    остальные типы приводит тот же encoder_class, а данные, которые
+    orjson записал бы иначе, форматированный вывод и настройки JSON,
+    отличные от умолчаний DRF, кодирует стандартная библиотека.
+    """
+
+    def render(
+        self,
+        data: object,
+        accepted_media_type: Optional[str] = None,
+        renderer_context: Optional[Dict] = None,
+    ) -> bytes:
+        if (
+            orjson is None
+            or data is None
+            or self.ensure_ascii
+            or not self.compact
+            or not self.strict
+            or self.get_indent(accepted_media_type, renderer_context or {})
+            is not None
+            or not portable(data)
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self.default,
+                option=orjson.OPT_PASSTHROUGH_DATETIME
+                | orjson.OPT_PASSTHROUGH_DATACLASS,
+            )
+        except orjson.JSONEncodeError:
+            # настоящую ошибку или другой формат даст стандартный json
+            return super().render(data, accepted_media_type, renderer_context)
+        # как и DRF, экранируем разделители строк для JavaScript
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(
+            b'\xe2\x80\xa9',
+            b'\\u2029',
+        )
+
+    @cached_property
+    def encoder(self) -> json.JSONEncoder:
+        return self.encoder_class()
+
+    def default(self, obj: object) -> object:
+        value = self.encoder.default(obj)
+        if not portable(value):
+            raise Unportable
+        return value
+
+
+class MessagePackRenderer(renderers.BaseRenderer):
+    """Ответ в MessagePack для клиентов с Accept: application/msgpack.
+
+    Структура ответа та же, что и в JSON: типы, которых нет в
+    MessagePack, приводит JSONEncoder DRF.
+    """
+
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+    encoder_class = JSONRenderer.encoder_class
+
+    def render(
+        self,
+        data: object,
+        accepted_media_type: Optional[str] = None,
+        renderer_context: Optional[Dict] = None,
+    ) -> bytes:
+        if data is None:
+            return b''
+        return msgpack.packb(
+            data,
+            default=self.encoder_class().default,
+            use_bin_type=True,
+        )
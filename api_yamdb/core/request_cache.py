@@ -0,0 +1,95 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, Optional, Tuple, Type
+
+from django.db.models import ForeignKey, Model
+from django.http import Http404, HttpRequest, HttpResponse
+
+Key = Tuple[Type[Model], str]
+
+_objects: ContextVar[Optional[Dict[Key, Model]]] = ContextVar(
+    'request_objects',
+    default=None,
+)
+
+
+@contextmanager
+def request_scope() -> Iterator[Dict[Key, Model]]:
+    """Кеш объектов на время запроса.
+
+    Вложенная область, например подзапрос пакетного запроса, использует
+    кеш внешней.
+    """
+
+    objects = _objects.get()
+    if objects is not None:
+        yield objects
+        return
+    objects = {}
+    token = _objects.set(objects)
+    try:
+        yield objects
+    finally:
+        _objects.reset(token)
+
+
+def remember(obj: Model) -> Model:
+    objects = _objects.get()
+    if objects is not None:
+        objects[type(obj), str(obj.pk)] = obj
+    return obj
+
+
+def get_object_or_404(
+    model: Type[Model],
+    pk: object,
+    **filters: object,
+) -> Model:
+    """Объект по первичному ключу, загруженный не больше раза за запрос.
+
+    Дополнительные условия сравниваются с атрибутами уже загруженного
+    объекта, например title_id отзыва из URL.
+    """
+
+    objects = _objects.get()
+    obj = objects.get((model, str(pk))) if objects is not None else None
+    if obj is None:
+        try:
+            obj = model.objects.get(pk=pk)
+        except (model.DoesNotExist, ValueError, TypeError):
+            raise Http404(f'No {model._meta.object_name} matches the query.')
+        remember(obj)
+    for attname, value in filters.items():
+        if str(getattr(obj, attname)) != str(value):
+            raise Http404(f'No {model._meta.object_name} matches the query.')
+    return obj
+
+
+def related(instance: Model, name: str) -> Optional[Model]:
+    """Объект по внешнему ключу name из кеша запроса.
+
+    Найденный объект записывается и в кеш поля экземпляра, так что
+    instance.<name> тоже не обращается к базе.
+    """
+
+    field = instance._meta.get_field(name)
+    assert isinstance(field, ForeignKey), f'{name} is not a foreign key'
+    if field.is_cached(instance):
+        return getattr(instance, name)
+    pk = getattr(instance, field.attname)
+    if pk is None:
+        return None
+    obj = get_object_or_404(field.related_model, pk)
+    field.set_cached_value(instance, obj)
+    return obj
+
+
+class RequestCacheMiddleware:
+    """Открывает кеш объектов запроса."""
+
+    def __init__(self, get_response: Callable) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        with request_scope():
+            return self.get_response(request)
@@ -0,0 +1,107 @@
+import random
+import time
+from typing import TYPE_CHECKING, Callable
+
+from django.conf import settings
+from django.db import OperationalError, connection, transaction
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from core.metrics import DB_RETRIES, DB_RETRY_FAILURES, DB_RETRY_WAIT
+
+if TYPE_CHECKING:
+    from rest_framework.viewsets import ModelViewSet
+else:
+    # примесь не наследует ModelViewSet во время выполнения
+    ModelViewSet = object
+
+RETRYABLE_MESSAGES = (
+    'database is locked',
+    'database table is locked',
+    'could not serialize access',
+    'deadlock detected',
+)
+
+
+class DatabaseBusy(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'База данных перегружена, повторите запрос позже.'
+    default_code = 'database_busy'
+
+
+def is_retryable(error: Exception) -> bool:
+    message = str(error).lower()
+    return any(text in message for text in RETRYABLE_MESSAGES)
+
+
+def backoff(attempt: int) -> float:
+    """Пауза перед повтором: экспонента с полным случайным разбросом."""
+
+    limit = min(
+        settings.DB_RETRY_MAX_DELAY,
+        settings.DB_RETRY_BASE_DELAY * 2**attempt,
+    )
+    return random.uniform(0, limit)
+
+
+class RetryMixin(ModelViewSet):
+    """Повтор изменяющих действий при блокировках базы данных.
+
+    Действие целиком выполняется в транзакции; если база ответила
+    ошибкой блокировки или сериализации, транзакция откатывается и
+    повторяется после паузы. Когда попытки исчерпаны, клиент получает
+    503 вместо 500.
+    """
+
+    def retry(
+        self,
+        action: Callable[..., Response],
+        request: Request,
+        *args: tuple,
+        **kwargs: dict,
+    ) -> Response:
+        if connection.in_atomic_block:
+            return action(request, *args, **kwargs)
+        view = f'{type(self).__name__}.{self.action}'
+        attempt = 0
+        while True:
+            try:
+                with transaction.atomic():
+                    return action(request, *args, **kwargs)
+            except OperationalError as error:
+                if not is_retryable(error):
+                    raise
+                if attempt + 1 >= settings.DB_RETRY_ATTEMPTS:
+                    DB_RETRY_FAILURES.inc(view=view)
+                    raise DatabaseBusy() from error
+            delay = backoff(attempt)
+            DB_RETRIES.inc(view=view)
+            DB_RETRY_WAIT.inc(delay, view=view)
+            time.sleep(delay)
+            attempt += 1
+
+    def create(
+        self,
+        request: Request,
+        *args: tuple,
+        **kwargs: dict,
+    ) -> Response:
+        return self.retry(super().create, request, *args, **kwargs)
+
+    def update(
+        self,
+        request: Request,
+        *args: tuple,
+        **kwargs: dict,
+    ) -> Response:
+        return self.retry(super().update, request, *args, **kwargs)
+
+    def destroy(
+        self,
+        request: Request,
+        *args: tuple,
+        **kwargs: dict,
+    ) -> Response:
+        return self.retry(super().destroy, request, *args, **kwargs)
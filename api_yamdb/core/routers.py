@@ -0,0 +1,142 @@
+import random
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, List, Optional, Sequence, Type
+
+from django.apps import AppConfig
+from django.conf import settings
+from django.core import checks
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Model
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+if TYPE_CHECKING:
+    from rest_framework.views import APIView
+else:
+    # примесь не наследует APIView во время выполнения
+    APIView = object
+
+_read_database: ContextVar[Optional[str]] = ContextVar(
+    'read_database',
+    default=None,
+)
+
+
+def written_key(user_id: int) -> str:
+    return f'replicas:written:{user_id}'
+
+
+class ReplicaRouter:
+    """Направляет чтение безопасных запросов API на реплики.
+
+    Реплику для чтения выбирает ReplicaMixin представления; вне таких
+    запросов и для любой записи используется основная база.
+    """
+
+    def db_for_read(self, model: Type[Model], **hints: dict) -> Optional[str]:
+        return _read_database.get()
+
+    def db_for_write(self, model: Type[Model], **hints: dict) -> str:
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(
+        self,
+        obj1: Model,
+        obj2: Model,
+        **hints: dict,
+    ) -> Optional[bool]:
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(
+        self,
+        db: str,
+        app_label: str,
+        **hints: dict,
+    ) -> Optional[bool]:
+        # реплики получают схему вместе с данными при репликации
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
+
+
+class ReplicaMixin(APIView):
+    """Чтение с реплик для безопасных запросов к представлению.
+
+    После успешной записи пользователь в течение READ_YOUR_WRITES_WINDOW
+    секунд читает с основной базы, чтобы видеть свои изменения. Отметка
+    о записи хранится в кеше Django: следующий запрос клиента может
+    попасть в другой рабочий процесс, поэтому кеш должен быть общим,
+    что требует проверка core.E003.
+    """
+
+    def dispatch(
+        self,
+        request: Request,
+        *args: tuple,
+        **kwargs: dict,
+    ) -> Response:
+        token = _read_database.set(None)
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            _read_database.reset(token)
+
+    def initial(self, request: Request, *args: tuple, **kwargs: dict) -> None:
+        super().initial(request, *args, **kwargs)
+        replicas = settings.DATABASE_REPLICAS
+        if not replicas or request.method not in SAFE_METHODS:
+            return
+        user = request.user
+        if user.is_authenticated and cache.get(written_key(user.pk)):
+            return
+        _read_database.set(random.choice(replicas))
+
+    def finalize_response(
+        self,
+        request: Request,
+        response: Response,
+        *args: tuple,
+        **kwargs: dict,
+    ) -> Response:
+        user = getattr(request, 'user', None)
+        if (
+            request.method not in SAFE_METHODS
+            and response.status_code < 400
+            and user is not None
+            and user.is_authenticated
+        ):
+            cache.set(
+                written_key(user.pk),
+                True,
+                settings.READ_YOUR_WRITES_WINDOW,
+            )
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+def check_replica_cache(
+    app_configs: Optional[Sequence[AppConfig]] = None,
+    **kwargs: object,
+) -> List[checks.CheckMessage]:
+    """Отметки о записи должны быть видны всем рабочим процессам."""
+
+    from core.catalog import PROCESS_LOCAL_CACHES
+
+    backend = settings.CACHES['default']['BACKEND']
+    if not settings.DATABASE_REPLICAS or backend not in PROCESS_LOCAL_CACHES:
+        return []
+    return [
+        checks.Error(
+            'DATABASE_REPLICAS require a default cache shared by all worker '
+            'processes: it stores read-your-writes markers.',
+            hint=(
+                'Use FileBasedCache, a database, Redis or Memcached cache '
+                'backend.'
+            ),
+            id='core.E003',
+        ),
+    ]
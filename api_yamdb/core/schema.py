@@ -0,0 +1,140 @@
+import gzip
+import hashlib
+import io
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+
+from django.conf import settings
+from django.http import HttpRequest
+from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+from drf_spectacular.settings import spectacular_settings
+
+# формат: (имя файла, тип содержимого)
+FORMATS = {
+    'yaml': ('schema.yml', 'application/vnd.oai.openapi'),
+    'json': ('schema.json', 'application/vnd.oai.openapi+json'),
+}
+ENCODINGS = ('gzip', '')
+
+ACCEPTS_GZIP = re.compile(r'\bgzip\b')
+
+
+class Representation(NamedTuple):
+    body: bytes
+    etag: str
+
+
+def generate() -> Dict[str, bytes]:
+    """Схема OpenAPI во всех форматах."""
+
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+    schema = generator.get_schema(request=None, public=True)
+    return {
+        'yaml': OpenApiYamlRenderer().render(schema),
+        'json': OpenApiJsonRenderer().render(schema),
+    }
+
+
+def compress(body: bytes) -> bytes:
+    # без времени в заголовке сжатые файлы одной схемы совпадают;
+    # gzip.compress принимает mtime только с Python 3.8
+    buffer = io.BytesIO()
+    with gzip.GzipFile(
+        fileobj=buffer,
+        mode='wb',
+        compresslevel=9,
+        mtime=0,
+    ) as file:
+        file.write(body)
+    return buffer.getvalue()
+
+
+def represent(
+    schemas: Dict[str, bytes],
+) -> Dict[Tuple[str, str], Representation]:
+    representations = {}
+    for name, body in schemas.items():
+        for encoding in ENCODINGS:
+            data = compress(body) if encoding else body
+            etag = hashlib.sha256(data).hexdigest()[:32]
+            representations[name, encoding] = Representation(
+                data,
+                f'"{etag}"',
+            )
+    return representations
+
+
+def write(
+    directory: Union[str, Path],
+    schemas: Dict[str, bytes],
+) -> List[str]:
+    """Сохраняет схему в обычном и сжатом виде; возвращает пути файлов."""
+
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for (name, encoding), representation in represent(schemas).items():
+        path = os.path.join(directory, FORMATS[name][0])
+        if encoding:
+            path = f'{path}.gz'
+        with open(path, 'wb') as file:
+            file.write(representation.body)
+        paths.append(path)
+    return paths
+
+
+def read(directory: Union[str, Path]) -> Optional[Dict[str, bytes]]:
+    """Несжатая схема из каталога или None, если её там нет."""
+
+    schemas = {}
+    for name, (file_name, _) in FORMATS.items():
+        path = os.path.join(directory, file_name)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'rb') as file:
+            schemas[name] = file.read()
+    return schemas
+
+
+class SchemaCache:
+    """Схема OpenAPI, построенная один раз на процесс.
+
+    Схема читается из SCHEMA_DIR, куда её записывает команда
+    build_schema при сборке, а если её там нет, строится при первом
+    запросе. Сжатые копии и ETag вычисляются тогда же.
+    """
+
+    def __init__(self) -> None:
+        self._representations: Optional[
+            Dict[Tuple[str, str], Representation]
+        ] = None
+        self._lock = threading.Lock()
+
+    def get(self, name: str, encoding: str) -> Representation:
+        if self._representations is None:
+            with self._lock:
+                if self._representations is None:
+                    schemas = read(settings.SCHEMA_DIR) or generate()
+                    self._representations = represent(schemas)
+        return self._representations[name, encoding]
+
+    def clear(self) -> None:
+        self._representations = None
+
+
+SCHEMA = SchemaCache()
+
+
+def negotiate(request: HttpRequest) -> Tuple[str, str]:
+    """Формат и сжатие схемы для запроса."""
+
+    accept = request.META.get('HTTP_ACCEPT', '')
+    name = 'yaml'
+    if request.GET.get('format') == 'json' or 'json' in accept:
+        name = 'json'
+    encoding = ''
+    if ACCEPTS_GZIP.search(request.META.get('HTTP_ACCEPT_ENCODING', '')):
+        encoding = 'gzip'
+    return name, encoding
@@ -0,0 +1,220 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+from typing import Callable, Dict, List, Optional, Sequence
+
+from django.conf import settings
+from django.db import DatabaseError
+from django.db.backends.base.base import BaseDatabaseWrapper
+
+from core import timing
+
+MAX_EXPLAINED = 10000
+
+WHITESPACE = re.compile(r'\s+')
+STRING = re.compile(r"'(?:[^']|'')*'")
+NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+PLACEHOLDER = re.compile(r'%s|\?')
+VALUES_LIST = re.compile(r'\(\?(?:\s*,\s*\?)+\)')
+
+
+def normalize(sql: str) -> str:
+    """SQL без литералов и параметров.
+
+    Запросы, различающиеся только значениями, в том числе длиной списка
+    в IN (...), приводятся к одной строке.
+    """
+
+    sql = WHITESPACE.sub(' ', sql).strip()
+    sql = STRING.sub('?', sql)
+    sql = NUMBER.sub('?', sql)
+    sql = PLACEHOLDER.sub('?', sql)
+    return VALUES_LIST.sub('(...)', sql)
+
+
+class SlowQueryLog:
+    """Журнал SQL-запросов, выполнявшихся дольше порога.
+
+    Подключается как execute_wrapper к каждому соединению с базой.
+    Для первого появления каждого нормализованного SELECT в процессе
+    в запись добавляется план выполнения.
+    """
+
+    def __init__(self) -> None:
+        self._local = threading.local()
+        self._explained: Dict[str, None] = {}
+        self._handlers: Dict[str, RotatingFileHandler] = {}
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+    def __call__(
+        self,
+        execute: Callable,
+        sql: str,
+        params: Sequence,
+        many: bool,
+        context: Dict,
+    ) -> object:
+        threshold = settings.SLOW_QUERY_THRESHOLD_MS
+        if threshold is None or getattr(self._local, 'active', False):
+            return execute(sql, params, many, context)
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = (time.perf_counter() - started) * 1000
+            if duration >= threshold:
+                self.record(sql, params, many, duration, context)
+
+    def record(
+        self,
+        sql: str,
+        params: Sequence,
+        many: bool,
+        duration: float,
+        context: Dict,
+    ) -> None:
+        normalized = normalize(sql)
+        timings = timing.current()
+        entry = {
+            'time': datetime.now(timezone.utc).isoformat(),
+            'database': context['connection'].alias,
+            'view': timings.view if timings is not None else None,
+            'sql': normalized,
+            'params': None if many else params,
+            'duration_ms': round(duration, 3),
+            'explain': None,
+        }
+        if not many and normalized not in self._explained:
+            entry['explain'] = self.explain(context['connection'], sql, params)
+            if len(self._explained) < MAX_EXPLAINED:
+                self._explained[normalized] = None
+        self.write(json.dumps(entry, ensure_ascii=False, default=str))
+
+    def explain(
+        self,
+        connection: BaseDatabaseWrapper,
+        sql: str,
+        params: Sequence,
+    ) -> Optional[List[str]]:
+        """План выполнения SELECT, если его удалось получить."""
+
+        if not sql.lstrip().upper().startswith(('SELECT', 'WITH')):
+            return None
+        self._local.active = True
+        try:
+            cursor = connection.create_cursor()
+            try:
+                cursor.execute(
+                    f'{connection.ops.explain_query_prefix()} {sql}',
+                    params,
+                )
+                return [str(row[-1]) for row in cursor.fetchall()]
+            finally:
+                cursor.close()
+        except DatabaseError:
+            return None
+        finally:
+            self._local.active = False
+
+    def handler(self) -> RotatingFileHandler:
+        file_name = str(settings.SLOW_QUERY_LOG)
+        handler = self._handlers.get(file_name)
+        if handler is None:
+            with self._lock:
+                handler = self._handlers.get(file_name)
+                if handler is None:
+                    os.makedirs(os.path.dirname(file_name), exist_ok=True)
+                    handler = RotatingFileHandler(
+                        file_name,
+                        maxBytes=settings.SLOW_QUERY_LOG_MAX_BYTES,
+                        backupCount=settings.SLOW_QUERY_LOG_BACKUPS,
+                        encoding='utf-8',
+                    )
+                    self._handlers[file_name] = handler
+        return handler
+
+    def write(self, line: str) -> None:
+        self.handler().handle(
+            self.logger.makeRecord(
+                self.logger.name,
+                logging.WARNING,
+                __file__,
+                0,
+                line,
+                (),
+                None,
+            ),
+        )
+
+
+SLOW_QUERY_LOG = SlowQueryLog()
+
+
+def install(
+    sender: type,
+    connection: BaseDatabaseWrapper,
+    **kwargs: dict,
+) -> None:
+    """Обработчик connection_created: подключает журнал к соединению."""
+
+    if SLOW_QUERY_LOG not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, SLOW_QUERY_LOG)
+
+
+def log_files(file_name: str) -> List[str]:
+    """Файл журнала и его ротированные копии, от старых к новым."""
+
+    files = [file_name]
+    index = 1
+    while os.path.exists(f'{file_name}.{index}'):
+        files.append(f'{file_name}.{index}')
+        index += 1
+    return [name for name in reversed(files) if os.path.exists(name)]
+
+
+def read_entries(file_names: Sequence[str]) -> List[Dict]:
+    entries = []
+    for file_name in file_names:
+        with open(file_name, encoding='utf-8') as file:
+            for line in file:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    continue
+    return entries
+
+
+def summarize(entries: Sequence[Dict]) -> List[Dict]:
+    """Сводка по нормализованным запросам, худшие по суммарному времени."""
+
+    statements: Dict[str, Dict] = {}
+    for entry in entries:
+        statement = statements.setdefault(
+            entry['sql'],
+            {
+                'sql': entry['sql'],
+                'count': 0,
+                'total_ms': 0.0,
+                'max_ms': 0.0,
+                'views': {},
+                'explain': None,
+            },
+        )
+        statement['count'] += 1
+        statement['total_ms'] += entry['duration_ms']
+        statement['max_ms'] = max(statement['max_ms'], entry['duration_ms'])
+        view = entry.get('view') or '-'
+        statement['views'][view] = statement['views'].get(view, 0) + 1
+        if statement['explain'] is None:
+            statement['explain'] = entry.get('explain')
+    return sorted(
+        statements.values(),
+        key=lambda statement: statement['total_ms'],
+        reverse=True,
+    )
@@ -0,0 +1,27 @@
+from typing import List, Mapping
+
+from django.conf import settings
+from django.db.backends.base.base import BaseDatabaseWrapper
+
+Pragmas = Mapping[str, object]
+
+
+def pragma_statements(pragmas: Pragmas) -> List[str]:
+    return [f'PRAGMA {name} = {value}' for name, value in pragmas.items()]
+
+
+def configure(
+    sender: type,
+    connection: BaseDatabaseWrapper,
+    **kwargs: dict,
+) -> None:
+    """Обработчик connection_created: настройки SQLite из SQLITE_PRAGMAS.
+
+    PRAGMA выполняются на сыром соединении, минуя execute_wrapper,
+    поэтому не попадают в замеры и журналы SQL-запросов.
+    """
+
+    if connection.vendor != 'sqlite':
+        return
+    for statement in pragma_statements(settings.SQLITE_PRAGMAS):
+        connection.connection.execute(statement)
@@ -0,0 +1,192 @@
+import logging
+import time
+from contextlib import ExitStack, contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    ContextManager,
+    Dict,
+    Iterator,
+    Optional,
+    Sequence,
+)
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpRequest, HttpResponse
+from rest_framework.request import Request
+
+if TYPE_CHECKING:
+    from rest_framework.serializers import BaseSerializer
+    from rest_framework.views import APIView
+else:
+    # примеси не наследуют классы DRF во время выполнения
+    APIView = BaseSerializer = object
+
+logger = logging.getLogger(__name__)
+
+
+class RequestTimings:
+    """Длительности фаз обработки одного запроса.
+
+    Фазы могут пересекаться: SQL-запросы, выполненные при сериализации
+    ленивых querysets, входят и в serialize, и в db.
+    """
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.total = 0.0
+        self.durations: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+        self.view: Optional[str] = None
+        self._active: set = set()
+
+    def add(self, phase: str, duration: float) -> None:
+        self.durations[phase] = self.durations.get(phase, 0.0) + duration
+        self.counts[phase] = self.counts.get(phase, 0) + 1
+
+    @contextmanager
+    def measure(self, phase: str) -> Iterator[None]:
+        if phase in self._active:
+            yield
+            return
+        self._active.add(phase)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._active.discard(phase)
+            self.add(phase, time.perf_counter() - started)
+
+    def query(
+        self,
+        execute: Callable,
+        sql: str,
+        params: Sequence,
+        many: bool,
+        context: Dict,
+    ) -> object:
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.add('db', time.perf_counter() - started)
+
+    def finish(self) -> None:
+        self.total = time.perf_counter() - self.started
+
+    def header(self) -> str:
+        metrics = []
+        for phase, duration in self.durations.items():
+            metric = f'{phase};dur={duration * 1000:.1f}'
+            if phase == 'db':
+                metric += f';desc="{self.counts[phase]} queries"'
+            metrics.append(metric)
+        metrics.append(f'total;dur={self.total * 1000:.1f}')
+        return ', '.join(metrics)
+
+    def as_dict(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {
+            f'{phase}_ms': round(duration * 1000, 3)
+            for phase, duration in self.durations.items()
+        }
+        data['db_queries'] = self.counts.get('db', 0)
+        data['total_ms'] = round(self.total * 1000, 3)
+        data['view'] = self.view
+        return data
+
+
+_current: ContextVar[Optional[RequestTimings]] = ContextVar(
+    'request_timings',
+    default=None,
+)
+
+
+def current() -> Optional[RequestTimings]:
+    return _current.get()
+
+
+def measure(phase: str) -> ContextManager:
+    """Замер фазы текущего запроса; вне запроса ничего не делает."""
+
+    timings = _current.get()
+    if timings is None:
+        return nullcontext()
+    return timings.measure(phase)
+
+
+class ServerTimingMiddleware:
+    """Добавляет в ответ заголовок Server-Timing с фазами запроса."""
+
+    def __init__(self, get_response: Callable) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        timings = RequestTimings()
+        request.timings = timings
+        token = _current.set(timings)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(timings.query),
+                    )
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+            timings.finish()
+        response['Server-Timing'] = timings.header()
+        if settings.SERVER_TIMING_LOG:
+            data = timings.as_dict()
+            data.update(
+                method=request.method,
+                path=request.path,
+                status=response.status_code,
+            )
+            logger.info(
+                ' '.join(f'{key}={value}' for key, value in data.items()),
+                extra={'timings': data},
+            )
+        return response
+
+
+class ServerTimingMixin(APIView):
+    """Замер аутентификации и проверки прав в представлениях DRF."""
+
+    def initial(self, request: Request, *args: tuple, **kwargs: dict) -> None:
+        timings = _current.get()
+        # подзапросы пакетного запроса не переименовывают внешний запрос
+        if timings is not None and timings.view is None:
+            action = getattr(self, 'action', None) or request.method.lower()
+            timings.view = f'{type(self).__name__}.{action}'
+        super().initial(request, *args, **kwargs)
+
+    def perform_authentication(self, request: Request) -> None:
+        with measure('auth'):
+            super().perform_authentication(request)
+
+    def check_permissions(self, request: Request) -> None:
+        with measure('perm'):
+            super().check_permissions(request)
+
+    def check_object_permissions(
+        self,
+        request: Request,
+        obj: object,
+    ) -> None:
+        with measure('perm'):
+            super().check_object_permissions(request, obj)
+
+
+class TimedSerializerMixin(BaseSerializer):
+    """Замер сериализации и валидации данных в сериализаторах DRF."""
+
+    def to_representation(self, instance: object) -> object:
+        with measure('serialize'):
+            return super().to_representation(instance)
+
+    def run_validation(self, *args: tuple, **kwargs: dict) -> object:
+        with measure('validate'):
+            return super().run_validation(*args, **kwargs)
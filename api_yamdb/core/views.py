@@ -0,0 +1,60 @@
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse, HttpResponseForbidden
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.http import require_safe
+
+from core.metrics import CONTENT_TYPE, REGISTRY
+from core.schema import FORMATS, SCHEMA, negotiate
+
+
+def can_scrape(request: HttpRequest) -> bool:
+    """Запрос с адреса из METRICS_ALLOWED_IPS или с токеном METRICS_TOKEN
+    в заголовке Authorization: Bearer."""
+
+    if request.META.get('REMOTE_ADDR') in settings.METRICS_ALLOWED_IPS:
+        return True
+    if not settings.METRICS_TOKEN:
+        return False
+    scheme, _, token = request.META.get('HTTP_AUTHORIZATION', '').partition(
+        ' ',
+    )
+    return scheme.lower() == 'bearer' and constant_time_compare(
+        token.strip(),
+        settings.METRICS_TOKEN,
+    )
+
+
+def metrics(request: HttpRequest) -> HttpResponse:
+    """Метрики всех рабочих процессов в текстовом формате Prometheus."""
+
+    if not can_scrape(request):
+        return HttpResponseForbidden()
+    return HttpResponse(REGISTRY.render(), content_type=CONTENT_TYPE)
+
+
+@require_safe
+def schema(request: HttpRequest) -> HttpResponse:
+    """Готовая схема OpenAPI со строгим ETag.
+
+    Клиентам, принимающим gzip, отдаётся сжатая копия.
+    """
+
+    name, encoding = negotiate(request)
+    representation = SCHEMA.get(name, encoding)
+    response = get_conditional_response(request, etag=representation.etag)
+    if response is None:
+        response = HttpResponse(
+            representation.body,
+            content_type=FORMATS[name][1],
+        )
+        if encoding:
+            response['Content-Encoding'] = encoding
+    response['ETag'] = representation.etag
+    patch_vary_headers(response, ('Accept', 'Accept-Encoding'))
+    patch_cache_control(response, public=True, max_age=settings.SCHEMA_MAX_AGE)
+    return response
@@ -0,0 +1,147 @@
+import csv
+import os
+
+import pytest
+from django.core.management import call_command
+
+from core.management.commands.load_db import (DATA_DIR, LOADERS,
+                                               LoaderScheduler)
+from reviews.models import Comment, Review, Title
+
+
+def csv_rows_count(file_name):
+    with open(os.path.join(DATA_DIR, file_name), encoding='utf-8') as file:
+        return sum(1 for _ in csv.DictReader(file))
+
+
+def table_values(loader_class):
+    # pub_date при вставке всегда выставляет auto_now_add
+    fields = [
+        name for name in loader_class.columns.values() if name != 'pub_date'
+    ]
+    return sorted(loader_class.model.objects.values_list(*fields))
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08LoadDb:
+
+    @pytest.mark.parametrize('workers', (1, 2))
+    def test_01_load_db_bulk(self, workers):
+        call_command('load_db', batch_size=7, workers=workers)
+        for loader_class in LOADERS:
+            expected = csv_rows_count(loader_class.file_name)
+            loaded = loader_class.model.objects.count()
+            assert loaded == expected, (
+                'Проверьте, что команда `load_db` загружает все строки '
+                f'файла `{loader_class.file_name}`: ожидалось {expected}, '
+                f'загружено {loaded}.'
+            )
+
+    def test_02_load_db_reports_rate(self, capsys):
+        call_command('load_db', workers=1)
+        output = capsys.readouterr().out
+        assert output.count('rows/s') == len(LOADERS), (
+            'Проверьте, что команда `load_db` сообщает скорость загрузки '
+            'каждой таблицы.'
+        )
+
+    def test_03_load_db_upsert(self, capsys):
+        call_command('load_db', workers=1)
+        title_loader = LOADERS[3]
+        title = title_loader.model.objects.order_by('pk').first()
+        title.name = 'Изменённое название'
+        title.save()
+        stale = title_loader.model.objects.create(name='Лишнее', year=2000)
+        capsys.readouterr()
+
+        call_command(
+            'load_db', upsert=True, delete_missing=True, workers=2
+        )
+        output = capsys.readouterr().out
+        assert 'inserted 0, updated 1, unchanged' in output, (
+            'Проверьте, что повторный запуск `load_db --upsert` обновляет '
+            'только изменённые строки.'
+        )
+        title.refresh_from_db()
+        assert title.name != 'Изменённое название', (
+            'Проверьте, что `load_db --upsert` возвращает изменённым '
+            'строкам значения из csv-файла.'
+        )
+        assert not title_loader.model.objects.filter(pk=stale.pk).exists(), (
+            'Проверьте, что `load_db --upsert --delete-missing` удаляет '
+            'строки, которых нет в csv-файле.'
+        )
+        for loader_class in LOADERS:
+            assert loader_class.model.objects.count() == csv_rows_count(
+                loader_class.file_name
+            ), (
+                'Проверьте, что после `load_db --upsert --delete-missing` '
+                'данные совпадают с csv-файлами.'
+            )
+
+    def test_04_scheduler_levels(self):
+        levels = LoaderScheduler([loader() for loader in LOADERS]).levels()
+        names = [
+            sorted(type(loader).__name__ for loader in level)
+            for level in levels
+        ]
+        assert names == [
+            ['CategoryLoader', 'GenreLoader', 'UsersLoader'],
+            ['TitleLoader'],
+            ['GenreTitleLoader', 'ReviewLoader'],
+            ['CommentLoader'],
+        ], (
+            'Проверьте, что независимые таблицы загружаются на одном '
+            'уровне, а зависимые — после своих родительских таблиц.'
+        )
+
+    @pytest.mark.parametrize('gzip', (False, True))
+    def test_05_dump_db_round_trip(self, tmp_path, gzip):
+        call_command('load_db', workers=1)
+        expected = {
+            loader_class: table_values(loader_class)
+            for loader_class in LOADERS
+        }
+        call_command('dump_db', str(tmp_path), gzip=gzip, chunk_size=10)
+        suffix = '.csv.gz' if gzip else '.csv'
+        assert all(
+            (tmp_path / loader_class.file_name).with_suffix(suffix).exists()
+            for loader_class in LOADERS
+        ), 'Проверьте, что команда `dump_db` создаёт файл для каждой таблицы.'
+
+        call_command('clear_db', fast=True)
+        call_command('load_db', data_dir=str(tmp_path), workers=2)
+        for loader_class in LOADERS:
+            assert table_values(loader_class) == expected[loader_class], (
+                'Проверьте, что данные, выгруженные командой `dump_db`, '
+                'загружаются командой `load_db` без изменений: таблица '
+                f'`{loader_class.model._meta.db_table}`.'
+            )
+
+    def test_06_dump_db_superuser_reviews(self, tmp_path, user_superuser):
+        call_command('load_db', workers=1)
+        review = Review.objects.create(
+            title=Title.objects.first(),
+            author=user_superuser,
+            text='Отзыв суперпользователя',
+            score=5,
+        )
+        Comment.objects.create(
+            review=review,
+            author=user_superuser,
+            text='Комментарий суперпользователя',
+        )
+        expected = {
+            loader_class: table_values(loader_class)
+            for loader_class in LOADERS
+        }
+        call_command('dump_db', str(tmp_path))
+        call_command('clear_db', fast=True)
+        type(user_superuser).objects.all().delete()
+        call_command('load_db', data_dir=str(tmp_path), workers=2)
+        for loader_class in LOADERS:
+            assert table_values(loader_class) == expected[loader_class], (
+                'Проверьте, что команда `dump_db` выгружает авторов всех '
+                'отзывов и комментариев, включая суперпользователей: '
+                f'таблица `{loader_class.model._meta.db_table}`.'
+            )
@@ -0,0 +1,78 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from core.management.commands.load_db import LOADERS
+from reviews.models import Category, Comment, Review, Title, User
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09ClearDb:
+
+    @pytest.mark.parametrize('options', ({}, {'fast': True},
+                                         {'fast': True,
+                                          'reset_sequences': True}))
+    def test_01_clear_db(self, user_superuser, options, capsys):
+        call_command('load_db', workers=1)
+        call_command('clear_db', **options)
+        output = capsys.readouterr().out
+        for loader_class in LOADERS:
+            queryset = loader_class.model.objects.all()
+            if loader_class.model is type(user_superuser):
+                queryset = queryset.filter(is_superuser=False)
+            assert not queryset.exists(), (
+                f'Проверьте, что команда `clear_db` с параметрами {options} '
+                f'очищает таблицу `{loader_class.model._meta.db_table}`.'
+            )
+            assert loader_class.model._meta.db_table in output, (
+                'Проверьте, что команда `clear_db` сообщает время очистки '
+                'каждой таблицы.'
+            )
+        assert type(user_superuser).objects.filter(
+            pk=user_superuser.pk
+        ).exists(), (
+            'Проверьте, что команда `clear_db` не удаляет суперпользователей.'
+        )
+
+    def test_02_reset_sequences(self, user_superuser):
+        call_command('load_db', workers=1)
+        call_command('clear_db', fast=True, reset_sequences=True)
+        assert Category.objects.create(name='a', slug='a').pk == 1, (
+            'Проверьте, что `clear_db --fast --reset-sequences` сбрасывает '
+            'счётчики id очищенных таблиц.'
+        )
+        assert type(user_superuser).objects.get().pk == user_superuser.pk
+
+    def test_03_fast_statements(self, user_superuser, monkeypatch):
+        call_command('load_db', workers=1)
+        calls = []
+        sql_flush = connection.ops.sql_flush
+
+        def recorded(style, tables, **kwargs):
+            calls.append(set(tables))
+            return sql_flush(style, tables, **kwargs)
+
+        monkeypatch.setattr(connection.ops, 'sql_flush', recorded)
+        with CaptureQueriesContext(connection) as context:
+            call_command('clear_db', fast=True)
+        assert len(calls) == 1 and {
+            Category._meta.db_table,
+            Title._meta.db_table,
+            Review._meta.db_table,
+            Comment._meta.db_table,
+        } <= calls[0], (
+            'Проверьте, что `clear_db --fast` очищает связанные таблицы '
+            'одним вызовом sql_flush: PostgreSQL не усекает по отдельности '
+            'таблицы, на которые ссылаются внешние ключи.'
+        )
+        users = connection.ops.quote_name(User._meta.db_table)
+        deletes = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith(f'DELETE FROM {users}')
+        ]
+        assert deletes and not any('SELECT' in sql for sql in deletes), (
+            'Проверьте, что DELETE не читает удаляемую таблицу в подзапросе: '
+            'MySQL такие запросы не выполняет.'
+        )
+        assert User.objects.get().pk == user_superuser.pk
@@ -0,0 +1,45 @@
+import pytest
+from django.core.management import call_command
+from django.db.models import Count
+
+from reviews.models import Comment, GenreTitle, Review, Title, User
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10GenDb:
+
+    def test_01_gen_db(self):
+        call_command(
+            'gen_db', users=20, categories=3, genres=5, titles=50,
+            reviews=300, comments=200, batch_size=64,
+        )
+        assert User.objects.count() == 20
+        assert Title.objects.count() == 50
+        assert Review.objects.count() == 300, (
+            'Проверьте, что команда `gen_db` создаёт заданное число отзывов.'
+        )
+        assert Comment.objects.count() == 200
+        assert GenreTitle.objects.values('title').distinct().count() == 50, (
+            'Проверьте, что команда `gen_db` назначает жанр каждому '
+            'произведению.'
+        )
+        counts = list(
+            Review.objects.values('title').annotate(total=Count('id'))
+            .order_by('-total').values_list('total', flat=True)
+        )
+        assert counts[0] > counts[-1], (
+            'Проверьте, что отзывы распределены по произведениям '
+            'неравномерно.'
+        )
+
+    def test_02_gen_db_appends(self):
+        call_command('load_db', workers=1)
+        before = Title.objects.count()
+        call_command(
+            'gen_db', users=5, categories=1, genres=1, titles=10,
+            reviews=10, comments=10,
+        )
+        assert Title.objects.count() == before + 10, (
+            'Проверьте, что команда `gen_db` добавляет данные к уже '
+            'загруженным.'
+        )
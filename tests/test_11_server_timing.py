@@ -0,0 +1,39 @@
+import logging
+
+import pytest
+from django.test import override_settings
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11ServerTiming:
+
+    def test_01_server_timing_header(self, admin_client):
+        create_titles(admin_client)
+        response = admin_client.get('/api/v1/titles/')
+        header = response.get('Server-Timing', '')
+        for phase in ('db', 'auth', 'perm', 'serialize', 'total'):
+            assert f'{phase};dur=' in header, (
+                'Проверьте, что заголовок `Server-Timing` ответа содержит '
+                f'длительность фазы `{phase}`.'
+            )
+
+    def test_02_server_timing_log(self, client, caplog):
+        logger = logging.getLogger('core.timing')
+        logger.addHandler(caplog.handler)
+        try:
+            with override_settings(SERVER_TIMING_LOG=True):
+                client.get('/api/v1/genres/')
+        finally:
+            logger.removeHandler(caplog.handler)
+        records = [
+            record for record in caplog.records
+            if record.name == 'core.timing'
+        ]
+        assert records and records[0].timings['view'] == (
+            'GenreViewSet.list'
+        ), (
+            'Проверьте, что при включённом `SERVER_TIMING_LOG` фазы запроса '
+            'записываются в журнал вместе с именем представления.'
+        )
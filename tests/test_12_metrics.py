@@ -0,0 +1,178 @@
+import json
+import os
+import re
+import threading
+
+import pytest
+from django.test import override_settings
+
+from core.metrics import REGISTRY, Counter, Registry
+from tests.utils import sample
+
+
+@pytest.fixture
+def scraper(settings):
+    settings.METRICS_ALLOWED_IPS = ('127.0.0.1',)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12Metrics:
+
+    def test_01_metrics_endpoint(self, client, scraper):
+        response = client.get('/metrics/')
+        before = sample(
+            response.content.decode(),
+            'http_requests_total',
+            view='GenreViewSet.list',
+            status='200',
+        )
+        client.get('/api/v1/genres/')
+        response = client.get('/metrics/')
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith(
+            'text/plain'
+        ), 'Проверьте, что метрики отдаются в текстовом формате Prometheus.'
+        text = response.content.decode()
+        after = sample(
+            text,
+            'http_requests_total',
+            view='GenreViewSet.list',
+            status='200',
+        )
+        assert (
+            after == before + 1
+        ), 'Проверьте, что `/metrics/` считает запросы к представлениям.'
+        assert re.search(
+            r'^http_request_duration_seconds_bucket\{'
+            r'view="GenreViewSet.list",le="\+Inf"\}',
+            text,
+            re.M,
+        ), 'Проверьте, что `/metrics/` содержит гистограмму длительности.'
+        assert sample(
+            text, 'db_queries_total', view='GenreViewSet.list'
+        ), 'Проверьте, что `/metrics/` считает SQL-запросы представлений.'
+
+    def test_02_metrics_aggregate_processes(self, client, scraper, tmp_path):
+        other = tmp_path / 'metrics-1.json'
+        other.write_text(
+            '[["http_requests_total", ["GenreViewSet.list", "GET", "200"],'
+            ' 1000]]'
+        )
+        with override_settings(METRICS_DIR=str(tmp_path)):
+            client.get('/api/v1/genres/')
+            text = client.get('/metrics/').content.decode()
+        local = sample(
+            REGISTRY.render(),
+            'http_requests_total',
+            view='GenreViewSet.list',
+            method='GET',
+            status='200',
+        )
+        total = sample(
+            text,
+            'http_requests_total',
+            view='GenreViewSet.list',
+            method='GET',
+            status='200',
+        )
+        assert total == local + 1000, (
+            'Проверьте, что `/metrics/` суммирует метрики всех процессов '
+            'из `METRICS_DIR`.'
+        )
+
+    def test_03_concurrent_flush(self, settings, tmp_path):
+        settings.METRICS_DIR = str(tmp_path)
+        settings.METRICS_FLUSH_INTERVAL = 0
+        errors = []
+
+        def flush():
+            try:
+                for _ in range(20):
+                    REGISTRY.maybe_flush()
+                    REGISTRY.flush()
+            except Exception as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=flush) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert not errors, (
+            'Проверьте, что одновременный сброс метрик из нескольких потоков '
+            'не приводит к ошибкам.'
+        )
+        assert [
+            path.name
+            for path in tmp_path.iterdir()
+            if path.name != 'metrics.lock'
+        ] == [f'metrics-{os.getpid()}.json']
+
+    def test_04_flush_errors(self, client, settings, tmp_path, monkeypatch):
+        settings.METRICS_DIR = str(tmp_path)
+        settings.METRICS_FLUSH_INTERVAL = 0
+
+        def broken():
+            raise OSError('disk full')
+
+        monkeypatch.setattr(REGISTRY, 'flush', broken)
+        response = client.get('/api/v1/genres/')
+        assert response.status_code == 200, (
+            'Проверьте, что ошибка сброса метрик не ломает запрос.'
+        )
+
+    def test_05_access(self, client, settings):
+        settings.METRICS_TOKEN = None
+        assert client.get('/metrics/').status_code == 403, (
+            'Проверьте, что по умолчанию `/metrics/` закрыта даже для '
+            'локальных адресов.'
+        )
+        settings.METRICS_ALLOWED_IPS = ('10.0.0.1',)
+        assert client.get('/metrics/').status_code == 403, (
+            'Проверьте, что `/metrics/` недоступна с посторонних адресов.'
+        )
+        assert client.get(
+            '/metrics/',
+            REMOTE_ADDR='10.0.0.1',
+        ).status_code == 200
+        settings.METRICS_TOKEN = 'secret'
+        assert client.get(
+            '/metrics/',
+            HTTP_AUTHORIZATION='Bearer wrong',
+        ).status_code == 403
+        assert client.get(
+            '/metrics/',
+            HTTP_AUTHORIZATION='Bearer secret',
+        ).status_code == 200
+
+    def test_06_dead_processes(self, settings, tmp_path):
+        settings.METRICS_DIR = str(tmp_path)
+        files = {
+            # PID больше pid_max не может принадлежать процессу
+            'metrics-999999999.json': 10,
+            # прежний процесс с PID текущего
+            f'metrics-{os.getpid()}.json': 100,
+            f'metrics-{os.getppid()}.json': 1000,
+            'metrics-dead.json': 10000,
+        }
+        for name, value in files.items():
+            (tmp_path / name).write_text(
+                json.dumps([['test_total', [], value]]),
+            )
+        registry = Registry()
+        counter = Counter('test_total', 'Test.', registry=registry)
+        counter.inc(5)
+        total = registry.aggregate()[('test_total', ())]
+        assert total == 11115, (
+            'Проверьте, что итоги завершившихся процессов и прежнего '
+            'процесса с тем же PID остаются в сумме метрик.'
+        )
+        assert sorted(path.name for path in tmp_path.glob('*.json')) == sorted(
+            [
+                f'metrics-{os.getpid()}.json',
+                f'metrics-{os.getppid()}.json',
+                'metrics-dead.json',
+            ],
+        ), 'Проверьте, что файлы завершившихся процессов удаляются.'
+        counter.inc(1)
+        assert registry.aggregate()[('test_total', ())] == total + 1
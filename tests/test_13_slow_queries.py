@@ -0,0 +1,50 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.test import override_settings
+
+from core.slow_queries import normalize
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13SlowQueries:
+
+    def test_01_normalize(self):
+        assert normalize(
+            "SELECT * FROM t WHERE a = 'x' AND b IN (%s, %s)\n LIMIT 21",
+        ) == 'SELECT * FROM t WHERE a = ? AND b IN (...) LIMIT ?', (
+            'Проверьте, что `normalize` убирает из SQL литералы и параметры.'
+        )
+
+    def test_02_slow_query_log(self, admin_client, tmp_path):
+        create_titles(admin_client)
+        log = tmp_path / 'slow.log'
+        with override_settings(SLOW_QUERY_THRESHOLD_MS=0.0, SLOW_QUERY_LOG=log):
+            admin_client.get('/api/v1/titles/')
+            admin_client.get('/api/v1/titles/')
+        entries = [json.loads(line) for line in log.read_text().splitlines()]
+        entries = [
+            entry for entry in entries
+            if entry['view'] == 'TitleViewSet.list'
+            and 'FROM "reviews_title"' in entry['sql']
+        ]
+        assert len(entries) >= 2, (
+            'Проверьте, что запросы дольше порога попадают в журнал '
+            'вместе с именем представления.'
+        )
+        plans = [entry['explain'] for entry in entries]
+        assert plans[0] and not plans[-1], (
+            'Проверьте, что план запроса сохраняется только при первом '
+            'появлении запроса.'
+        )
+
+        out = StringIO()
+        call_command('slow_queries', str(log), explain=True, stdout=out)
+        output = out.getvalue()
+        assert 'TitleViewSet.list' in output and 'reviews_title' in output, (
+            'Проверьте, что команда `slow_queries` выводит худшие запросы '
+            'с представлениями.'
+        )
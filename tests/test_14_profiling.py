@@ -0,0 +1,82 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.test import override_settings
+
+from core import profiling
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14Profiling:
+
+    def test_01_profile_admin_request(
+        self, admin_client, user_client, tmp_path,
+    ):
+        with override_settings(PROFILING_DIR=tmp_path):
+            response = user_client.get('/api/v1/titles/', HTTP_X_PROFILE='1')
+            assert 'X-Profile-Id' not in response, (
+                'Проверьте, что заголовок `X-Profile` учитывается только '
+                'для администраторов.'
+            )
+            response = admin_client.get('/api/v1/titles/')
+            assert 'X-Profile-Id' not in response, (
+                'Проверьте, что без заголовка `X-Profile` запрос '
+                'не профилируется.'
+            )
+            response = admin_client.get('/api/v1/titles/', HTTP_X_PROFILE='1')
+        profile_id = response.get('X-Profile-Id', '')
+        assert profile_id.startswith('api.title-list/'), (
+            'Проверьте, что профиль запроса администратора с заголовком '
+            '`X-Profile: 1` сохраняется в каталог с именем URL.'
+        )
+        assert (tmp_path / f'{profile_id}.prof').exists()
+
+        out = StringIO()
+        call_command('profiles', dir=str(tmp_path), stdout=out)
+        assert 'api.title-list' in out.getvalue() and '1 profiles' in (
+            out.getvalue()
+        ), 'Проверьте, что команда `profiles` выводит список профилей.'
+        out = StringIO()
+        call_command('profiles', dir=str(tmp_path), show=profile_id, stdout=out)
+        assert 'function calls' in out.getvalue(), (
+            'Проверьте, что команда `profiles --show` выводит сводку профиля.'
+        )
+        assert 'reviews_title' in out.getvalue()
+
+    def test_02_sampled_profiles(self, client, tmp_path):
+        with override_settings(PROFILING_DIR=tmp_path, PROFILING_SAMPLE_RATE=1):
+            response = client.get('/api/v1/genres/')
+        assert response.get('X-Profile-Id', '').startswith('api.genre-list'), (
+            'Проверьте, что при `PROFILING_SAMPLE_RATE` профилируются '
+            'случайные запросы.'
+        )
+
+    def test_03_header_needs_admin_before_profiling(
+        self, client, user_client, tmp_path, monkeypatch,
+    ):
+        profilers = []
+        profile = profiling.cProfile.Profile
+
+        def counted():
+            profilers.append(1)
+            return profile()
+
+        monkeypatch.setattr(profiling.cProfile, 'Profile', counted)
+        with override_settings(PROFILING_DIR=tmp_path):
+            for api_client in (client, user_client):
+                response = api_client.get(
+                    '/api/v1/titles/',
+                    HTTP_X_PROFILE='1',
+                )
+                assert response.status_code == 200
+            response = client.get(
+                '/api/v1/titles/',
+                HTTP_X_PROFILE='1',
+                HTTP_AUTHORIZATION='Bearer invalid',
+            )
+            assert response.status_code == 401
+        assert not profilers, (
+            'Проверьте, что профилировщик не включается для запросов '
+            'с заголовком `X-Profile` не от администратора.'
+        )
@@ -0,0 +1,32 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15Sqlite:
+
+    def test_01_connection_pragmas(self):
+        with connection.cursor() as cursor:
+            values = {}
+            for pragma in ('synchronous', 'busy_timeout', 'temp_store'):
+                cursor.execute(f'PRAGMA {pragma}')
+                values[pragma] = cursor.fetchone()[0]
+        assert values == {'synchronous': 1, 'busy_timeout': 5000,
+                          'temp_store': 2}, (
+            'Проверьте, что настройки `SQLITE_PRAGMAS` применяются к каждому '
+            'соединению с SQLite.'
+        )
+
+    def test_02_bench_sqlite(self):
+        out = StringIO()
+        call_command(
+            'bench_sqlite', duration=0.2, titles=10, reviews=100, stdout=out,
+        )
+        lines = out.getvalue().splitlines()
+        assert [line.split()[0] for line in lines] == ['default', 'tuned'], (
+            'Проверьте, что `bench_sqlite` сравнивает настройки по умолчанию '
+            'с `SQLITE_PRAGMAS`.'
+        )
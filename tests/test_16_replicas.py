@@ -0,0 +1,92 @@
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import SystemCheckError
+from django.db import connections
+from django.test import override_settings
+
+from core.catalog import CATALOG
+from tests.utils import create_titles
+
+
+@pytest.fixture
+def replica(monkeypatch):
+    # реплика смотрит в ту же тестовую базу, что и основная
+    monkeypatch.setitem(
+        connections.databases,
+        'replica',
+        dict(connections.databases['default']),
+    )
+    queries = []
+    with override_settings(DATABASE_REPLICAS=['replica']):
+        with connections['replica'].execute_wrapper(
+            lambda execute, sql, *args: queries.append(sql)
+            or execute(sql, *args),
+        ):
+            yield queries
+    connections['replica'].close()
+    del connections['replica']
+    cache.clear()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16Replicas:
+
+    def test_01_safe_requests_read_replica(self, client, replica):
+        response = client.get('/api/v1/genres/')
+        assert response.status_code == 200
+        assert replica, (
+            'Проверьте, что безопасные запросы к API читают данные с реплики.'
+        )
+
+    def test_02_read_your_writes(self, admin_client, user_client, replica):
+        titles, _, _ = create_titles(admin_client)
+        replica.clear()
+        admin_client.get('/api/v1/titles/')
+        assert not replica, (
+            'Проверьте, что сразу после записи пользователь читает данные '
+            'с основной базы.'
+        )
+        user_client.get('/api/v1/titles/')
+        assert replica, (
+            'Проверьте, что запись одного пользователя не переключает '
+            'на основную базу чтение других пользователей.'
+        )
+        replica.clear()
+        response = user_client.post(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+            data={'text': 'a', 'score': 5},
+        )
+        assert response.status_code == 201
+        assert not replica, 'Проверьте, что запись идёт в основную базу.'
+
+    def test_03_catalog_reads_primary(self, admin_client, client, replica):
+        create_titles(admin_client)
+        CATALOG.invalidate()
+        replica.clear()
+        response = client.get('/api/v1/titles/')
+        assert response.status_code == 200
+        assert replica
+        assert not [
+            sql for sql in replica
+            if 'reviews_category' in sql or 'reviews_genre"' in sql
+        ], (
+            'Проверьте, что снимок каталога читается с основной базы, '
+            'а не с реплики.'
+        )
+
+    def test_04_shared_cache_check(self, settings):
+        settings.SILENCED_SYSTEM_CHECKS = [
+            *settings.SILENCED_SYSTEM_CHECKS,
+            'core.E002',
+        ]
+        settings.CACHES = {
+            'default': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            },
+        }
+        settings.DATABASE_REPLICAS = []
+        call_command('check')
+        settings.DATABASE_REPLICAS = ['replica']
+        with pytest.raises(SystemCheckError, match='core.E003'):
+            call_command('check')
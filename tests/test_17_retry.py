@@ -0,0 +1,58 @@
+import pytest
+from django.db import OperationalError
+
+from api.views import ReviewViewSet
+from core.metrics import REGISTRY
+from tests.utils import create_titles, sample
+
+
+def locked_perform_create(monkeypatch, failures):
+    perform_create = ReviewViewSet.perform_create
+    calls = []
+
+    def flaky(self, serializer):
+        calls.append(1)
+        if len(calls) <= failures:
+            raise OperationalError('database is locked')
+        perform_create(self, serializer)
+
+    monkeypatch.setattr(ReviewViewSet, 'perform_create', flaky)
+    return calls
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17Retry:
+
+    def test_01_retry_locked_write(self, admin_client, monkeypatch, settings):
+        settings.DB_RETRY_BASE_DELAY = 0.001
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        before = sample(
+            REGISTRY.render(), 'db_retries_total',
+            view='ReviewViewSet.create',
+        )
+        calls = locked_perform_create(monkeypatch, 2)
+        response = admin_client.post(url, data={'text': 'a', 'score': 5})
+        assert response.status_code == 201, (
+            'Проверьте, что запись повторяется при блокировке базы данных.'
+        )
+        assert len(calls) == 3
+        after = sample(
+            REGISTRY.render(), 'db_retries_total',
+            view='ReviewViewSet.create',
+        )
+        assert after == before + 2, (
+            'Проверьте, что число повторов записи попадает в метрики.'
+        )
+
+    def test_02_retries_exhausted(self, admin_client, monkeypatch, settings):
+        settings.DB_RETRY_BASE_DELAY = 0.001
+        settings.DB_RETRY_ATTEMPTS = 3
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        calls = locked_perform_create(monkeypatch, 100)
+        response = admin_client.post(url, data={'text': 'a', 'score': 5})
+        assert response.status_code == 503 and len(calls) == 3, (
+            'Проверьте, что после исчерпания повторов возвращается 503.'
+        )
+        assert not admin_client.get(url).json()['results']
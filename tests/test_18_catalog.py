@@ -0,0 +1,128 @@
+import uuid
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import SystemCheckError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from core.catalog import VERSION_KEY
+from reviews.models import Genre, GenreTitle
+from tests.utils import create_titles
+
+
+def catalog_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200
+    return [
+        query['sql'] for query in context.captured_queries
+        if 'reviews_category' in query['sql']
+        or 'reviews_genre"' in query['sql']
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18Catalog:
+
+    def test_01_titles_without_catalog_queries(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        client.get('/api/v1/titles/')
+        assert not catalog_queries(client, '/api/v1/titles/'), (
+            'Проверьте, что категории и жанры произведений берутся из кеша '
+            'каталога без запросов к базе.'
+        )
+        assert not catalog_queries(
+            client, f'/api/v1/titles/{titles[0]["id"]}/',
+        )
+        results = {
+            title['id']: title
+            for title in client.get('/api/v1/titles/').json()['results']
+        }
+        for title in titles:
+            result = results[title['id']]
+            assert result['category']['slug'] == title['category'] and [
+                genre['slug'] for genre in result['genre']
+            ] == sorted(title['genre']), (
+                'Проверьте, что категории и жанры произведений из кеша '
+                'каталога совпадают с данными в базе.'
+            )
+
+    def test_02_catalog_invalidation(self, admin_client):
+        _, categories, _ = create_titles(admin_client)
+        admin_client.get('/api/v1/titles/')
+        response = admin_client.post(
+            '/api/v1/genres/', data={'name': 'Новый', 'slug': 'new-genre'},
+        )
+        assert response.status_code == 201
+        response = admin_client.post(
+            '/api/v1/titles/',
+            data={
+                'name': 'Новое произведение',
+                'year': 2000,
+                'description': '',
+                'genre': ['new-genre'],
+                'category': categories[0]['slug'],
+            },
+        )
+        assert response.status_code == 201, (
+            'Проверьте, что запись жанра сбрасывает кеш каталога.'
+        )
+        assert response.json()['genre'] == ['new-genre']
+
+    def test_03_shared_version(self, client, admin_client, settings):
+        settings.CATALOG_VERSION_CHECK_INTERVAL = 0
+        titles, _, genres = create_titles(admin_client)
+        client.get('/api/v1/titles/')
+        # изменение другим процессом: без сигналов, со сменой версии
+        Genre.objects.filter(slug=genres[0]['slug']).update(name='Другой')
+        cache.set(VERSION_KEY, uuid.uuid4().hex)
+        title = client.get(f'/api/v1/titles/{titles[0]["id"]}/').json()
+        names = {genre['slug']: genre['name'] for genre in title['genre']}
+        assert names.get(genres[0]['slug']) == 'Другой', (
+            'Проверьте, что кеш каталога перечитывается при смене общей '
+            'версии.'
+        )
+
+    def test_04_deleted_genre_on_write(self, admin_client):
+        _, categories, genres = create_titles(admin_client)
+        admin_client.get('/api/v1/titles/')
+        slug = genres[0]['slug']
+        # удаление другим процессом: без сигналов и без смены версии
+        genre = Genre.objects.get(slug=slug)
+        GenreTitle.objects.filter(genre=genre).delete()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {Genre._meta.db_table} WHERE id = %s',
+                [genre.pk],
+            )
+        data = {
+            'name': 'Новое произведение',
+            'year': 2000,
+            'description': '',
+            'genre': [slug],
+            'category': categories[0]['slug'],
+        }
+        response = admin_client.post('/api/v1/titles/', data=data)
+        assert response.status_code == 400 and 'genre' in response.json(), (
+            'Проверьте, что при записи жанры из кеша каталога сверяются с '
+            'базой и удалённый жанр не проходит проверку.'
+        )
+        response = admin_client.post(
+            '/api/v1/titles/bulk/',
+            data=[data],
+            format='json',
+        )
+        assert response.status_code == 200
+        assert response.json()[0]['status'] == 400
+
+    def test_05_shared_cache_check(self, settings):
+        call_command('check')
+        settings.CACHES = {
+            'default': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            },
+        }
+        with pytest.raises(SystemCheckError, match='core.E002'):
+            call_command('check')
@@ -0,0 +1,74 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Genre, GenreTitle
+from tests.utils import create_titles
+
+
+def write_queries(client, method, url, data):
+    with CaptureQueriesContext(connection) as context:
+        response = getattr(client, method)(url, data=data, format='json')
+    assert response.status_code in (200, 201), response.json()
+    return len(context.captured_queries)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19TitleGenres:
+
+    def test_01_constant_queries(self, admin_client):
+        titles, categories, _ = create_titles(admin_client)
+        slugs = [f'genre-{index}' for index in range(20)]
+        Genre.objects.bulk_create(
+            Genre(name=slug, slug=slug) for slug in slugs
+        )
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        counts = [
+            write_queries(
+                admin_client, 'patch', url, {'genre': slugs[start:end]},
+            )
+            for start, end in ((0, 2), (2, 4), (4, 20))
+        ]
+        # первый запрос перечитывает кеш каталога
+        counts = counts[1:]
+        assert len(set(counts)) == 1, (
+            'Проверьте, что число запросов при изменении жанров произведения '
+            f'не зависит от числа жанров: {counts}.'
+        )
+        data = {
+            'name': 'Новое', 'year': 2000, 'description': '',
+            'category': categories[0]['slug'],
+        }
+        counts = [
+            write_queries(
+                admin_client, 'post', '/api/v1/titles/',
+                dict(data, genre=slugs[:size]),
+            )
+            for size in (1, 20)
+        ]
+        assert counts[0] == counts[1], (
+            'Проверьте, что число запросов при создании произведения '
+            f'не зависит от числа жанров: {counts}.'
+        )
+
+    def test_02_minimal_diff(self, admin_client):
+        titles, _, genres = create_titles(admin_client)
+        title_id = titles[0]['id']
+        kept = GenreTitle.objects.get(
+            title_id=title_id, genre__slug=titles[0]['genre'][0],
+        )
+        new_genres = [titles[0]['genre'][0], genres[2]['slug']]
+        response = admin_client.patch(
+            f'/api/v1/titles/{title_id}/',
+            data={'genre': new_genres}, format='json',
+        )
+        assert response.status_code == 200
+        assert sorted(response.json()['genre']) == sorted(new_genres)
+        links = GenreTitle.objects.filter(title_id=title_id)
+        assert sorted(links.values_list('genre__slug', flat=True)) == sorted(
+            new_genres,
+        )
+        assert links.filter(pk=kept.pk).exists(), (
+            'Проверьте, что при изменении жанров сохранённые связи '
+            'не пересоздаются.'
+        )
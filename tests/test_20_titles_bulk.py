@@ -0,0 +1,123 @@
+import time
+from functools import partial
+
+import pytest
+from django.db import connection
+from django.db.backends.base.operations import BaseDatabaseOperations
+
+from reviews.models import GenreTitle, Title
+from tests.utils import create_titles
+
+URL = '/api/v1/titles/bulk/'
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20TitlesBulk:
+
+    def test_01_bulk_permissions(self, client, user_client):
+        for api_client in (client, user_client):
+            response = api_client.post(
+                URL, data='[]', content_type='application/json',
+            )
+            assert response.status_code in (401, 403), (
+                'Проверьте, что пакетная запись произведений доступна только '
+                'администратору.'
+            )
+
+    def test_02_bulk_results(self, admin_client):
+        titles, categories, genres = create_titles(admin_client)
+        data = [
+            {
+                'name': 'Новое',
+                'year': 2001,
+                'description': '',
+                'category': categories[0]['slug'],
+                'genre': [genres[0]['slug'], genres[1]['slug']],
+            },
+            {'id': titles[0]['id'], 'year': 1985, 'genre': [genres[2]['slug']]},
+            {'id': 10 ** 6, 'year': 1985},
+            {'name': 'Без жанра', 'year': 2001, 'genre': ['unknown']},
+            'title',
+        ]
+        response = admin_client.post(URL, data=data, format='json')
+        assert response.status_code == 200
+        results = response.json()
+        assert [result['status'] for result in results] == [
+            201, 200, 404, 400, 400,
+        ], 'Проверьте, что для каждого элемента пакета возвращается статус.'
+        assert 'genre' in results[3]['errors']
+        created = Title.objects.get(pk=results[0]['id'])
+        assert created.name == 'Новое' and sorted(
+            GenreTitle.objects.filter(title=created).values_list(
+                'genre__slug', flat=True,
+            ),
+        ) == sorted([genres[0]['slug'], genres[1]['slug']])
+        updated = Title.objects.get(pk=titles[0]['id'])
+        assert updated.year == 1985 and updated.name == titles[0]['name'], (
+            'Проверьте, что элементы с id изменяют только переданные поля.'
+        )
+        assert list(
+            GenreTitle.objects.filter(title=updated).values_list(
+                'genre__slug', flat=True,
+            ),
+        ) == [genres[2]['slug']]
+
+    def test_03_bulk_throughput(self, admin_client):
+        _, categories, genres = create_titles(admin_client)
+        data = [
+            {
+                'name': f'Произведение {index}',
+                'year': 2000,
+                'description': '',
+                'category': categories[0]['slug'],
+                'genre': [genres[index % len(genres)]['slug']],
+            }
+            for index in range(2000)
+        ]
+        started = time.perf_counter()
+        response = admin_client.post(URL, data=data, format='json')
+        elapsed = time.perf_counter() - started
+        assert response.status_code == 200
+        assert Title.objects.filter(name__startswith='Произведение').count(
+        ) == len(data)
+        assert len(data) / elapsed > 1000, (
+            'Проверьте, что пакетная запись обрабатывает тысячи произведений '
+            f'в секунду: {len(data) / elapsed:.0f}/с.'
+        )
+
+    def test_04_unlimited_query_params(self, admin_client, monkeypatch):
+        titles, categories, genres = create_titles(admin_client)
+        # как у PostgreSQL
+        monkeypatch.setattr(connection.features, 'max_query_params', None)
+        monkeypatch.setattr(
+            connection.ops,
+            'bulk_batch_size',
+            partial(BaseDatabaseOperations.bulk_batch_size, connection.ops),
+        )
+        data = [
+            {
+                'name': 'Новое',
+                'year': 2001,
+                'description': '',
+                'category': categories[0]['slug'],
+                'genre': [genres[0]['slug']],
+            },
+            {'id': titles[1]['id'], 'year': 1999},
+        ]
+        response = admin_client.post(URL, data=data, format='json')
+        assert response.status_code == 200, (
+            'Проверьте, что пакетная запись работает на базах без '
+            'ограничения числа параметров запроса.'
+        )
+        assert [result['status'] for result in response.json()] == [201, 200]
+        response = admin_client.post(
+            URL,
+            data=[{'id': titles[0]['id'], 'genre': [genres[2]['slug']]}],
+            format='json',
+        )
+        assert response.json()[0]['status'] == 200
+        assert list(
+            GenreTitle.objects.filter(title_id=titles[0]['id']).values_list(
+                'genre__slug', flat=True,
+            ),
+        ) == [genres[2]['slug']]
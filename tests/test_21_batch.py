@@ -0,0 +1,101 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_comments, create_titles
+
+URL = '/api/v1/batch/'
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21Batch:
+
+    def test_01_batch_responses(self, admin_client, admin, user_client, user):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client},
+        )
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        urls = [
+            title_url,
+            f'{title_url}reviews/',
+            f'{title_url}reviews/{reviews[0]["id"]}/comments/',
+            f'{title_url}reviews/{reviews[1]["id"]}/comments/?page=1',
+            '/api/v1/users/me/',
+        ]
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(
+                URL,
+                data={'requests': [{'url': url} for url in urls]},
+                format='json',
+            )
+        assert response.status_code == 200
+        batch_queries = len(context.captured_queries)
+        separate_queries = 0
+        results = response.json()
+        for url, result in zip(urls, results):
+            with CaptureQueriesContext(connection) as context:
+                expected = user_client.get(url)
+            separate_queries += len(context.captured_queries)
+            assert result == {
+                'url': url,
+                'status': expected.status_code,
+                'body': expected.json(),
+            }, (
+                'Проверьте, что `/api/v1/batch/` возвращает ответы подзапросов '
+                'в порядке запроса.'
+            )
+        # пользователь загружается один раз на весь пакет
+        assert batch_queries <= separate_queries - (len(urls) - 1), (
+            'Проверьте, что подзапросы используют аутентификацию пакетного '
+            'запроса.'
+        )
+
+    def test_02_batch_errors(self, client):
+        response = client.post(
+            URL,
+            data={
+                'requests': [
+                    {'url': '/api/v1/users/me/'},
+                    {'url': '/api/v1/genres/', 'method': 'POST'},
+                    {'url': '/api/v1/unknown/'},
+                    {'url': URL},
+                    {},
+                ],
+            },
+            content_type='application/json',
+        )
+        assert response.status_code == 200
+        assert [result['status'] for result in response.json()] == [
+            401, 405, 404, 404, 400,
+        ], 'Проверьте статусы ошибочных подзапросов `/api/v1/batch/`.'
+        response = client.post(
+            URL, data={'requests': 'x'}, content_type='application/json',
+        )
+        assert response.status_code == 400
+
+    def test_03_batch_paths(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = str(titles[0]['id'])
+        quoted = ''.join(f'%{ord(char):02X}' for char in title_id)
+        response = admin_client.post(
+            URL,
+            data={
+                'requests': [
+                    {'url': f'/api/v1/titles/{quoted}/'},
+                    {'url': '/api/v1/doc/schema/'},
+                ],
+            },
+            format='json',
+        )
+        assert response.status_code == 200
+        title, schema = response.json()
+        assert title['status'] == 200 and title['body']['id'] == int(
+            title_id,
+        ), (
+            'Проверьте, что `/api/v1/batch/` декодирует экранированные '
+            'символы в адресах подзапросов.'
+        )
+        assert schema['status'] == 400, (
+            'Проверьте, что `/api/v1/batch/` отклоняет подзапросы к '
+            'представлениям вне DRF, тело которых не передаётся.'
+        )
@@ -0,0 +1,111 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Comment, Review
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22Include:
+
+    def prepare(self, admin_client, admin, user_client, user,
+                moderator_client, moderator):
+        comments, reviews, titles = create_comments(
+            admin_client,
+            {
+                admin: admin_client,
+                user: user_client,
+                moderator: moderator_client,
+            },
+        )
+        return f'/api/v1/titles/{titles[0]["id"]}/', reviews
+
+    def test_01_include_matches_lists(self, admin_client, admin, user_client,
+                                      user, moderator_client, moderator):
+        url, _ = self.prepare(
+            admin_client, admin, user_client, user, moderator_client,
+            moderator,
+        )
+        response = user_client.get(f'{url}?include=reviews.comments')
+        assert response.status_code == 200
+        data = response.json()
+        reviews = user_client.get(f'{url}reviews/').json()['results']
+        assert len(data['reviews']) == len(reviews) == 3
+        for review, expected in zip(data['reviews'], reviews):
+            comments = user_client.get(
+                f'{url}reviews/{expected["id"]}/comments/',
+            ).json()['results']
+            assert review == {**expected, 'comments': comments}, (
+                'Проверьте, что `?include=reviews.comments` встраивает отзывы '
+                'и комментарии в том же виде, что и их списки.'
+            )
+        assert user_client.get(url).json() == {
+            key: value for key, value in data.items() if key != 'reviews'
+        }
+
+    def test_02_include_limits(self, admin_client, admin, user_client, user,
+                               moderator_client, moderator):
+        url, reviews = self.prepare(
+            admin_client, admin, user_client, user, moderator_client,
+            moderator,
+        )
+        response = user_client.get(f'{url}?include=reviews&limit[reviews]=2')
+        assert response.status_code == 200
+        assert len(response.json()['reviews']) == 2, (
+            'Проверьте, что `limit[reviews]` ограничивает число отзывов.'
+        )
+        response = user_client.get(
+            f'{url}?include=reviews,reviews.comments'
+            '&limit[reviews.comments]=1',
+        )
+        assert response.status_code == 200
+        data = response.json()['reviews']
+        commented = next(
+            review for review in data if review['id'] == reviews[0]['id']
+        )
+        assert len(commented['comments']) == 1, (
+            'Проверьте, что `limit[reviews.comments]` ограничивает число '
+            'комментариев каждого отзыва.'
+        )
+        response = user_client.get(f'{url}?include=reviews')
+        assert all('comments' not in review
+                   for review in response.json()['reviews'])
+        for query in (
+            '?include=authors',
+            '?include=reviews&limit[reviews]=0',
+            '?include=reviews&limit[reviews]=x',
+            '?include=reviews&limit[reviews]=1000',
+        ):
+            response = user_client.get(f'{url}{query}')
+            assert response.status_code == 400, (
+                f'Проверьте, что запрос `{query}` возвращает статус 400.'
+            )
+
+    def test_03_fixed_queries(self, admin_client, admin, user_client, user,
+                              moderator_client, moderator):
+        url, reviews = self.prepare(
+            admin_client, admin, user_client, user, moderator_client,
+            moderator,
+        )
+        include = f'{url}?include=reviews.comments'
+        user_client.get(include)
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.get(include)
+        queries = len(context.captured_queries)
+        assert response.status_code == 200
+        for review in Review.objects.all():
+            for number in range(5):
+                Comment.objects.create(
+                    review=review, author=admin, text=f'extra {number}',
+                )
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.get(include)
+        assert len(context.captured_queries) == queries, (
+            'Проверьте, что число запросов к базе для `?include=` не зависит '
+            'от числа отзывов и комментариев.'
+        )
+        assert all(
+            len(review['comments']) == 3
+            for review in response.json()['reviews']
+        )
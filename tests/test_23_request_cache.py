@@ -0,0 +1,95 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from core import request_cache
+from reviews.models import Review, Title
+from tests.utils import create_reviews, create_titles
+from users.models import CustomUser
+
+
+def loads(queries, model):
+    """Число запросов, читающих таблицу модели."""
+    table = f'FROM "{model._meta.db_table}"'
+    return sum(
+        query['sql'].startswith('SELECT') and table in query['sql']
+        for query in queries
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23RequestCache:
+
+    def test_01_get_object_once(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        pk = titles[0]['id']
+        with CaptureQueriesContext(connection) as context:
+            with request_cache.request_scope():
+                title = request_cache.get_object_or_404(Title, pk)
+                assert request_cache.get_object_or_404(Title, str(pk)) is title
+                with request_cache.request_scope():
+                    assert request_cache.get_object_or_404(Title, pk) is title
+        assert len(context.captured_queries) == 1, (
+            'Проверьте, что объект загружается один раз за запрос.'
+        )
+        with CaptureQueriesContext(connection) as context:
+            request_cache.get_object_or_404(Title, pk)
+            request_cache.get_object_or_404(Title, pk)
+        assert len(context.captured_queries) == 2, (
+            'Проверьте, что вне запроса объекты не кешируются.'
+        )
+
+    def test_02_related(self, admin_client, admin, user_client, user):
+        reviews, _ = create_reviews(admin_client, {user: user_client})
+        with CaptureQueriesContext(connection) as context:
+            with request_cache.request_scope():
+                request_cache.remember(user)
+                review = Review.objects.get(pk=reviews[0]['id'])
+                assert request_cache.related(review, 'author') is user
+                assert review.author is user
+        assert loads(context.captured_queries, CustomUser) == 0
+
+    def test_03_review_post(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(
+                f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+                data={'text': 'text', 'score': 5},
+            )
+        queries = context.captured_queries
+        assert response.status_code == 201
+        assert loads(queries, Title) == 1, (
+            'Проверьте, что при создании отзыва произведение загружается '
+            'один раз.'
+        )
+        assert loads(queries, CustomUser) == 1
+
+    def test_04_review_patch(self, admin_client, user_client, user):
+        reviews, titles = create_reviews(admin_client, {user: user_client})
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/'
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.patch(url, data={'text': 'new'})
+        queries = context.captured_queries
+        assert response.status_code == 200
+        assert response.json()['author'] == user.username
+        assert loads(queries, CustomUser) == 1, (
+            'Проверьте, что права доступа и сериализатор используют '
+            'пользователя, загруженного при аутентификации.'
+        )
+        assert loads(queries, Title) == 1
+
+    def test_05_comment_post(self, admin_client, user_client, user):
+        reviews, titles = create_reviews(admin_client, {user: user_client})
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(
+                f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+                f'{reviews[0]["id"]}/comments/',
+                data={'text': 'comment'},
+            )
+        queries = context.captured_queries
+        assert response.status_code == 201
+        assert loads(queries, Review) == 1, (
+            'Проверьте, что при создании комментария отзыв загружается '
+            'один раз.'
+        )
+        assert loads(queries, CustomUser) == 1
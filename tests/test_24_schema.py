@@ -0,0 +1,91 @@
+import gzip
+import json
+
+import pytest
+from django.core.management import call_command
+
+from core import schema
+
+URL = '/api/v1/doc/schema/'
+
+
+@pytest.fixture
+def schema_dir(settings, tmp_path):
+    settings.SCHEMA_DIR = str(tmp_path)
+    schema.SCHEMA.clear()
+    yield tmp_path
+    schema.SCHEMA.clear()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24Schema:
+
+    def test_01_generated_once(self, client, schema_dir, monkeypatch):
+        calls = []
+        generate = schema.generate
+
+        def counted():
+            calls.append(1)
+            return generate()
+
+        monkeypatch.setattr(schema, 'generate', counted)
+        first = client.get(URL)
+        second = client.get(URL)
+        assert first.status_code == second.status_code == 200
+        assert first.content == second.content
+        assert first.content.startswith(b'openapi:')
+        assert first['Content-Type'] == 'application/vnd.oai.openapi'
+        assert len(calls) == 1, (
+            'Проверьте, что схема строится один раз на процесс.'
+        )
+
+    def test_02_etag_and_gzip(self, client, schema_dir):
+        response = client.get(URL, {'format': 'json'})
+        assert response.status_code == 200
+        etag = response['ETag']
+        assert etag.startswith('"'), 'ETag схемы должен быть строгим.'
+        paths = json.loads(response.content)['paths']
+        assert '/api/v1/titles/' in paths
+        response = client.get(
+            URL,
+            {'format': 'json'},
+            HTTP_IF_NONE_MATCH=etag,
+        )
+        assert response.status_code == 304, (
+            'Проверьте, что схема с совпадающим ETag не передаётся заново.'
+        )
+        compressed = client.get(
+            URL,
+            {'format': 'json'},
+            HTTP_ACCEPT_ENCODING='gzip, deflate',
+        )
+        assert compressed['Content-Encoding'] == 'gzip'
+        assert compressed['ETag'] != etag
+        assert 'Accept-Encoding' in compressed['Vary']
+        assert json.loads(gzip.decompress(compressed.content))['paths'] == (
+            paths
+        )
+        assert client.post(URL).status_code == 405
+
+    def test_03_build_schema(self, client, schema_dir):
+        call_command('build_schema', dir=str(schema_dir))
+        names = sorted(path.name for path in schema_dir.iterdir())
+        assert names == [
+            'schema.json',
+            'schema.json.gz',
+            'schema.yml',
+            'schema.yml.gz',
+        ]
+        (schema_dir / 'schema.yml').write_bytes(b'openapi: prebuilt\n')
+        response = client.get(URL)
+        assert response.content == b'openapi: prebuilt\n', (
+            'Проверьте, что схема читается из SCHEMA_DIR, если она там есть.'
+        )
+
+    def test_04_compress(self):
+        body = b'openapi: 3.0.3\n' * 100
+        compressed = schema.compress(body)
+        assert gzip.decompress(compressed) == body
+        assert compressed[4:8] == b'\0\0\0\0', (
+            'Проверьте, что сжатая схема не содержит времени сжатия.'
+        )
@@ -0,0 +1,115 @@
+import io
+import uuid
+from collections import OrderedDict
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from django.utils.translation import gettext_lazy
+from rest_framework import parsers, renderers
+from rest_framework.exceptions import ParseError
+from rest_framework.settings import api_settings
+
+from core import parsers as core_parsers
+from core import renderers as core_renderers
+
+PAYLOADS = (
+    None,
+    [],
+    {'text': 'Отзыв «хороший»     \x00 \x1f \x7f " \\ / \n\t'},
+    OrderedDict(id=1, rating=None, ok=True, genre=[OrderedDict(slug='a')]),
+    (1, 2.5, -0.0, 0.0001, 9999999999999998.0, 2**63, -(2**63)),
+    [1e16, 1e-5, 1.5e300],
+    [2**64, -(2**63) - 1],
+    {1: 'int key', 'nested': {2.5: 'float key'}},
+    {
+        'datetime': datetime(2023, 5, 1, 12, 30, 15, 123456),
+        'aware': datetime(2023, 5, 1, 12, 30, tzinfo=timezone.utc),
+        'offset': datetime(
+            2023, 5, 1, tzinfo=timezone(timedelta(hours=3)),
+        ),
+        'date': date(2023, 5, 1),
+        'time': time(12, 30, 15, 500),
+        'timedelta': timedelta(days=1, seconds=1.5),
+        'decimal': Decimal('10.50'),
+        'big_decimal': Decimal('1E+20'),
+        'uuid': uuid.UUID(int=12345),
+        'bytes': b'bytes',
+        'lazy': gettext_lazy('Ошибка'),
+        'set': {3},
+    },
+)
+
+
+def render(renderer, data, **kwargs):
+    try:
+        return renderer.render(data, **kwargs)
+    except (TypeError, ValueError) as error:
+        return type(error)
+
+
+class Test25JSON:
+
+    @pytest.mark.parametrize('data', PAYLOADS)
+    def test_01_render_matches_drf(self, data):
+        expected = render(renderers.JSONRenderer(), data)
+        assert render(core_renderers.JSONRenderer(), data) == expected, (
+            'Проверьте, что JSONRenderer выводит те же байты, что и '
+            'JSONRenderer DRF.'
+        )
+
+    def test_02_render_errors_and_indent(self):
+        for data in (float('nan'), [float('inf')], object()):
+            assert render(core_renderers.JSONRenderer(), data) is (
+                render(renderers.JSONRenderer(), data)
+            )
+        data = {'a': [1, {'b': 'в'}]}
+        for media_type in ('application/json; indent=4', 'application/json'):
+            assert core_renderers.JSONRenderer().render(
+                data,
+                media_type,
+            ) == renderers.JSONRenderer().render(data, media_type)
+
+    @pytest.mark.parametrize('data', PAYLOADS[:5])
+    def test_03_fallback_without_orjson(self, data, monkeypatch):
+        monkeypatch.setattr(core_renderers, 'orjson', None)
+        assert render(core_renderers.JSONRenderer(), data) == render(
+            renderers.JSONRenderer(),
+            data,
+        )
+
+    @pytest.mark.parametrize(
+        'body',
+        (
+            b'{"text": "\\u041e\\u0442\\u0437\\u044b\\u0432", "score": 5}',
+            b'[1, 2.5, -0, 1e-7, null, true]',
+            b'{"big": 123456789012345678901234567890}',
+            b'"\\ud800"',
+            b'\xef\xbb\xbf{}',
+            b'{"a": 1,}',
+            b'NaN',
+            b'1e400',
+            'Отзыв'.encode(),
+        ),
+    )
+    def test_04_parse_matches_drf(self, body):
+        results = []
+        for parser in (parsers.JSONParser(), core_parsers.JSONParser()):
+            try:
+                results.append(parser.parse(io.BytesIO(body)))
+            except ParseError as error:
+                results.append(str(error.detail))
+        assert results[1] == results[0], (
+            'Проверьте, что JSONParser разбирает тело так же, как '
+            'JSONParser DRF.'
+        )
+        assert type(results[1]) is type(results[0])
+
+    def test_05_settings(self):
+        assert (
+            api_settings.DEFAULT_RENDERER_CLASSES[0]
+            is core_renderers.JSONRenderer
+        )
+        assert api_settings.DEFAULT_PARSER_CLASSES[0] is (
+            core_parsers.JSONParser
+        )
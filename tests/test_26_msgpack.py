@@ -0,0 +1,67 @@
+import pytest
+
+from tests.utils import create_reviews, create_titles
+
+msgpack = pytest.importorskip('msgpack')
+
+MEDIA_TYPE = 'application/msgpack'
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26MessagePack:
+
+    def test_01_render(self, admin_client, user_client, user):
+        reviews, titles = create_reviews(admin_client, {user: user_client})
+        for url in (
+            '/api/v1/titles/',
+            f'/api/v1/titles/{titles[0]["id"]}/',
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+            '/api/v1/users/me/',
+        ):
+            expected = user_client.get(url).json()
+            response = user_client.get(url, HTTP_ACCEPT=MEDIA_TYPE)
+            assert response.status_code == 200
+            assert response['Content-Type'] == MEDIA_TYPE
+            assert msgpack.unpackb(response.content) == expected, (
+                f'Проверьте, что `{url}` возвращает в MessagePack те же '
+                'данные, что и в JSON.'
+            )
+        response = user_client.get('/api/v1/genres/', {'format': 'msgpack'})
+        assert response['Content-Type'] == MEDIA_TYPE
+
+    def test_02_parse(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        response = user_client.post(
+            url,
+            data=msgpack.packb({'text': 'Отзыв', 'score': 7}),
+            content_type=MEDIA_TYPE,
+            HTTP_ACCEPT=MEDIA_TYPE,
+        )
+        assert response.status_code == 201, (
+            'Проверьте, что API принимает тела запросов в MessagePack.'
+        )
+        data = msgpack.unpackb(response.content)
+        assert data['text'] == 'Отзыв'
+        assert data['score'] == 7
+        response = admin_client.patch(
+            f'/api/v1/titles/{titles[0]["id"]}/',
+            data={'name': 'Новое название'},
+            format='msgpack',
+        )
+        assert response.status_code == 200
+        assert response.json()['name'] == 'Новое название'
+
+    def test_03_parse_errors(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        for body in (b'\xc1', msgpack.packb({1: 'int key'}), b'\x01\x02'):
+            response = user_client.post(
+                url,
+                data=body,
+                content_type=MEDIA_TYPE,
+            )
+            assert response.status_code == 400, (
+                'Проверьте, что некорректный MessagePack возвращает статус '
+                '400.'
+            )
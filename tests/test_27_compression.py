@@ -0,0 +1,116 @@
+import gzip
+
+import pytest
+
+from core import compression
+from tests.utils import create_titles
+
+URL = '/api/v1/titles/'
+
+
+@pytest.fixture
+def compressed_cache(settings):
+    # страница из трёх тестовых произведений короче порога по умолчанию
+    settings.COMPRESSION_MIN_SIZE = 100
+    compression.CACHE.clear()
+    yield compression.CACHE
+    compression.CACHE.clear()
+
+
+class Test27Negotiation:
+
+    @pytest.mark.parametrize(
+        'header, expected',
+        (
+            ('', None),
+            ('identity', None),
+            ('gzip', 'gzip'),
+            ('gzip;q=0', None),
+            ('deflate, gzip;q=0.5', 'gzip'),
+            ('*', list(compression.ENCODINGS)[0]),
+            ('*;q=0.1, gzip', 'gzip'),
+            ('GZIP ; q=0.8, unknown', 'gzip'),
+        ),
+    )
+    def test_01_choose_encoding(self, header, expected):
+        assert compression.choose_encoding(header) == expected
+
+    def test_02_gzip_deterministic(self):
+        body = b'{"results": []}' * 100
+        compressed = compression.compress_gzip(body)
+        assert gzip.decompress(compressed) == body
+        assert compressed == compression.compress_gzip(body)
+        assert compressed[4:8] == b'\0\0\0\0', (
+            'Проверьте, что сжатые ответы не содержат времени сжатия.'
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27Compression:
+
+    def test_01_gzip(self, admin_client, client, compressed_cache):
+        create_titles(admin_client)
+        plain = client.get(URL)
+        assert 'Content-Encoding' not in plain
+        response = client.get(URL, HTTP_ACCEPT_ENCODING='gzip')
+        assert response['Content-Encoding'] == 'gzip', (
+            'Проверьте, что ответы API сжимаются для клиентов, '
+            'принимающих gzip.'
+        )
+        assert 'Accept-Encoding' in response['Vary']
+        assert int(response['Content-Length']) == len(response.content)
+        assert gzip.decompress(response.content) == plain.content
+
+    def test_02_min_size(self, client, settings, compressed_cache):
+        settings.COMPRESSION_MIN_SIZE = 10**6
+        response = client.get(URL, HTTP_ACCEPT_ENCODING='gzip')
+        assert 'Content-Encoding' not in response, (
+            'Проверьте, что ответы короче COMPRESSION_MIN_SIZE не '
+            'сжимаются.'
+        )
+
+    def test_03_cached(self, admin_client, client, compressed_cache,
+                       monkeypatch):
+        create_titles(admin_client)
+        calls = []
+        compress = compression.ENCODINGS['gzip']
+
+        def counted(body):
+            calls.append(body)
+            return compress(body)
+
+        monkeypatch.setitem(compression.ENCODINGS, 'gzip', counted)
+        first = client.get(URL, HTTP_ACCEPT_ENCODING='gzip')
+        second = client.get(URL, HTTP_ACCEPT_ENCODING='gzip')
+        assert first.content == second.content
+        assert len(calls) == 1, (
+            'Проверьте, что одинаковые ответы не сжимаются повторно.'
+        )
+
+    def test_04_precompressed_schema(self, client, compressed_cache):
+        response = client.get(
+            '/api/v1/doc/schema/',
+            HTTP_ACCEPT_ENCODING='br, gzip',
+        )
+        assert response['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(response.content).startswith(b'openapi:')
+
+    @pytest.mark.parametrize('encoding', ('br', 'zstd'))
+    def test_05_optional_encodings(self, admin_client, client, encoding,
+                                   compressed_cache):
+        if encoding not in compression.ENCODINGS:
+            pytest.skip(f'{encoding} не установлен')
+        create_titles(admin_client)
+        plain = client.get(URL)
+        response = client.get(
+            URL,
+            HTTP_ACCEPT_ENCODING=f'gzip;q=0.5, {encoding}',
+        )
+        assert response['Content-Encoding'] == encoding
+        if encoding == 'br':
+            body = compression.brotli.decompress(response.content)
+        else:
+            body = compression.zstandard.ZstdDecompressor().decompress(
+                response.content,
+            )
+        assert body == plain.content
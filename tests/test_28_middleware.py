@@ -0,0 +1,54 @@
+import pytest
+from django.core.management import call_command
+from django.core.management.base import SystemCheckError
+from django.test import Client
+
+
+@pytest.mark.django_db(transaction=True)
+class Test28Middleware:
+
+    def test_01_api_skips_site_middleware(self, client):
+        response = client.get('/api/v1/categories/')
+        assert response.status_code == 200
+        assert 'Cookie' not in response.get('Vary', ''), (
+            'Проверьте, что запросы к API обходят SessionMiddleware.'
+        )
+        assert not hasattr(response.wsgi_request, 'session')
+        assert not hasattr(response.wsgi_request, '_messages')
+
+    def test_02_browsable_api_frame_options(self, client):
+        response = client.get('/api/v1/categories/', HTTP_ACCEPT='text/html')
+        assert response['X-Frame-Options'] == 'DENY', (
+            'Проверьте, что браузерный API защищён заголовком '
+            'X-Frame-Options.'
+        )
+
+    def test_03_admin_keeps_full_stack(self, user_superuser):
+        client = Client(enforce_csrf_checks=True)
+        response = client.get('/admin/login/')
+        assert response.status_code == 200
+        assert response['X-Frame-Options'] == 'DENY'
+        assert 'csrftoken' in response.cookies
+        response = client.post(
+            '/admin/login/',
+            {'username': 'TestSuperuser', 'password': '1234567'},
+        )
+        assert response.status_code == 403, (
+            'Проверьте, что админка проверяет CSRF-токен.'
+        )
+        client.force_login(user_superuser)
+        response = client.get('/admin/')
+        assert response.status_code == 200, (
+            'Проверьте, что админка получает сессию и пользователя.'
+        )
+        assert response.wsgi_request.user == user_superuser
+
+    def test_04_checks(self, settings):
+        call_command('check')
+        settings.SITE_MIDDLEWARE = [
+            path
+            for path in settings.SITE_MIDDLEWARE
+            if 'sessions' not in path
+        ]
+        with pytest.raises(SystemCheckError, match='core.E001'):
+            call_command('check')
@@ -0,0 +1,96 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from core import bench
+from core.management.commands import bench_api
+
+
+@pytest.fixture
+def current_environment(monkeypatch):
+    # pytest-django уже подготовил тестовую базу и окружение
+    monkeypatch.setattr(bench_api, 'setup_test_environment', lambda: None)
+    monkeypatch.setattr(bench_api, 'teardown_test_environment', lambda: None)
+    monkeypatch.setattr(
+        bench_api,
+        'setup_databases',
+        lambda **kwargs: [],
+    )
+
+
+class Test29Bench:
+
+    def test_01_percentile(self):
+        assert bench.percentile([], 95) == 0.0
+        assert bench.percentile([3.0], 99) == 3.0
+        assert bench.percentile([4.0, 1.0, 3.0, 2.0], 50) == 2.5, (
+            'Проверьте, что перцентиль интерполируется между соседними '
+            'значениями.'
+        )
+        assert bench.percentile([1.0, 2.0, 3.0, 4.0, 5.0], 100) == 5.0
+        summary = bench.summarize([0.001, 0.003])
+        assert summary['requests'] == 2
+        assert summary['p50_ms'] == 2.0
+        assert summary['throughput_rps'] == 500.0
+
+    def test_02_compare(self):
+        baseline = {
+            'titles-list': {'p95_ms': 10.0, 'queries': 4},
+            'genres-list': {'p95_ms': 0, 'queries': 2},
+        }
+        results = {
+            'titles-list': {'p95_ms': 12.5, 'queries': 4},
+            'genres-list': {'p95_ms': 5.0, 'queries': 2},
+            'users-me': {'p95_ms': 100.0, 'queries': 9},
+        }
+        assert bench.compare(results, baseline, 0.3) == []
+        regressions = bench.compare(
+            results,
+            baseline,
+            0.2,
+            metrics=('p95_ms', 'queries'),
+        )
+        assert regressions == ['titles-list: p95_ms 10.0 -> 12.5 (+25%)'], (
+            'Проверьте, что отмечаются только метрики, выросшие больше '
+            'порога относительно сохранённого прогона.'
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test29BenchApi:
+
+    def test_01_smoke(self, current_environment, tmp_path):
+        baseline = tmp_path / 'baseline.json'
+        baseline.write_text(
+            json.dumps(
+                {'results': {'categories-list': {'p95_ms': 1e-6}}},
+            ),
+        )
+        output = tmp_path / 'bench.json'
+        out, err = StringIO(), StringIO()
+        with pytest.raises(CommandError, match='1 regressions'):
+            call_command(
+                'bench_api',
+                requests=1,
+                warmup=0,
+                endpoint=['categories-list'],
+                output=str(output),
+                compare=str(baseline),
+                stdout=out,
+                stderr=err,
+            )
+        assert 'categories-list' in out.getvalue()
+        assert 'regression: categories-list: p95_ms' in err.getvalue(), (
+            'Проверьте, что `bench_api --compare` сообщает о регрессиях.'
+        )
+        results = json.loads(output.read_text())['results']
+        assert list(results) == ['categories-list']
+        assert results['categories-list']['requests'] == 1
+        assert results['categories-list']['statuses'] == {'200': 1}
+
+    def test_02_requests_validation(self):
+        with pytest.raises(CommandError, match='--requests'):
+            call_command('bench_api', requests=0)